@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ActivitiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'activities'
+
+    def ready(self):
+        from .journaling import signals, tasks  # noqa: F401
+        from .journaling.models import Journaling
+        from .journaling.serializers import JournalingSerializer
+        from core.timeline import register_detail_serializer
+
+        register_detail_serializer(Journaling, JournalingSerializer)
@@ -0,0 +1,38 @@
+from functools import partial
+
+from django.db import transaction
+
+from core.events import get_broker
+
+
+PREVIEW_LENGTH = 140
+
+
+def patient_channel(patient_id):
+    return f"journaling:patient:{patient_id}"
+
+
+def journaling_event(instance):
+    """Mesmos campos da listagem (`list_fields`), mais `updated_at`."""
+    text = instance.resume or instance.situation or ""
+    return {
+        "id": instance.pk,
+        "title": instance.title,
+        "date": instance.date,
+        "patient": instance.patient_id,
+        "is_active": instance.is_active,
+        "preview": text[:PREVIEW_LENGTH],
+        "updated_at": instance.updated_at,
+    }
+
+
+def publish_journaling(event, instance, using=None):
+    """
+    Publica `event` (created, updated ou deleted) no canal do paciente depois
+    do commit, para que os assinantes nunca vejam um registro desfeito.
+    """
+    message = {"event": event, "data": journaling_event(instance)}
+    transaction.on_commit(
+        partial(get_broker().publish, patient_channel(instance.patient_id), message),
+        using=using,
+    )
@@ -1,8 +1,14 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from activities.models import ActivityChoices
 from core.models.activity_base import ActivityBase
+from core.models.user import User
 
 
 class Journaling(ActivityBase):
+    activity_type = ActivityChoices.journaling
+
     situation = models.TextField(blank=True, null=True)
     emotions = models.TextField(blank=True, null=True)
     thoughts = models.TextField(blank=True, null=True)
@@ -16,3 +22,46 @@ class Journaling(ActivityBase):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Mantido por trigger no Postgres (ver migração 0003); nulo em outros bancos
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Listagens filtram por paciente e paginam por (date, created_at, id)
+            models.Index(
+                fields=["patient", "date", "created_at", "id"],
+                name="journaling_patient_date_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="journaling_search_idx"),
+            # Sincronização incremental: alterações por paciente desde um cursor
+            models.Index(
+                fields=["patient", "updated_at", "id"],
+                name="journaling_patient_sync_idx",
+            ),
+        ]
+
+
+class JournalingTombstone(models.Model):
+    """
+    Registro de journaling excluído, mantido para que a sincronização
+    incremental (`changes/`) avise o app da exclusão.
+    """
+
+    journaling_id = models.BigIntegerField()
+    # Sem FK no banco: as marcas podem ser gravadas durante a exclusão do
+    # próprio paciente
+    patient = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_constraint=False, related_name="+"
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["patient", "deleted_at", "id"],
+                name="journaling_tombstone_sync_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Journaling {self.journaling_id} (excluído)"
@@ -0,0 +1,234 @@
+"""
+Particionamento mensal (por `date`) da tabela de journaling no Postgres.
+
+A tabela particionada não tem chave primária: no Postgres toda restrição
+única precisa incluir a chave de partição, e `date` aceita nulos. A
+unicidade fica em `UNIQUE (id, date)` (que também serve às buscas por `id`)
+e na sequência de `id`. Registros sem data ou fora das partições mensais vão
+para a partição padrão.
+"""
+
+import re
+from datetime import date
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+TABLE = "activities_journaling"
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name):
+    match = PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def is_partitioned(cursor):
+    cursor.execute(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE]
+    )
+    row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions(cursor):
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        ORDER BY child.relname
+        """,
+        [TABLE],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def table_definitions(cursor, table):
+    """Índices, chaves estrangeiras e triggers da tabela, para recriá-los."""
+    cursor.execute(
+        """
+        SELECT indexdef FROM pg_indexes
+        WHERE tablename = %s AND indexname NOT IN (
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u')
+        )
+        """,
+        [table, table],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype = 'f'
+        """,
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT pg_get_triggerdef(oid) FROM pg_trigger
+        WHERE tgrelid = to_regclass(%s) AND NOT tgisinternal
+        """,
+        [table],
+    )
+    triggers = [row[0] for row in cursor.fetchall()]
+    return indexes, foreign_keys, triggers
+
+
+def restore_definitions(cursor, indexes, foreign_keys, triggers):
+    for definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT "{name}" {definition}')
+    for definition in triggers:
+        cursor.execute(definition)
+
+
+def rebuild_table(cursor, partition_clause, key_clause, after_create=None):
+    """
+    Recria a tabela com `partition_clause` (ou sem particionamento), copia
+    as linhas e restaura índices, chaves estrangeiras, triggers e a sequência
+    de `id` com os mesmos nomes.
+    """
+    indexes, foreign_keys, triggers = table_definitions(cursor, TABLE)
+    new_table = f"{TABLE}_rebuild"
+    cursor.execute(
+        f"CREATE TABLE {new_table} (LIKE {TABLE} INCLUDING DEFAULTS "
+        f"INCLUDING IDENTITY INCLUDING STORAGE) {partition_clause}"
+    )
+    if after_create is not None:
+        after_create(cursor, new_table)
+    cursor.execute(f"INSERT INTO {new_table} SELECT * FROM {TABLE}")
+    cursor.execute(f"DROP TABLE {TABLE} CASCADE")
+    cursor.execute(f"ALTER TABLE {new_table} RENAME TO {TABLE}")
+    cursor.execute(f"ALTER TABLE {TABLE} ADD {key_clause}")
+    restore_definitions(cursor, indexes, foreign_keys, triggers)
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+        f"COALESCE((SELECT max(id) FROM {TABLE}), 0) + 1, false)"
+    )
+
+
+def partition(months_ahead=3, using=DEFAULT_DB_ALIAS):
+    """
+    Converte a tabela atual em particionada por mês de `date`, com uma
+    partição para cada mês que já tem registros, os próximos `months_ahead`
+    meses e a partição padrão. Bloqueia a tabela durante a cópia.
+    """
+    with connections[using].cursor() as cursor:
+        if is_partitioned(cursor):
+            return False
+        cursor.execute(f"SELECT min(date), max(date) FROM {TABLE}")
+        first, last = cursor.fetchone()
+        today = month_start(date.today())
+        first = month_start(first) if first else today
+        last = max(month_start(last) if last else today, add_months(today, months_ahead))
+
+        def create_partitions(cursor, table):
+            cursor.execute(
+                f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {table} DEFAULT"
+            )
+            month = first
+            while month <= last:
+                create_partition(cursor, month, parent=table)
+                month = add_months(month, 1)
+
+        rebuild_table(
+            cursor,
+            "PARTITION BY RANGE (date)",
+            f"CONSTRAINT {TABLE}_id_date_uniq UNIQUE (id, date)",
+            after_create=create_partitions,
+        )
+    return True
+
+
+def unpartition(using=DEFAULT_DB_ALIAS):
+    """Volta para uma tabela comum com chave primária em `id`."""
+    with connections[using].cursor() as cursor:
+        if not is_partitioned(cursor):
+            return False
+        rebuild_table(cursor, "", f"CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)")
+    return True
+
+
+def create_partition(cursor, month, parent=TABLE):
+    """
+    Cria a partição do mês. Linhas desse mês que estejam na partição padrão
+    são movidas para ela antes de anexá-la.
+    """
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    if cursor.fetchone()[0]:
+        return False
+
+    cursor.execute(
+        f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING STORAGE)"
+    )
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [DEFAULT_PARTITION])
+    if cursor.fetchone()[0]:
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE date >= %s AND date < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            [start, end],
+        )
+    cursor.execute(
+        f"ALTER TABLE {parent} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+    return True
+
+
+def detach_partition(cursor, name, archive_schema=None):
+    cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+    if archive_schema:
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"')
+        cursor.execute(f'ALTER TABLE {name} SET SCHEMA "{archive_schema}"')
+
+
+def ensure_partitions(months_ahead=3, using=DEFAULT_DB_ALIAS):
+    """Cria as partições do mês atual e dos próximos `months_ahead` meses."""
+    today = month_start(date.today())
+    created = []
+    with connections[using].cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            month = add_months(today, offset)
+            if create_partition(cursor, month):
+                created.append(partition_name(month))
+    return created
+
+
+def detach_partitions(older_than_months, archive_schema=None, using=DEFAULT_DB_ALIAS):
+    """
+    Desanexa as partições de meses anteriores a `older_than_months` meses
+    atrás. Elas continuam no banco (no schema `archive_schema`, se informado)
+    para backup ou `DROP TABLE` manual.
+    """
+    limit = add_months(month_start(date.today()), -older_than_months)
+    detached = []
+    with connections[using].cursor() as cursor:
+        for name in list_partitions(cursor):
+            month = partition_month(name)
+            if month is not None and month < limit:
+                detach_partition(cursor, name, archive_schema)
+                detached.append(name)
+    return detached
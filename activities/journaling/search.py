@@ -0,0 +1,48 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+
+
+SEARCH_CONFIG = "portuguese"
+
+# Campos indexados e seus pesos; precisam acompanhar o trigger da migração 0003
+SEARCH_WEIGHTS = {
+    "title": "A",
+    "situation": "B",
+    "thoughts": "B",
+    "emotions": "C",
+    "behavior": "C",
+}
+
+# Mesmos valores padrão do `ts_rank` para os pesos A, B e C
+FALLBACK_WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2}
+
+
+def search_journaling(queryset, terms):
+    """
+    Filtra o queryset pelos termos de busca e anota `rank` com a relevância.
+
+    No Postgres usa a coluna `search_vector` (índice GIN) com a configuração
+    em português; nos demais bancos cai para `icontains` nos mesmos campos,
+    somando os pesos dos campos que contêm o texto.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch")
+        # `ts_rank` devolve `real`; como `double precision` o valor guardado no
+        # cursor da paginação volta idêntico e o empate na fronteira é exato
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+        )
+
+    matches = Q()
+    rank = Value(0.0)
+    for name, weight in SEARCH_WEIGHTS.items():
+        contains = Q(**{f"{name}__icontains": terms})
+        matches |= contains
+        rank += Case(
+            When(contains, then=Value(FALLBACK_WEIGHTS[weight])),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    return queryset.filter(matches).annotate(rank=rank)
@@ -1,10 +1,37 @@
+from django.db import transaction
 from rest_framework import serializers
 
 from .models import Journaling
+from .events import publish_journaling
+from .signals import bump_journaling_data
+from .sync import decode_cursor
+from core.serializers import (
+    InstrumentedSerializerMixin,
+    SparseFieldsetMixin,
+    ValuesSerializer,
+)
 
 
-class JournalingSerializer(serializers.ModelSerializer):
+class JournalingListSerializer(InstrumentedSerializerMixin, serializers.ListSerializer):
+    def create(self, validated_data):
+        patient_id = self.context["request"].user.id
+        with transaction.atomic():
+            created = Journaling.objects.bulk_create(
+                [Journaling(**item, patient_id=patient_id) for item in validated_data]
+            )
+        # `bulk_create` não dispara os sinais que invalidam o cache de respostas
+        # e publicam no stream
+        bump_journaling_data(patient_id)
+        for instance in created:
+            publish_journaling("created", instance)
+        return created
+
+
+class JournalingSerializer(
+    InstrumentedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer
+):
     patient = serializers.PrimaryKeyRelatedField(read_only=True)
+    preview = serializers.CharField(read_only=True)
 
     class Meta:
         model = Journaling
@@ -25,9 +52,45 @@ class JournalingSerializer(serializers.ModelSerializer):
             "evidence_unfavorable",
             "alternative_thoughts",
             "alternative_behaviors",
+            "preview",
         ]
+        optional_fields = ["preview"]
         read_only_fields = ["id", "is_active"]
+        list_serializer_class = JournalingListSerializer
 
     def create(self, validated_data):
-        validated_data["patient"] = self.context["request"].user
+        validated_data["patient_id"] = self.context["request"].user.id
         return Journaling.objects.create(**validated_data)
+
+
+class JournalingValuesSerializer(ValuesSerializer):
+    """Leitura rápida da listagem e do detalhe (`JOURNALING_FAST_SERIALIZER`)."""
+
+    serializer_class = JournalingSerializer
+
+
+class JournalingChangesQuerySerializer(serializers.Serializer):
+    since = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=1000, default=500)
+
+    def validate_since(self, value):
+        try:
+            return decode_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor.")
+
+
+class JournalingExportQuerySerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=["ndjson", "csv"], default="ndjson")
+    patient = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        date_from = attrs.get("date_from")
+        date_to = attrs.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError(
+                {"date_to": "date_to must not be before date_from."}
+            )
+        return attrs
@@ -0,0 +1,50 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.access_graph import get_access_graph
+from core.models.user import User
+from core.response_cache import bump_user_data
+from .events import publish_journaling
+from .models import Journaling, JournalingTombstone
+
+
+def bump_journaling_data(*patient_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Invalida as respostas em cache dos pacientes e dos seus terapeutas (lidos
+    do grafo de acesso, normalmente já em memória). Chamado pelos sinais e,
+    após `bulk_create`, diretamente.
+    """
+    user_ids = set(patient_ids)
+    for patient_id in patient_ids:
+        user_ids |= get_access_graph(patient_id).therapist_ids
+    bump_user_data(*user_ids, using=using)
+
+
+@receiver(post_save, sender=Journaling)
+@receiver(post_delete, sender=Journaling)
+def journaling_changed(sender, instance, using, **kwargs):
+    bump_journaling_data(instance.patient_id, using=using)
+
+
+@receiver(post_save, sender=Journaling)
+def journaling_saved(sender, instance, created, using, **kwargs):
+    publish_journaling("created" if created else "updated", instance, using)
+
+
+@receiver(post_delete, sender=Journaling)
+def journaling_deleted(sender, instance, using, origin=None, **kwargs):
+    # Marca lida pela sincronização incremental (`changes/`); não há quem
+    # sincronizar quando o próprio paciente está sendo excluído
+    if not (isinstance(origin, User) and origin.pk == instance.patient_id):
+        JournalingTombstone.objects.using(using).create(
+            journaling_id=instance.pk, patient_id=instance.patient_id
+        )
+    publish_journaling("deleted", instance, using)
+
+
+@receiver(post_delete, sender=User)
+def patient_deleted(sender, instance, using, **kwargs):
+    # Exclusões em lote de usuários (`QuerySet.delete`) gravam as marcas depois
+    # de o collector ter reunido as do paciente; sem FK no banco, ficariam órfãs
+    JournalingTombstone.objects.using(using).filter(patient_id=instance.pk).delete()
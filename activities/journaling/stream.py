@@ -0,0 +1,100 @@
+"""
+Stream (Server-Sent Events) de registros de journaling criados, alterados ou
+excluídos, para o terapeuta acompanhar os pacientes sem polling.
+
+A view é assíncrona: sob ASGI cada conexão é uma corrotina esperando na fila
+da sua assinatura no broker (`core.events`), sem ocupar uma thread. Sob WSGI
+a assinatura ficaria presa ao event loop temporário da view, que já terminou
+quando o Django lê a resposta (os eventos seriam perdidos e a resposta só
+sairia inteira no fim), então a view responde 501.
+"""
+
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from core.access_graph import aget_access_graph
+from core.authentication import ClaimsJWTAuthentication
+from core.events import OVERFLOW, get_broker
+from .events import patient_channel
+from .views import readable_patient_ids
+
+
+# Intervalo sugerido para o EventSource reconectar
+RETRY_MS = 3000
+
+
+async def authenticate(request):
+    """
+    Usuário do token JWT do cabeçalho `Authorization` ou, para o EventSource
+    dos navegadores (que não envia cabeçalhos), do parâmetro `access_token`.
+    """
+    authentication = ClaimsJWTAuthentication()
+    try:
+        raw_token = request.GET.get("access_token")
+        if raw_token:
+            token = authentication.get_validated_token(raw_token.encode())
+            return await authentication.aget_user(token)
+        result = await authentication.aauthenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+def format_event(event, data):
+    data = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def event_stream(subscription, keepalive, max_seconds):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while (remaining := deadline - loop.time()) > 0:
+            message = await subscription.get(timeout=min(keepalive, remaining))
+            if message is None:
+                yield ": keepalive\n\n"
+            elif message is OVERFLOW:
+                # Mensagens perdidas: o cliente deve chamar `changes/`
+                yield format_event("reset", {})
+                return
+            else:
+                yield format_event(message["event"], message["data"])
+    finally:
+        subscription.close()
+
+
+async def journaling_stream(request):
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed."}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Streaming requires an ASGI server."}, status=501
+        )
+    user = await authenticate(request)
+    if user is None or not user.is_active:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    graph = await aget_access_graph(user)
+    channels = [patient_channel(id) for id in readable_patient_ids(user, graph)]
+    subscription = get_broker().subscribe(channels)
+    response = StreamingHttpResponse(
+        event_stream(
+            subscription,
+            settings.JOURNALING_STREAM_KEEPALIVE_SECONDS,
+            settings.JOURNALING_STREAM_MAX_SECONDS,
+        ),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Desliga o buffer do nginx para os eventos saírem na hora
+    response["X-Accel-Buffering"] = "no"
+    return response
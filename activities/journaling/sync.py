@@ -0,0 +1,146 @@
+"""
+Sincronização incremental do journaling (`GET .../journaling/changes/`).
+
+O cursor guarda duas posições: `(updated_at, id)` do último registro enviado
+e `(deleted_at, id)` da última marca de exclusão. Cada chamada lê só o que
+vem depois delas, pelos índices `(patient, updated_at, id)` e
+`(patient, deleted_at, id)`, então o custo acompanha o volume de mudanças e
+não o tamanho do histórico.
+
+Uma transação pode gravar `updated_at` e só fazer commit depois; por isso,
+ao fim da sincronização o cursor não passa de `agora - overlap` e o que foi
+gravado nesse intervalo é reenviado na próxima chamada. O app deve aplicar as
+mudanças como upsert (idempotente).
+
+As marcas de exclusão são apagadas após `JOURNALING_TOMBSTONE_RETENTION_SECONDS`.
+Um cursor mais antigo que isso pode ter perdido exclusões: a leitura recomeça
+do início com `reset`, e o app substitui os dados locais.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import JournalingTombstone
+
+
+Position = namedtuple("Position", ["timestamp", "id"])
+SyncCursor = namedtuple("SyncCursor", ["entries", "tombstones"])
+SyncPage = namedtuple(
+    "SyncPage", ["entries", "tombstones", "cursor", "has_more", "reset"]
+)
+
+
+def encode_cursor(cursor):
+    payload = {
+        "e": encode_position(cursor.entries),
+        "t": encode_position(cursor.tombstones),
+    }
+    return urlsafe_b64encode(
+        json.dumps(payload, separators=(",", ":")).encode("ascii")
+    ).decode("ascii")
+
+
+def encode_position(position):
+    if position is None:
+        return None
+    return [position.timestamp.isoformat(), position.id]
+
+
+def decode_cursor(value):
+    """Devolve o `SyncCursor`; levanta `ValueError` se o valor for inválido."""
+    try:
+        payload = json.loads(urlsafe_b64decode(value.encode("ascii")))
+        return SyncCursor(
+            entries=decode_position(payload["e"]),
+            tombstones=decode_position(payload["t"]),
+        )
+    except (TypeError, KeyError, UnicodeError, AttributeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def decode_position(raw):
+    if raw is None:
+        return None
+    timestamp, id = raw
+    timestamp = datetime.fromisoformat(timestamp)
+    if timezone.is_naive(timestamp) or not isinstance(id, int):
+        raise ValueError("Invalid cursor")
+    return Position(timestamp, id)
+
+
+def read_after(queryset, field, position, limit):
+    """Até `limit` linhas depois de `position` em `(field, id)`."""
+    if position is not None:
+        queryset = queryset.filter(
+            Q(**{f"{field}__gt": position.timestamp})
+            | Q(**{field: position.timestamp, "id__gt": position.id})
+        )
+    rows = list(queryset.order_by(field, "id")[: limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def advance(position, rows, field, has_more, horizon):
+    if rows:
+        last = Position(getattr(rows[-1], field), rows[-1].id)
+        if has_more:
+            return last
+        # Última página: não passa do horizonte, para reler commits atrasados
+        last = min(last, Position(horizon, 0))
+    else:
+        last = Position(horizon, 0)
+    return last if position is None else max(position, last)
+
+
+def read_changes(entries, tombstones, cursor, limit, overlap, retention):
+    """
+    Lê a próxima página de mudanças a partir de `cursor` (None para a
+    sincronização inicial, que não precisa das exclusões anteriores).
+    """
+    now = timezone.now()
+    horizon = now - timedelta(seconds=overlap)
+    reset = cursor is not None and (
+        cursor.tombstones is None
+        or cursor.tombstones.timestamp < now - timedelta(seconds=retention)
+    )
+    if reset:
+        cursor = None
+    if cursor is None:
+        cursor = SyncCursor(entries=None, tombstones=Position(horizon, 0))
+
+    entry_rows, more_entries = read_after(entries, "updated_at", cursor.entries, limit)
+    tombstone_rows, more_tombstones = read_after(
+        tombstones, "deleted_at", cursor.tombstones, limit
+    )
+    next_cursor = SyncCursor(
+        entries=advance(cursor.entries, entry_rows, "updated_at", more_entries, horizon),
+        tombstones=advance(
+            cursor.tombstones, tombstone_rows, "deleted_at", more_tombstones, horizon
+        ),
+    )
+    return SyncPage(
+        entries=entry_rows,
+        tombstones=tombstone_rows,
+        cursor=next_cursor,
+        has_more=more_entries or more_tombstones,
+        reset=reset,
+    )
+
+
+def delete_expired_tombstones(using=DEFAULT_DB_ALIAS):
+    """Apaga as marcas de exclusão além do horizonte de sincronização."""
+    deleted, _ = (
+        JournalingTombstone.objects.using(using)
+        .filter(
+            deleted_at__lt=timezone.now()
+            - timedelta(seconds=settings.JOURNALING_TOMBSTONE_RETENTION_SECONDS)
+        )
+        .delete()
+    )
+    return deleted
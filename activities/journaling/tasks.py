@@ -0,0 +1,49 @@
+from tempfile import SpooledTemporaryFile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from .serializers import JournalingExportQuerySerializer
+from .views import JournalingViewSet, readable_patient_ids
+from core.access_graph import get_access_graph
+from core.jobs import task
+from core.models.user import User
+
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+@task("journaling.export")
+def export_journaling(job):
+    """
+    Mesma exportação de `GET .../journaling/export/`, gravada em um arquivo
+    no `default_storage` em vez de enviada na resposta.
+    """
+    params = JournalingExportQuerySerializer(data=job.payload["params"])
+    params.is_valid(raise_exception=True)
+    filters = params.validated_data
+    fields = job.payload.get("fields")
+
+    user = User.objects.get(pk=job.created_by_id)
+    queryset = JournalingViewSet.export_queryset(
+        readable_patient_ids(user, get_access_graph(user)),
+        filters,
+        fields,
+        job.payload["params"].get("q", "").strip(),
+    )
+    output = filters["output"]
+    lines = JournalingViewSet.export_lines(queryset, output, fields)
+
+    # Em memória até 1 MB, depois em disco
+    with SpooledTemporaryFile(max_size=1024 * 1024) as buffer:
+        for line in lines:
+            buffer.write(line.encode("utf-8"))
+        size = buffer.tell()
+        buffer.seek(0)
+        name = default_storage.save(
+            f"exports/journaling-{job.pk}.{output}", File(buffer)
+        )
+    return {"file": name, "content_type": CONTENT_TYPES[output], "size": size}
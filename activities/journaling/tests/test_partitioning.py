@@ -0,0 +1,125 @@
+import datetime
+import io
+import json
+import unittest
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models.user import RoleChoices
+from core.tests.factories import (
+    UserFactory,
+    RelationshipFactory,
+    AllowedActivityFactory,
+)
+from activities.models import ActivityChoices
+from activities.journaling import partitioning
+from .journaling_factory import JournalingFactory
+
+
+class PartitionNameTests(SimpleTestCase):
+    def test_add_months_crosses_years(self):
+        self.assertEqual(
+            partitioning.add_months(datetime.date(2026, 11, 1), 3),
+            datetime.date(2027, 2, 1),
+        )
+        self.assertEqual(
+            partitioning.add_months(datetime.date(2026, 1, 1), -1),
+            datetime.date(2025, 12, 1),
+        )
+
+    def test_partition_name_round_trip(self):
+        month = datetime.date(2026, 3, 1)
+        name = partitioning.partition_name(month)
+        self.assertEqual(name, "activities_journaling_p2026_03")
+        self.assertEqual(partitioning.partition_month(name), month)
+        self.assertIsNone(partitioning.partition_month(partitioning.DEFAULT_PARTITION))
+
+
+@unittest.skipIf(connection.vendor == "postgresql", "Postgres suporta particionamento")
+class PartitionCommandUnsupportedTests(TestCase):
+    def test_command_requires_postgres(self):
+        with self.assertRaises(CommandError):
+            call_command("journaling_partitions", stdout=io.StringIO())
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "Particionamento exige Postgres")
+class PartitionPruningTests(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.patient
+        )
+        AllowedActivityFactory(
+            relationship=relationship, activity_type=ActivityChoices.journaling
+        )
+        for month in (1, 2, 3):
+            JournalingFactory(patient=self.patient, date=datetime.date(2025, month, 10))
+        # DDL é transacional no Postgres: a conversão é desfeita ao fim do teste
+        partitioning.partition(months_ahead=0)
+
+    def explain_export(self, query):
+        self.client.force_authenticate(user=self.therapist)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("journaling-export") + query)
+            rows = b"".join(response.streaming_content).splitlines()
+        sql = next(q["sql"] for q in queries if "activities_journaling" in q["sql"])
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return rows, scanned_relations(plan[0]["Plan"])
+
+    def test_existing_rows_are_kept_in_monthly_partitions(self):
+        with connection.cursor() as cursor:
+            partitions = partitioning.list_partitions(cursor)
+        self.assertIn("activities_journaling_p2025_01", partitions)
+        self.assertIn("activities_journaling_p2025_03", partitions)
+        self.assertIn(partitioning.DEFAULT_PARTITION, partitions)
+
+    def test_export_date_range_is_pruned(self):
+        rows, relations = self.explain_export(
+            "?date_from=2025-02-01&date_to=2025-02-28"
+        )
+        self.assertEqual(len(rows), 1)
+        journaling_relations = {
+            name for name in relations if name.startswith("activities_journaling")
+        }
+        self.assertEqual(journaling_relations, {"activities_journaling_p2025_02"})
+
+    def test_ensure_partitions_moves_rows_out_of_default(self):
+        future = partitioning.add_months(
+            partitioning.month_start(datetime.date.today()), 6
+        )
+        JournalingFactory(patient=self.patient, date=future)
+        with connection.cursor() as cursor:
+            partitioning.create_partition(cursor, future)
+            cursor.execute(
+                f"SELECT count(*) FROM {partitioning.partition_name(future)}"
+            )
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute(f"SELECT count(*) FROM {partitioning.DEFAULT_PARTITION}")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_command_detaches_old_partitions(self):
+        call_command(
+            "journaling_partitions", "--detach-older-than", "1", stdout=io.StringIO()
+        )
+        with connection.cursor() as cursor:
+            partitions = partitioning.list_partitions(cursor)
+        self.assertNotIn("activities_journaling_p2025_01", partitions)
+
+
+def scanned_relations(plan):
+    relations = set()
+    if "Relation Name" in plan:
+        relations.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        relations |= scanned_relations(child)
+    return relations
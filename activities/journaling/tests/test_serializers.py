@@ -1,6 +1,17 @@
+from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase
-from activities.journaling.serializers import JournalingSerializer
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from activities.journaling.models import Journaling
+from activities.journaling.serializers import (
+    JournalingSerializer,
+    JournalingValuesSerializer,
+)
+from activities.journaling.views import JournalingViewSet
 from core.models.user import User, RoleChoices
+from core.renderers import ORJSONRenderer
+from .journaling_factory import JournalingFactory
 
 
 class JournalingSerializerTests(TestCase):
@@ -33,3 +44,70 @@ class JournalingSerializerTests(TestCase):
         self.assertFalse(serializer.is_valid())
         self.assertIn("title", serializer.errors)
         self.assertIn("date", serializer.errors)
+
+
+class JournalingValuesSerializerTests(TestCase):
+    """A leitura rápida deve produzir exatamente os mesmos bytes."""
+
+    def setUp(self):
+        self.patient = User.objects.create_user(
+            name="test user",
+            email="email@email.com",
+            password="testpassword",
+            role=RoleChoices.patient,
+        )
+        JournalingFactory.create_batch(3, patient=self.patient)
+        JournalingFactory(
+            patient=self.patient,
+            title="Ação —   \"aspas\" e emoji 🙂",
+            resume="",
+            date=None,
+            situation=None,
+            thoughts="",
+            is_active=False,
+        )
+        self.queryset = Journaling.objects.order_by("id")
+
+    def assertSameBytes(self, fields=None, queryset=None):
+        queryset = self.queryset if queryset is None else queryset
+        expected = JournalingSerializer(queryset, many=True, fields=fields).data
+        rows = JournalingValuesSerializer.values(queryset, fields)
+        actual = JournalingValuesSerializer(rows, many=True, fields=fields).data
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    def test_all_fields(self):
+        self.assertSameBytes()
+
+    def test_sparse_fieldsets(self):
+        self.assertSameBytes(["id", "title"])
+        self.assertSameBytes(["date", "patient", "is_active", "thoughts"])
+
+    def test_annotated_preview(self):
+        fields = ["id", "preview"]
+        queryset = JournalingViewSet().project(self.queryset, fields)
+        self.assertSameBytes(fields, queryset)
+
+    def test_single_row(self):
+        instance = self.queryset.first()
+        row = JournalingValuesSerializer.values(self.queryset).first()
+        self.assertEqual(
+            JSONRenderer().render(JournalingValuesSerializer(row).data),
+            JSONRenderer().render(JournalingSerializer(instance).data),
+        )
+
+    def test_unsupported_field_is_rejected(self):
+        class Serializer(JournalingSerializer):
+            summary = serializers.SerializerMethodField()
+
+            class Meta(JournalingSerializer.Meta):
+                fields = ["id", "summary"]
+
+            def get_summary(self, instance):
+                return instance.title
+
+        class ValuesSerializer(JournalingValuesSerializer):
+            serializer_class = Serializer
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer.compile()
@@ -0,0 +1,140 @@
+import json
+from unittest import mock
+
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import add_user_claims
+from core.events import get_broker
+from core.models.user import RoleChoices
+from core.tests.factories import (
+    AllowedActivityFactory,
+    RelationshipFactory,
+    UserFactory,
+)
+from activities.journaling.events import patient_channel
+from activities.journaling.stream import journaling_stream
+from .journaling_factory import JournalingFactory
+
+
+def parse_event(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+class JournalingEventsTestCase(TestCase):
+    def setUp(self):
+        self.entry = JournalingFactory()
+        self.channel = patient_channel(self.entry.patient_id)
+
+    def published(self, action):
+        with mock.patch.object(get_broker(), "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                action()
+        return [
+            (channel, message["event"], message["data"])
+            for (channel, message), _ in publish.call_args_list
+        ]
+
+    def test_update_is_published_after_commit(self):
+        self.entry.title = "Atualizado"
+        [(channel, event, data)] = self.published(self.entry.save)
+        self.assertEqual(channel, self.channel)
+        self.assertEqual(event, "updated")
+        self.assertEqual(data["id"], self.entry.id)
+        self.assertEqual(data["title"], "Atualizado")
+
+    def test_create_and_delete_are_published(self):
+        patient = self.entry.patient
+        [(_, event, data)] = self.published(lambda: JournalingFactory(patient=patient))
+        self.assertEqual(event, "created")
+
+        id = self.entry.id
+        [(channel, event, data)] = self.published(self.entry.delete)
+        self.assertEqual(channel, self.channel)
+        self.assertEqual(event, "deleted")
+        self.assertEqual(data["id"], id)
+
+    def test_nothing_is_published_before_commit(self):
+        with mock.patch.object(get_broker(), "publish") as publish:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.entry.save()
+            publish.assert_not_called()
+            for callback in callbacks:
+                callback()
+        publish.assert_called_once()
+
+
+@override_settings(
+    EVENT_BROKER="core.events.InMemoryBroker",
+    JOURNALING_STREAM_KEEPALIVE_SECONDS=1,
+    JOURNALING_STREAM_MAX_SECONDS=5,
+)
+class JournalingStreamTestCase(TestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        self.other_patient = UserFactory(role=RoleChoices.patient)
+        relationship = RelationshipFactory(therapist=self.therapist, patient=self.patient)
+        AllowedActivityFactory(relationship=relationship)
+        self.token = str(add_user_claims(AccessToken.for_user(self.therapist), self.therapist))
+        self.headers = {"Authorization": f"Bearer {self.token}"}
+        self.factory = AsyncRequestFactory()
+
+    async def open(self, path="/", headers=None):
+        response = await journaling_stream(self.factory.get(path, headers=headers))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        return stream
+
+    def publish(self, patient, event, **data):
+        get_broker().publish(patient_channel(patient.id), {"event": event, "data": data})
+
+    async def test_requires_authentication(self):
+        response = await journaling_stream(self.factory.get("/"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await journaling_stream(self.factory.get("/?access_token=invalid"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_only_get_is_allowed(self):
+        request = self.factory.post("/", headers=self.headers)
+        response = await journaling_stream(request)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_streams_events_of_readable_patients(self):
+        stream = await self.open(headers=self.headers)
+        self.publish(self.other_patient, "created", id=1)
+        self.publish(self.patient, "created", id=2)
+        self.assertEqual(parse_event(await anext(stream)), ("created", {"id": 2}))
+        await stream.aclose()
+
+    async def test_access_token_query_parameter(self):
+        stream = await self.open(f"/?access_token={self.token}")
+        self.publish(self.patient, "deleted", id=3)
+        self.assertEqual(parse_event(await anext(stream)), ("deleted", {"id": 3}))
+        await stream.aclose()
+
+    async def test_keepalive_when_idle(self):
+        stream = await self.open(headers=self.headers)
+        self.assertEqual(await anext(stream), b": keepalive\n\n")
+        await stream.aclose()
+
+    @override_settings(EVENT_QUEUE_SIZE=1)
+    async def test_slow_client_is_told_to_resync(self):
+        stream = await self.open(headers=self.headers)
+        self.publish(self.patient, "created", id=1)
+        self.publish(self.patient, "created", id=2)
+        self.assertEqual(parse_event(await anext(stream)), ("reset", {}))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+
+    async def test_wsgi_request_is_rejected(self):
+        request = RequestFactory().get("/", headers=self.headers)
+        response = await journaling_stream(request)
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertEqual(get_broker().subscriber_count(patient_channel(self.patient.id)), 0)
@@ -1,14 +1,27 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
-from core.models.user import RoleChoices
+from core.access_graph import get_access_graph
+from core.models.user import RoleChoices, User
 from core.tests.factories import (
     UserFactory,
     RelationshipFactory,
     AllowedActivityFactory,
 )
 from activities.models import ActivityChoices
+from activities.journaling.models import Journaling, JournalingTombstone
+from activities.journaling.serializers import JournalingSerializer
+from activities.journaling.sync import delete_expired_tombstones
 from .journaling_factory import JournalingFactory
 
 
@@ -41,7 +54,7 @@ class JournalingViewSetTestCase(APITestCase):
         self.client.force_authenticate(user=self.patient)
         response = self.client.get(reverse("journaling-list"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        ids = [item["id"] for item in response.data]
+        ids = [item["id"] for item in response.data["results"]]
         self.assertIn(self.journaling.id, ids)
         self.assertNotIn(self.other_journaling.id, ids)
 
@@ -49,7 +62,7 @@ class JournalingViewSetTestCase(APITestCase):
         self.client.force_authenticate(user=self.therapist)
         response = self.client.get(reverse("journaling-list"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        ids = [item["id"] for item in response.data]
+        ids = [item["id"] for item in response.data["results"]]
         self.assertIn(self.journaling.id, ids)
         self.assertNotIn(self.other_journaling.id, ids)
 
@@ -91,6 +104,24 @@ class JournalingViewSetTestCase(APITestCase):
         print(response.data)
         self.assertEqual(response.data["patient"], self.patient.id)
 
+    def test_create_requires_journaling_permission(self):
+        url = reverse("journaling-list")
+        self.client.force_authenticate(user=self.other_patient)
+        response = self.client.post(url, {"title": "Sem permissão"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.allowed_activity.delete()
+        self.client.force_authenticate(user=self.patient)
+        response = self.client.post(url, {"title": "Revogado"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_therapist_cannot_create_journaling(self):
+        self.client.force_authenticate(user=self.therapist)
+        response = self.client.post(
+            reverse("journaling-list"), {"title": "Registro"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_patient_can_update_own_journaling(self):
         self.client.force_authenticate(user=self.patient)
         url = reverse("journaling-detail", args=[self.journaling.id])
@@ -132,3 +163,429 @@ class JournalingViewSetTestCase(APITestCase):
         url = reverse("journaling-detail", args=[self.other_journaling.id])
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class JournalingBatchCreateTestCase(APITestCase):
+    def setUp(self):
+        self.patient = UserFactory(role=RoleChoices.patient)
+        self.allowed_activity = AllowedActivityFactory(
+            relationship=RelationshipFactory(patient=self.patient),
+            activity_type=ActivityChoices.journaling,
+        )
+        self.url = reverse("journaling-batch")
+        self.client.force_authenticate(user=self.patient)
+
+    def test_patient_can_create_batch(self):
+        data = [
+            {"title": "Primeiro", "date": "2025-01-01", "thoughts": "..."},
+            {"title": "Segundo", "date": "2025-01-02"},
+        ]
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item["data"]["title"] for item in response.data["results"]],
+            ["Primeiro", "Segundo"],
+        )
+        self.assertEqual(Journaling.objects.filter(patient=self.patient).count(), 2)
+        for item in response.data["results"]:
+            self.assertEqual(item["data"]["patient"], self.patient.id)
+            self.assertIsNotNone(item["data"]["id"])
+
+    def test_batch_is_written_with_a_single_insert(self):
+        data = [{"title": f"Registro {i}"} for i in range(20)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+
+    def test_batch_reports_errors_per_item(self):
+        data = [
+            {"title": "Válido"},
+            {"title": "", "date": "not-a-date"},
+            {"title": "Também válido"},
+        ]
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data["results"]
+        self.assertEqual([item["status"] for item in results], [201, 400, 201])
+        self.assertIn("title", results[1]["errors"])
+        self.assertIn("date", results[1]["errors"])
+        self.assertEqual(Journaling.objects.count(), 2)
+
+    def test_batch_with_only_invalid_items(self):
+        response = self.client.post(self.url, [{"title": ""}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Journaling.objects.count(), 0)
+
+    def test_batch_must_be_a_list(self):
+        response = self.client.post(self.url, {"title": "x"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(JOURNALING_BATCH_MAX_SIZE=2)
+    def test_batch_size_is_limited(self):
+        data = [{"title": f"Registro {i}"} for i in range(3)]
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Journaling.objects.count(), 0)
+
+    def test_batch_requires_journaling_permission(self):
+        self.allowed_activity.is_allowed = False
+        self.allowed_activity.save()
+        response = self.client.post(self.url, [{"title": "x"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Journaling.objects.count(), 0)
+
+    def test_batch_without_login(self):
+        self.client.logout()
+        response = self.client.post(self.url, [{"title": "x"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class JournalingExportTestCase(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        self.other_patient = UserFactory(role=RoleChoices.patient)
+        self.unrelated_patient = UserFactory(role=RoleChoices.patient)
+        RelationshipFactory(therapist=self.therapist, patient=self.patient)
+        RelationshipFactory(therapist=self.therapist, patient=self.other_patient)
+
+        self.january = JournalingFactory(patient=self.patient, date="2025-01-10")
+        self.february = JournalingFactory(patient=self.patient, date="2025-02-10")
+        self.other = JournalingFactory(patient=self.other_patient, date="2025-01-15")
+        self.unrelated = JournalingFactory(patient=self.unrelated_patient)
+
+        self.url = reverse("journaling-export")
+        self.client.force_authenticate(user=self.therapist)
+
+    def read_ndjson(self, response):
+        content = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_export_ndjson_streams_rows(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = self.read_ndjson(response)
+        self.assertEqual(
+            [row["id"] for row in rows],
+            [self.january.id, self.other.id, self.february.id],
+        )
+        self.assertEqual(
+            rows[0], JournalingSerializer(Journaling.objects.get(id=self.january.id)).data
+        )
+
+    def test_export_csv(self):
+        response = self.client.get(self.url, {"output": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["id"], str(self.january.id))
+        self.assertEqual(rows[0]["situation"], self.january.situation)
+
+    def test_export_filters_by_patient_and_date_range(self):
+        response = self.client.get(
+            self.url,
+            {"patient": self.patient.id, "date_from": "2025-01-01", "date_to": "2025-01-31"},
+        )
+        self.assertEqual([row["id"] for row in self.read_ndjson(response)], [self.january.id])
+
+    def test_export_does_not_include_unrelated_patients(self):
+        response = self.client.get(self.url, {"patient": self.unrelated_patient.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.read_ndjson(response), [])
+
+    def test_export_rejects_invalid_filters(self):
+        response = self.client.get(
+            self.url, {"date_from": "2025-02-01", "date_to": "2025-01-01"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"output": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class JournalingProjectionTestCase(APITestCase):
+    def setUp(self):
+        self.patient = UserFactory(role=RoleChoices.patient)
+        AllowedActivityFactory(
+            relationship=RelationshipFactory(patient=self.patient),
+            activity_type=ActivityChoices.journaling,
+        )
+        self.journaling = JournalingFactory(
+            patient=self.patient, resume="", situation="x" * 500
+        )
+        self.client.force_authenticate(user=self.patient)
+
+    def test_list_uses_compact_representation(self):
+        response = self.client.get(reverse("journaling-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = response.data["results"][0]
+        self.assertEqual(
+            set(item), {"id", "title", "date", "patient", "is_active", "preview"}
+        )
+        self.assertEqual(item["preview"], "x" * 140)
+
+    def test_list_does_not_read_large_text_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("journaling-list"))
+        sql = next(q["sql"] for q in queries if "activities_journaling" in q["sql"])
+        for column in ["thoughts", "evidence_favorable", "alternative_behaviors"]:
+            self.assertNotIn(f'"activities_journaling"."{column}"', sql)
+
+    def test_list_with_sparse_fieldset(self):
+        response = self.client.get(reverse("journaling-list"), {"fields": "id,thoughts"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.journaling.id, "thoughts": self.journaling.thoughts}],
+        )
+
+    def test_retrieve_returns_full_representation(self):
+        url = reverse("journaling-detail", args=[self.journaling.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, JournalingSerializer(self.journaling).data)
+        self.assertNotIn("preview", response.data)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse("journaling-list"), {"fields": "id,secret"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class JournalingFastSerializerTestCase(APITestCase):
+    """Com `JOURNALING_FAST_SERIALIZER` as respostas não mudam em nenhum byte."""
+
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        RelationshipFactory(therapist=self.therapist, patient=self.patient)
+        self.entries = JournalingFactory.create_batch(5, patient=self.patient)
+        JournalingFactory(patient=self.patient, date=None, resume="", title="Sono ruim")
+        self.client.force_authenticate(user=self.therapist)
+
+    def get_both(self, url, params=None):
+        responses = []
+        for enabled in (False, True):
+            with override_settings(JOURNALING_FAST_SERIALIZER=enabled):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            responses.append(response)
+        slow, fast = responses
+        self.assertEqual(fast.content, slow.content)
+        self.assertEqual(fast["ETag"], slow["ETag"])
+        return fast
+
+    def test_list_is_identical(self):
+        url = reverse("journaling-list")
+        self.get_both(url)
+        self.get_both(url, {"fields": "id,title,date,thoughts"})
+        self.get_both(url, {"q": "sono"})
+
+    def test_pages_are_identical(self):
+        response = self.get_both(reverse("journaling-list"), {"page_size": 2})
+        while next_url := response.json()["next"]:
+            response = self.get_both(next_url)
+
+    def test_retrieve_is_identical(self):
+        url = reverse("journaling-detail", args=[self.entries[0].id])
+        self.get_both(url)
+        self.get_both(url, {"fields": "id,preview"})
+
+
+class JournalingSearchTestCase(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        RelationshipFactory(therapist=self.therapist, patient=self.patient)
+        self.in_title = JournalingFactory(
+            patient=self.patient, title="Ansiedade no trabalho", situation="Reunião"
+        )
+        self.in_behavior = JournalingFactory(
+            patient=self.patient, title="Domingo", behavior="Senti ansiedade e saí"
+        )
+        self.unrelated = JournalingFactory(
+            patient=self.patient, title="Passeio", situation="Parque", behavior="Corri"
+        )
+        JournalingFactory(title="Ansiedade de outro paciente")
+        self.client.force_authenticate(user=self.therapist)
+
+    def search(self, terms, **params):
+        return self.client.get(reverse("journaling-list"), {"q": terms, **params})
+
+    def test_search_filters_and_ranks_results(self):
+        response = self.search("ansiedade")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [item["id"] for item in response.data["results"]]
+        self.assertEqual(ids, [self.in_title.id, self.in_behavior.id])
+
+    def test_search_without_matches(self):
+        response = self.search("inexistente")
+        self.assertEqual(response.data["results"], [])
+
+    def test_search_results_are_paginated_by_rank(self):
+        first = self.search("ansiedade", page_size=1)
+        self.assertEqual(first.data["results"][0]["id"], self.in_title.id)
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data["results"][0]["id"], self.in_behavior.id)
+        self.assertIsNone(second.data["next"])
+
+        previous = self.client.get(second.data["previous"])
+        self.assertEqual(previous.data["results"][0]["id"], self.in_title.id)
+
+    def test_search_pages_through_equal_ranks(self):
+        tied = JournalingFactory.create_batch(
+            5, patient=self.patient, title="Insônia", situation="Insônia"
+        )
+        seen = []
+        response = self.search("insônia", page_size=2)
+        for _ in range(len(tied)):
+            seen += [item["id"] for item in response.data["results"]]
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(sorted(seen), sorted(entry.id for entry in tied))
+
+    def test_export_applies_search(self):
+        response = self.client.get(
+            reverse("journaling-export"), {"q": "ansiedade", "output": "ndjson"}
+        )
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual([row["id"] for row in rows], [self.in_title.id, self.in_behavior.id])
+
+    def test_blank_query_lists_everything(self):
+        response = self.search("  ")
+        self.assertEqual(len(response.data["results"]), 3)
+
+
+@override_settings(JOURNALING_SYNC_OVERLAP_SECONDS=0)
+class JournalingChangesTestCase(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.patient
+        )
+        AllowedActivityFactory(
+            relationship=relationship, activity_type=ActivityChoices.journaling
+        )
+        self.entries = JournalingFactory.create_batch(3, patient=self.patient)
+        self.other_entry = JournalingFactory()
+        self.url = reverse("journaling-changes")
+        self.client.force_authenticate(user=self.patient)
+
+    def sync(self, cursor=None, **params):
+        if cursor is not None:
+            params["since"] = cursor
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_initial_sync_returns_full_history(self):
+        data = self.sync()
+        self.assertEqual(
+            {item["id"] for item in data["changes"]},
+            {entry.id for entry in self.entries},
+        )
+        self.assertEqual(data["deleted"], [])
+        self.assertFalse(data["has_more"])
+
+    def test_only_changes_since_cursor_are_returned(self):
+        cursor = self.sync()["cursor"]
+        self.assertEqual(self.sync(cursor)["changes"], [])
+
+        self.entries[1].title = "Alterado"
+        self.entries[1].save()
+        new_entry = JournalingFactory(patient=self.patient)
+        data = self.sync(cursor)
+        self.assertEqual(
+            [item["id"] for item in data["changes"]],
+            [self.entries[1].id, new_entry.id],
+        )
+        self.assertEqual(data["changes"][0]["title"], "Alterado")
+
+    def test_deleted_and_deactivated_entries_are_tombstones(self):
+        cursor = self.sync()["cursor"]
+        deleted_id = self.entries[0].id
+        self.entries[0].delete()
+        self.entries[1].is_active = False
+        self.entries[1].save()
+        self.other_entry.delete()
+
+        data = self.sync(cursor)
+        self.assertEqual(data["changes"], [])
+        self.assertEqual(sorted(data["deleted"]), sorted([deleted_id, self.entries[1].id]))
+
+    def test_paginates_with_has_more(self):
+        first = self.sync(page_size=2)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["changes"]), 2)
+        second = self.sync(first["cursor"], page_size=2)
+        self.assertFalse(second["has_more"])
+        self.assertEqual(
+            [item["id"] for item in first["changes"] + second["changes"]],
+            [entry.id for entry in self.entries],
+        )
+
+    def test_therapist_receives_changes_of_their_patients(self):
+        self.client.force_authenticate(user=self.therapist)
+        cursor = self.sync()["cursor"]
+        deleted_id = self.entries[0].id
+        self.entries[0].delete()
+        self.other_entry.delete()
+        self.assertEqual(self.sync(cursor)["deleted"], [deleted_id])
+
+    def test_query_count_does_not_depend_on_history_size(self):
+        cursor = self.sync()["cursor"]
+        JournalingFactory.create_batch(20, patient=self.patient)
+        get_access_graph(self.patient)
+        with self.assertNumQueries(2):
+            data = self.sync(cursor)
+        self.assertEqual(len(data["changes"]), 20)
+
+    @override_settings(JOURNALING_SYNC_OVERLAP_SECONDS=60)
+    def test_recent_changes_are_sent_again(self):
+        cursor = self.sync()["cursor"]
+        self.assertEqual(len(self.sync(cursor)["changes"]), 3)
+
+    def test_expired_cursor_restarts_from_the_beginning(self):
+        cursor = self.sync()["cursor"]
+        self.assertFalse(self.sync(cursor)["reset"])
+
+        with override_settings(JOURNALING_TOMBSTONE_RETENTION_SECONDS=0):
+            data = self.sync(cursor)
+        self.assertTrue(data["reset"])
+        self.assertEqual(len(data["changes"]), 3)
+
+    def test_expired_tombstones_are_deleted(self):
+        expired_id, kept_id = self.entries[0].id, self.entries[1].id
+        self.entries[0].delete()
+        self.entries[1].delete()
+        JournalingTombstone.objects.filter(journaling_id=expired_id).update(
+            deleted_at=timezone.now() - timedelta(days=365)
+        )
+        self.assertEqual(delete_expired_tombstones(), 1)
+        self.assertEqual(
+            list(JournalingTombstone.objects.values_list("journaling_id", flat=True)),
+            [kept_id],
+        )
+
+    def test_deleting_the_patient_leaves_no_tombstones(self):
+        other_patient = JournalingFactory().patient
+        self.patient.delete()
+        User.objects.filter(pk=other_patient.pk).delete()
+        self.assertFalse(JournalingTombstone.objects.exists())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"since": "invalido"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("since", response.data)
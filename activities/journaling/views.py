@@ -1,30 +1,378 @@
-from rest_framework import viewsets
+import csv
+import json
+
+from django.conf import settings
+from django.db.models import Value
+from django.db.models.functions import Coalesce, NullIf, Substr
+from django.http import StreamingHttpResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
-from .models import Journaling
-from .serializers import JournalingSerializer
+from .events import PREVIEW_LENGTH
+from .models import Journaling, JournalingTombstone
+from .search import search_journaling
+from .serializers import (
+    JournalingChangesQuerySerializer,
+    JournalingExportQuerySerializer,
+    JournalingSerializer,
+    JournalingValuesSerializer,
+)
+from .sync import encode_cursor, read_changes
+from activities.models import ActivityChoices
+from core.access_graph import aget_access_graph, get_access_graph
+from core.jobs import enqueue, prefers_async
+from core.models import Relationship
 from core.models.user import RoleChoices
-from core.models.relationship import Relationship
-from core.models.allowed_activity import AllowedActivity
+from core.views.job import accepted_response
+from core.views.mixins import AsyncReadMixin, ConditionalGetMixin
+
+
+class Echo:
+    """Buffer que só devolve o que recebe, para o `csv.writer` gerar linhas."""
+
+    def write(self, value):
+        return value
+
+
+def filter_export(queryset, filters):
+    """Aplica os filtros validados da exportação."""
+    if "patient" in filters:
+        queryset = queryset.filter(patient_id=filters["patient"])
+    if "date_from" in filters:
+        queryset = queryset.filter(date__gte=filters["date_from"])
+    if "date_to" in filters:
+        queryset = queryset.filter(date__lte=filters["date_to"])
+    return queryset
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + "\n"
+
+
+def csv_lines(rows, fieldnames):
+    writer = csv.DictWriter(Echo(), fieldnames=fieldnames)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def readable_patient_ids(user, graph):
+    """Pacientes cujos registros de journaling o usuário pode ler."""
+    if user.role == RoleChoices.patient:
+        if ActivityChoices.journaling not in graph.granted_activity_types():
+            return frozenset()
+        return frozenset([user.id])
+    elif user.role == RoleChoices.therapist:
+        return graph.patient_ids
+    return frozenset()
 
 
-class JournalingViewSet(viewsets.ModelViewSet):
+class JournalingViewSet(ConditionalGetMixin, AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Journaling.objects.all()
     serializer_class = JournalingSerializer
     permission_classes = [IsAuthenticated]
+    pagination_ordering = ("date", "created_at", "id")
+    # Com `?q=`, os resultados vêm do mais relevante para o menos relevante
+    search_ordering = ("-rank", "id")
+    search_actions = ("list", "export")
+    export_chunk_size = 2000
+    # Ações de leitura aceitam `?fields=`; a listagem usa a projeção compacta
+    read_actions = ("list", "retrieve", "export")
+    list_fields = ("id", "title", "date", "patient", "is_active", "preview")
+    preview_length = PREVIEW_LENGTH
+    # Ações lidas com `.values()` e `JournalingValuesSerializer` quando
+    # `JOURNALING_FAST_SERIALIZER` está ligado
+    fast_read_actions = ("list", "retrieve")
 
     def get_queryset(self):
-        user = self.request.user
+        return self.scope_queryset(get_access_graph(self.request.user))
+
+    async def aget_queryset(self):
+        return self.scope_queryset(await aget_access_graph(self.request.user))
 
+    def scope_queryset(self, graph):
+        user = self.request.user
+        patient_ids = self.get_patient_ids(graph)
         if user.role == RoleChoices.patient:
-            permitted_ids = AllowedActivity.objects.filter(
-                relationship__patient=user
-            ).values_list("id", flat=True)
-            return Journaling.objects.filter(id__in=permitted_ids)
+            if not patient_ids:
+                return Journaling.objects.none()
+            queryset = Journaling.objects.filter(patient_id=user.id)
 
         elif user.role == RoleChoices.therapist:
-            patient_ids = Relationship.objects.filter(therapist=user).values_list(
-                "patient", flat=True
+            queryset = Journaling.objects.filter(patient__in=patient_ids)
+
+        terms = self.get_search_terms()
+        if terms and self.action in self.search_actions:
+            queryset = search_journaling(queryset, terms)
+        # O detalhe também lê o validador do `ConditionalGetMixin`
+        extra = (self.last_modified_field,) if self.action == "retrieve" else ()
+        if self.action in self.read_actions:
+            queryset = self.project(queryset, self.get_selected_fields(), extra)
+        if self.use_fast_serializer():
+            ordering = [name.lstrip("-") for name in self.get_pagination_ordering()]
+            queryset = JournalingValuesSerializer.values(
+                queryset, self.get_selected_fields(), extra=[*ordering, *extra]
+            )
+        return queryset
+
+    def use_fast_serializer(self):
+        return (
+            settings.JOURNALING_FAST_SERIALIZER
+            and self.action in self.fast_read_actions
+        )
+
+    def get_patient_ids(self, graph):
+        return readable_patient_ids(self.request.user, graph)
+
+    def check_create_permission(self):
+        """
+        Só o paciente cria registros, e só com o journaling liberado em algum
+        relacionamento: um filtro bit a bit em `Relationship.activity_mask`.
+        """
+        user = self.request.user
+        if user.role != RoleChoices.patient:
+            raise PermissionDenied()
+        relationships = Relationship.objects.filter(patient_id=user.id)
+        if not relationships.allowing(ActivityChoices.journaling).exists():
+            raise PermissionDenied()
+
+    def create(self, request, *args, **kwargs):
+        self.check_create_permission()
+        return super().create(request, *args, **kwargs)
+
+    def get_search_terms(self):
+        return self.request.query_params.get("q", "").strip()
+
+    def get_pagination_ordering(self):
+        if self.get_search_terms():
+            return self.search_ordering
+        return self.pagination_ordering
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.read_actions:
+            kwargs.setdefault("fields", self.get_selected_fields())
+        if self.use_fast_serializer():
+            kwargs.setdefault("context", self.get_serializer_context())
+            return JournalingValuesSerializer(*args, **kwargs)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_selected_fields(self):
+        requested = self.request.query_params.get("fields")
+        if requested:
+            fields = [name.strip() for name in requested.split(",") if name.strip()]
+            unknown = set(fields) - set(JournalingSerializer.Meta.fields)
+            if unknown:
+                raise ValidationError(
+                    {"fields": f"Unknown fields: {', '.join(sorted(unknown))}."}
+                )
+            return fields
+        if self.action == "list":
+            return list(self.list_fields)
+        return None
+
+    @classmethod
+    def project(cls, queryset, fields, extra=()):
+        """
+        Lê do banco só as colunas dos campos escolhidos (mais as da ordenação e
+        `extra`) e calcula `preview` no próprio banco com `Substr`, sem trazer os
+        campos de texto inteiros.
+        """
+        if fields is None:
+            return queryset.defer("search_vector")
+        columns = {field.name for field in Journaling._meta.concrete_fields}
+        queryset = queryset.only(
+            "id",
+            *cls.pagination_ordering,
+            *extra,
+            *(name for name in fields if name in columns),
+        )
+        if "preview" in fields:
+            queryset = queryset.annotate(
+                preview=Substr(
+                    Coalesce(NullIf("resume", Value("")), "situation"),
+                    1,
+                    cls.preview_length,
+                )
+            )
+        return queryset
+
+    @classmethod
+    def export_queryset(cls, patient_ids, filters, fields=None, terms=""):
+        """
+        Registros exportados dos pacientes informados, já buscados, projetados,
+        filtrados e ordenados: usado por `export` e pelo job `journaling.export`.
+        """
+        queryset = Journaling.objects.filter(patient_id__in=patient_ids)
+        ordering = cls.pagination_ordering
+        if terms:
+            queryset = search_journaling(queryset, terms)
+            ordering = cls.search_ordering
+        queryset = filter_export(cls.project(queryset, fields), filters)
+        return queryset.order_by(*ordering)
+
+    @classmethod
+    def export_lines(cls, queryset, output, fields=None):
+        """Linhas NDJSON ou CSV, lendo o queryset em blocos com `iterator()`."""
+        serializer = JournalingSerializer(fields=fields)
+        rows = (
+            serializer.to_representation(instance)
+            for instance in queryset.iterator(chunk_size=cls.export_chunk_size)
+        )
+        if output == "csv":
+            return csv_lines(rows, list(serializer.fields))
+        return ndjson_lines(rows)
+
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """
+        Cria vários registros de uma vez (ex.: fila offline do app).
+
+        Os itens válidos são gravados com um único `bulk_create`; a resposta
+        traz o resultado de cada item na ordem enviada. Responde 201 se todos
+        foram criados, 400 se nenhum foi e 207 se apenas parte foi.
+        """
+        self.check_create_permission()
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"detail": "Expected a list of items."})
+        if len(items) > settings.JOURNALING_BATCH_MAX_SIZE:
+            raise ValidationError(
+                {
+                    "detail": "Batch too large: "
+                    f"maximum is {settings.JOURNALING_BATCH_MAX_SIZE} items."
+                }
+            )
+
+        serializer = self.get_serializer(data=items, many=True)
+        if serializer.is_valid():
+            errors = {}
+            valid = list(enumerate(serializer.validated_data))
+        else:
+            errors = serializer.errors
+            if isinstance(errors, list):
+                errors = dict(enumerate(errors))
+            errors = {index: error for index, error in errors.items() if error}
+            valid = [
+                (index, serializer.child.run_validation(item))
+                for index, item in enumerate(items)
+                if index not in errors
+            ]
+
+        created = serializer.create([data for _, data in valid]) if valid else []
+
+        results = [None] * len(items)
+        for (index, _), instance in zip(valid, created):
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_201_CREATED,
+                "data": serializer.child.to_representation(instance),
+            }
+        for index, error in errors.items():
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_400_BAD_REQUEST,
+                "errors": error,
+            }
+
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif not created:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({"results": results}, status=response_status)
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        """
+        Sincronização incremental para o app offline: registros criados ou
+        alterados depois do cursor `since` (`changes`) e ids excluídos ou
+        desativados (`deleted`). Sem `since`, começa do início do histórico.
+
+        Enquanto `has_more` for verdadeiro, chame de novo com o `cursor`
+        devolvido; ao final, guarde o `cursor` para a próxima sincronização.
+        Com `reset` o cursor expirou e a leitura recomeçou do início.
+        """
+        params = JournalingChangesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        graph = get_access_graph(request.user)
+        queryset = self.scope_queryset(graph).defer("search_vector")
+        tombstones = JournalingTombstone.objects.filter(
+            patient_id__in=self.get_patient_ids(graph)
+        ).only("id", "journaling_id", "deleted_at")
+
+        page = read_changes(
+            queryset,
+            tombstones,
+            params.validated_data.get("since"),
+            params.validated_data["page_size"],
+            settings.JOURNALING_SYNC_OVERLAP_SECONDS,
+            settings.JOURNALING_TOMBSTONE_RETENTION_SECONDS,
+        )
+        serializer = self.get_serializer()
+        return Response(
+            {
+                "changes": [
+                    serializer.to_representation(instance)
+                    for instance in page.entries
+                    if instance.is_active
+                ],
+                "deleted": [
+                    *(instance.id for instance in page.entries if not instance.is_active),
+                    *(tombstone.journaling_id for tombstone in page.tombstones),
+                ],
+                "cursor": encode_cursor(page.cursor),
+                "has_more": page.has_more,
+                "reset": page.reset,
+            }
+        )
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Exporta o histórico em NDJSON (`?output=ndjson`, padrão) ou CSV
+        (`?output=csv`), com filtros opcionais `patient`, `date_from` e
+        `date_to`. As linhas são lidas com `iterator()` e enviadas conforme
+        são geradas, então a memória não cresce com o tamanho do histórico.
+
+        Com `Prefer: respond-async`, responde 202 com o job que gera o
+        arquivo, baixado depois em `/api/jobs/<id>/download/`.
+        """
+        params = JournalingExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        if prefers_async(request):
+            job = enqueue(
+                "journaling.export",
+                {
+                    "params": request.query_params.dict(),
+                    "fields": self.get_selected_fields(),
+                },
+                user=request.user,
+            )
+            return accepted_response(job, request)
+
+        fields = self.get_selected_fields()
+        queryset = self.export_queryset(
+            self.get_patient_ids(get_access_graph(request.user)),
+            filters,
+            fields,
+            self.get_search_terms(),
+        )
+        lines = self.export_lines(queryset, filters["output"], fields)
+
+        if filters["output"] == "csv":
+            response = StreamingHttpResponse(
+                lines, content_type="text/csv; charset=utf-8"
             )
-            [print(i) for i in patient_ids]
-            return Journaling.objects.filter(patient__in=patient_ids)
+            response["Content-Disposition"] = 'attachment; filename="journaling.csv"'
+            return response
+
+        return StreamingHttpResponse(lines, content_type="application/x-ndjson")
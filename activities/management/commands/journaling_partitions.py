@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from activities.journaling import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria as partições mensais futuras de activities_journaling e "
+        "desanexa (ou arquiva) as antigas. Executar periodicamente, ex.: cron diário."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Converte a tabela para particionada, se ainda não for.",
+        )
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=3,
+            help="Quantidade de meses futuros com partição criada (padrão: 3).",
+        )
+        parser.add_argument(
+            "--detach-older-than",
+            type=int,
+            metavar="MONTHS",
+            help="Desanexa as partições de meses anteriores a MONTHS meses atrás.",
+        )
+        parser.add_argument(
+            "--archive-schema",
+            help="Move as partições desanexadas para este schema.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if connections[using].vendor != "postgresql":
+            raise CommandError("O particionamento de journaling exige Postgres.")
+        if options["ahead"] < 0:
+            raise CommandError("--ahead não pode ser negativo.")
+
+        with transaction.atomic(using=using):
+            if options["convert"] and partitioning.partition(options["ahead"], using):
+                self.stdout.write("Tabela convertida para particionada.")
+            with connections[using].cursor() as cursor:
+                if not partitioning.is_partitioned(cursor):
+                    raise CommandError(
+                        "activities_journaling não é particionada; use --convert."
+                    )
+
+            for name in partitioning.ensure_partitions(options["ahead"], using):
+                self.stdout.write(f"Partição criada: {name}")
+
+            if options["detach_older_than"] is not None:
+                detached = partitioning.detach_partitions(
+                    options["detach_older_than"], options["archive_schema"], using
+                )
+                for name in detached:
+                    self.stdout.write(f"Partição desanexada: {name}")
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journaling',
+            index=models.Index(fields=['patient', 'date', 'created_at', 'id'], name='journaling_patient_date_idx'),
+        ),
+    ]
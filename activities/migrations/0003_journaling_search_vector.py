@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:14
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+# Pesos e campos iguais a `activities.journaling.search.SEARCH_WEIGHTS`
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('portuguese', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('portuguese', coalesce({row}situation, '')), 'B') ||
+    setweight(to_tsvector('portuguese', coalesce({row}thoughts, '')), 'B') ||
+    setweight(to_tsvector('portuguese', coalesce({row}emotions, '')), 'C') ||
+    setweight(to_tsvector('portuguese', coalesce({row}behavior, '')), 'C')
+"""
+
+CREATE_SQL = f"""
+CREATE INDEX journaling_search_idx
+    ON activities_journaling USING gin (search_vector);
+
+CREATE FUNCTION activities_journaling_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER activities_journaling_search_vector
+    BEFORE INSERT OR UPDATE OF title, situation, thoughts, emotions, behavior
+    ON activities_journaling
+    FOR EACH ROW EXECUTE FUNCTION activities_journaling_search_vector();
+
+UPDATE activities_journaling SET search_vector = {SEARCH_VECTOR_SQL.format(row="")};
+"""
+
+DROP_SQL = """
+DROP TRIGGER IF EXISTS activities_journaling_search_vector ON activities_journaling;
+DROP FUNCTION IF EXISTS activities_journaling_search_vector();
+DROP INDEX IF EXISTS journaling_search_idx;
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    # Índice GIN e trigger só existem no Postgres; os outros bancos usam o
+    # fallback com `icontains`
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0002_journaling_patient_date_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journaling',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='journaling',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='journaling_search_idx'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_trigger, drop_search_trigger),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import migrations
+
+from activities.journaling import partitioning
+
+
+def partition_journaling(apps, schema_editor):
+    # Opcional e só no Postgres: o estado dos modelos não muda, apenas a
+    # estrutura física da tabela
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql" and settings.JOURNALING_PARTITIONING:
+        partitioning.partition(using=connection.alias)
+
+
+def unpartition_journaling(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        partitioning.unpartition(using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0003_journaling_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_journaling, unpartition_journaling),
+    ]
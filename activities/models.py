@@ -2,4 +2,23 @@ from django.db import models
 
 
 class ActivityChoices(models.TextChoices):
-    journaling = "journaling", "Journaling"
\ No newline at end of file
+    journaling = "journaling", "Journaling"
+
+
+# Bit de cada tipo em `Relationship.activity_mask`, pela posição na enum: tipos
+# novos devem ser acrescentados no fim para não mudar os bits já gravados
+ACTIVITY_BITS = {choice.value: 1 << index for index, choice in enumerate(ActivityChoices)}
+
+
+def activity_mask(activity_types):
+    """Máscara com os bits dos tipos de atividade informados."""
+    mask = 0
+    for activity_type in activity_types:
+        mask |= ACTIVITY_BITS[activity_type]
+    return mask
+
+
+def activity_types_from_mask(mask):
+    return frozenset(
+        activity_type for activity_type, bit in ACTIVITY_BITS.items() if mask & bit
+    )
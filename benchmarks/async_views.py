@@ -0,0 +1,126 @@
+"""
+Vazão da listagem de journaling e relacionamentos com a view síncrona (WSGI,
+uma thread por cliente) e com a view assíncrona (ASGI, uma corrotina por
+cliente) para 50, 200 e 1000 clientes simultâneos.
+
+    python -m benchmarks.async_views --requests 2000 --concurrency 50 200 1000
+
+As requisições passam pelos handlers WSGI e ASGI do Django (com os
+middlewares), sem servidor HTTP. Use um Postgres local (variáveis ENGINE,
+DB_*) para medir a espera no banco; no SQLite as consultas do ORM assíncrono
+são serializadas em uma única thread. O cache de respostas fica desligado,
+senão a listagem de relacionamentos viria do cache.
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.datasets import seed_dataset
+from benchmarks.runner import report, setup_django, summarize, test_database
+
+
+ENDPOINTS = ["journaling", "relationships"]
+
+
+def seed(patients, entries_per_patient):
+    from core.serializers import ClaimsTokenObtainPairSerializer
+
+    dataset = seed_dataset(patients, entries_per_patient)
+    token = ClaimsTokenObtainPairSerializer.get_token(dataset.therapist).access_token
+    return str(token)
+
+
+def run_sync(url, token, total, concurrency):
+    from django.test import Client
+
+    def request(_):
+        client = Client()
+        start = time.perf_counter()
+        response = client.get(url, headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(request, range(concurrency)))
+        start = time.perf_counter()
+        timings = list(executor.map(request, range(total)))
+        elapsed = time.perf_counter() - start
+    return timings, elapsed
+
+
+def run_async(url, token, total, concurrency):
+    from django.test import AsyncClient
+
+    async def main():
+        client = AsyncClient()
+        headers = {"Authorization": f"Bearer {token}"}
+        slots = asyncio.Semaphore(concurrency)
+
+        async def request():
+            async with slots:
+                start = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                assert response.status_code == 200, response.status_code
+                return time.perf_counter() - start
+
+        await asyncio.gather(*(request() for _ in range(concurrency)))
+        start = time.perf_counter()
+        timings = await asyncio.gather(*(request() for _ in range(total)))
+        return timings, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def run(total, levels, patients, entries_per_patient):
+    from django.test import override_settings
+
+    token = seed(patients, entries_per_patient)
+    results = []
+    with override_settings(ROOT_URLCONF="benchmarks.urls", RESPONSE_CACHE_TIMEOUT=0):
+        for endpoint in ENDPOINTS:
+            for concurrency in levels:
+                for mode, runner in [("sync_wsgi", run_sync), ("async_asgi", run_async)]:
+                    timings, elapsed = runner(
+                        f"/{mode.split('_')[0]}/{endpoint}/", token, total, concurrency
+                    )
+                    summary = summarize(timings)
+                    # Com clientes simultâneos a vazão é total / tempo decorrido
+                    summary["requests_per_second"] = round(total / elapsed, 1)
+                    results.append(
+                        {
+                            "endpoint": endpoint,
+                            "mode": mode,
+                            "concurrency": concurrency,
+                            **summary,
+                        }
+                    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--patients", type=int, default=20)
+    parser.add_argument("--entries-per-patient", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        report(
+            {
+                "requests": args.requests,
+                "results": run(
+                    args.requests,
+                    args.concurrency,
+                    args.patients,
+                    args.entries_per_patient,
+                ),
+            }
+        )
+
+
+if __name__ == "__main__":
+    main()
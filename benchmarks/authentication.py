@@ -0,0 +1,70 @@
+"""
+Requisições por segundo com `JWTAuthentication` (busca o usuário no banco) e
+com `ClaimsJWTAuthentication` (usuário montado a partir das claims do token).
+
+    python -m benchmarks.authentication --iterations 2000
+
+O cache de respostas fica desligado: com ele, a listagem viria do cache e
+não haveria consultas a comparar.
+"""
+
+import argparse
+
+from benchmarks.runner import report, setup_django, summarize, test_database, time_calls
+
+
+def run(iterations):
+    from unittest import mock
+
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework.views import APIView
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from core.authentication import ClaimsJWTAuthentication
+    from core.serializers import ClaimsTokenObtainPairSerializer
+    from core.models.user import RoleChoices
+    from core.tests.factories import RelationshipFactory, UserFactory
+
+    therapist = UserFactory(role=RoleChoices.therapist)
+    RelationshipFactory.create_batch(20, therapist=therapist)
+    token = ClaimsTokenObtainPairSerializer.get_token(therapist).access_token
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    url = reverse("relationship-list")
+
+    def request():
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+
+    results = {}
+    for authentication_class in [JWTAuthentication, ClaimsJWTAuthentication]:
+        with mock.patch.object(
+            APIView, "authentication_classes", [authentication_class]
+        ), override_settings(RESPONSE_CACHE_TIMEOUT=0):
+            request()
+            with CaptureQueriesContext(connection) as queries:
+                request()
+            query_count = len(queries)
+            summary = summarize(time_calls(request, iterations))
+            summary["queries_per_request"] = query_count
+            results[authentication_class.__name__] = summary
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        report({"endpoint": "relationship-list", "results": run(args.iterations)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Massa de dados para os benchmarks, gerada com as factories dos testes e
+gravada com `bulk_create`.
+
+O conteúdo é reprodutível: a semente do factory_boy (e do Faker) é fixa, e
+os textos de journaling vêm de um conjunto de registros construídos pela
+`JournalingFactory` e reaproveitados entre os pacientes, para que 1 milhão
+de linhas não dependa de gerar 1 milhão de parágrafos.
+"""
+
+import itertools
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+
+BATCH_SIZE = 1000
+TEXT_POOL_SIZE = 200
+PASSWORD = "testpass123"
+
+
+@dataclass
+class Dataset:
+    therapist: object
+    patients: list = field(default_factory=list)
+    relationships: list = field(default_factory=list)
+    entries: int = 0
+
+
+def seed_dataset(patients, entries_per_patient, seed=0):
+    """
+    Cria um terapeuta com `patients` pacientes, cada um com journaling
+    liberado e `entries_per_patient` registros distribuídos pelo último ano.
+    """
+    import factory.random
+    from django.contrib.auth.hashers import make_password
+
+    from core.models import Relationship
+    from core.models.allowed_activity import AllowedActivity, sync_activity_masks
+    from core.models.user import RoleChoices, User
+    from core.tests.factories import (
+        AllowedActivityFactory,
+        RelationshipFactory,
+        UserFactory,
+    )
+    from activities.journaling.models import Journaling
+
+    factory.random.reseed_random(seed)
+    # Um único hash para todos: o hasher é lento de propósito
+    password = make_password(PASSWORD)
+
+    users = [UserFactory.build(role=RoleChoices.therapist, password=password)]
+    users += [
+        UserFactory.build(role=RoleChoices.patient, password=password)
+        for _ in range(patients)
+    ]
+    therapist, *patient_users = User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+    relationships = Relationship.objects.bulk_create(
+        [
+            RelationshipFactory.build(therapist=therapist, patient=patient)
+            for patient in patient_users
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    AllowedActivity.objects.bulk_create(
+        [
+            AllowedActivityFactory.build(relationship=relationship)
+            for relationship in relationships
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    # `bulk_create` não dispara os sinais que mantêm `activity_mask`
+    sync_activity_masks([relationship.id for relationship in relationships])
+
+    entries = journaling_entries(patient_users, entries_per_patient)
+    while batch := list(itertools.islice(entries, BATCH_SIZE)):
+        Journaling.objects.bulk_create(batch)
+
+    return Dataset(
+        therapist=therapist,
+        patients=patient_users,
+        relationships=relationships,
+        entries=patients * entries_per_patient,
+    )
+
+
+def journaling_entries(patients, entries_per_patient):
+    from activities.journaling.models import Journaling
+    from activities.journaling.tests.journaling_factory import JournalingFactory
+
+    text_fields = [
+        name
+        for name in JournalingFactory._meta.declarations
+        if name not in ("patient", "date", "is_active")
+    ]
+    pool = [
+        {name: getattr(entry, name) for name in text_fields}
+        for entry in JournalingFactory.build_batch(
+            min(TEXT_POOL_SIZE, max(entries_per_patient, 1)), patient=None
+        )
+    ]
+    texts = itertools.cycle(pool)
+    start = date.today() - timedelta(days=365)
+    for patient in patients:
+        for index in range(entries_per_patient):
+            yield Journaling(
+                patient=patient,
+                date=start + timedelta(days=index * 365 // max(entries_per_patient, 1)),
+                **next(texts),
+            )
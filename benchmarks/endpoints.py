@@ -0,0 +1,234 @@
+"""
+Latência (p50/p95), consultas por requisição e pico de memória de cada ação
+dos viewsets, sobre uma massa de dados de tamanho configurável.
+
+    python -m benchmarks.endpoints --patients 500 --entries-per-patient 2000
+
+A saída em JSON inclui o commit e o tamanho da massa, para comparar execuções
+entre commits. Exclusões ficam de fora para não alterar a massa entre as
+iterações; as escritas medidas criam registros novos a cada chamada.
+
+`results` é medido com o cache de respostas desligado, para medir a própria
+view; as listagens que usam o cache também aparecem em `cached_results`,
+servidas do cache a partir da segunda requisição.
+"""
+
+import argparse
+import subprocess
+import tracemalloc
+
+from benchmarks.runner import report, setup_django, summarize, test_database, time_calls
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_scenarios(dataset):
+    """(nome, usuário, método, url, corpo) de cada ação medida."""
+    from django.urls import reverse
+
+    from activities.journaling.models import Journaling
+    from activities.models import ActivityChoices
+    from core.models.allowed_activity import AllowedActivity
+
+    therapist = dataset.therapist
+    patient = dataset.patients[0]
+    relationship = dataset.relationships[0]
+    allowed_activity = AllowedActivity.objects.filter(relationship=relationship).first()
+    entry = Journaling.objects.filter(patient=patient).order_by("id").first()
+    new_entry = {"title": "Benchmark", "date": "2025-01-01", "situation": "Situação"}
+
+    return [
+        ("users.list", therapist, "get", reverse("user-list"), None),
+        ("users.retrieve", therapist, "get", reverse("user-detail", args=[patient.id]), None),
+        ("relationships.list", therapist, "get", reverse("relationship-list"), None),
+        (
+            "relationships.retrieve",
+            therapist,
+            "get",
+            reverse("relationship-detail", args=[relationship.id]),
+            None,
+        ),
+        ("allowed_activities.list", therapist, "get", reverse("allowedactivity-list"), None),
+        (
+            "allowed_activities.retrieve",
+            therapist,
+            "get",
+            reverse("allowedactivity-detail", args=[allowed_activity.id]),
+            None,
+        ),
+        (
+            "allowed_activities.partial_update",
+            therapist,
+            "patch",
+            reverse("allowedactivity-detail", args=[allowed_activity.id]),
+            {"activity_type": ActivityChoices.journaling},
+        ),
+        ("dashboard.list", therapist, "get", reverse("dashboard-list"), None),
+        ("journaling.list.therapist", therapist, "get", reverse("journaling-list"), None),
+        ("journaling.list.patient", patient, "get", reverse("journaling-list"), None),
+        (
+            "journaling.list.offset_deep",
+            therapist,
+            "get",
+            reverse("journaling-list") + f"?offset={max(dataset.entries - 100, 0)}",
+            None,
+        ),
+        (
+            "journaling.list.search",
+            therapist,
+            "get",
+            reverse("journaling-list") + "?q=" + entry.title.split()[0],
+            None,
+        ),
+        (
+            "journaling.retrieve",
+            therapist,
+            "get",
+            reverse("journaling-detail", args=[entry.id]),
+            None,
+        ),
+        (
+            "journaling.export.patient",
+            therapist,
+            "get",
+            reverse("journaling-export") + f"?patient={patient.id}",
+            None,
+        ),
+        ("journaling.changes", patient, "get", reverse("journaling-changes"), None),
+        ("journaling.create", patient, "post", reverse("journaling-list"), new_entry),
+        (
+            "journaling.batch",
+            patient,
+            "post",
+            reverse("journaling-batch"),
+            [new_entry] * 10,
+        ),
+        (
+            "journaling.partial_update",
+            patient,
+            "patch",
+            reverse("journaling-detail", args=[entry.id]),
+            {"title": "Benchmark"},
+        ),
+    ]
+
+
+def uses_response_cache(method, url):
+    from django.urls import resolve
+
+    from core.views.mixins import CachedListMixin
+
+    match = resolve(url.split("?")[0])
+    cls = getattr(match.func, "cls", None)
+    actions = getattr(match.func, "actions", None) or {}
+    return (
+        cls is not None
+        and issubclass(cls, CachedListMixin)
+        and actions.get(method) == "list"
+    )
+
+
+def make_request(user, method, url, data):
+    from rest_framework.test import APIClient
+
+    from core.serializers import ClaimsTokenObtainPairSerializer
+
+    client = APIClient()
+    token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def request():
+        if data is None:
+            response = getattr(client, method)(url)
+        else:
+            response = getattr(client, method)(url, data, format="json")
+        assert response.status_code < 300, (url, response.status_code)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+
+    return request
+
+
+def measure(request, iterations):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    request()
+    with CaptureQueriesContext(connection) as queries:
+        request()
+    query_count = len(queries)
+
+    tracemalloc.start()
+    request()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    summary = summarize(time_calls(request, iterations, warmup=2))
+    summary["queries_per_request"] = query_count
+    summary["peak_memory_kib"] = round(peak / 1024, 1)
+    return summary
+
+
+def run(patients, entries_per_patient, iterations, only=None):
+    import django
+    from django.db import connection
+    from django.test import override_settings
+
+    from benchmarks.datasets import seed_dataset
+
+    dataset = seed_dataset(patients, entries_per_patient)
+    results = {}
+    cached_results = {}
+    for name, user, method, url, data in get_scenarios(dataset):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        request = make_request(user, method, url, data)
+        with override_settings(RESPONSE_CACHE_TIMEOUT=0):
+            results[name] = measure(request, iterations)
+        if uses_response_cache(method, url):
+            cached_results[name] = measure(request, iterations)
+
+    return {
+        "commit": get_commit(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "dataset": {
+            "patients": patients,
+            "entries_per_patient": entries_per_patient,
+            "entries": dataset.entries,
+        },
+        "results": results,
+        "cached_results": cached_results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=50)
+    parser.add_argument("--entries-per-patient", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--only", nargs="+", help="Mede só as ações com esses prefixos (ex.: journaling)"
+    )
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        report(
+            run(args.patients, args.entries_per_patient, args.iterations, args.only)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Tempo de renderização e tamanho da resposta das listagens com o
+`JSONRenderer` do DRF, o `ORJSONRenderer` e o `MessagePackRenderer` (os dois
+últimos só quando o orjson/msgpack estão instalados).
+
+    python -m benchmarks.renderers --patients 50 --entries-per-patient 200 --page-size 100
+
+Os dados de cada listagem são gerados uma vez pela própria view; só a
+renderização é medida.
+"""
+
+import argparse
+
+from benchmarks.runner import report, setup_django, summarize, test_database, time_calls
+
+
+def get_list_data(dataset, page_size):
+    """(nome, dados da resposta) de cada listagem, como o terapeuta as recebe."""
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=dataset.therapist)
+    query = f"?page_size={page_size}"
+    lists = [
+        ("journaling.list", reverse("journaling-list") + query),
+        ("relationships.list", reverse("relationship-list") + query),
+        ("allowed_activities.list", reverse("allowedactivity-list") + query),
+        ("users.list", reverse("user-list") + query),
+    ]
+    data = []
+    for name, url in lists:
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        data.append((name, response.data))
+    return data
+
+
+def get_renderers():
+    from rest_framework.renderers import JSONRenderer
+
+    from core.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+
+    renderers = {"drf_json": JSONRenderer()}
+    if orjson is not None:
+        renderers["orjson"] = ORJSONRenderer()
+    if msgpack is not None:
+        renderers["msgpack"] = MessagePackRenderer()
+    return renderers
+
+
+def run(patients, entries_per_patient, page_size, iterations):
+    from benchmarks.datasets import seed_dataset
+
+    dataset = seed_dataset(patients, entries_per_patient)
+    renderers = get_renderers()
+    results = {}
+    for name, data in get_list_data(dataset, page_size):
+        results[name] = {}
+        for renderer_name, renderer in renderers.items():
+            summary = summarize(time_calls(lambda: renderer.render(data), iterations))
+            summary["bytes"] = len(renderer.render(data))
+            results[name][renderer_name] = summary
+    return {
+        "dataset": {
+            "patients": patients,
+            "entries_per_patient": entries_per_patient,
+            "page_size": page_size,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=50)
+    parser.add_argument("--entries-per-patient", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        report(
+            run(args.patients, args.entries_per_patient, args.page_size, args.iterations)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Tempo para ler e serializar N registros de journaling com o
+`JournalingSerializer` (instâncias do modelo) e com o
+`JournalingValuesSerializer` (linhas de `.values()`), na projeção compacta da
+listagem e com todos os campos.
+
+    python -m benchmarks.serializers --rows 1000 10000 100000
+
+Cada medição inclui a consulta e a montagem dos dicionários, sem a
+renderização (ver `benchmarks.renderers`).
+"""
+
+import argparse
+import math
+
+from benchmarks.runner import report, setup_django, summarize, test_database, time_calls
+
+
+PATIENTS = 10
+
+
+def build_cases():
+    from activities.journaling.models import Journaling
+    from activities.journaling.serializers import (
+        JournalingSerializer,
+        JournalingValuesSerializer,
+    )
+    from activities.journaling.views import JournalingViewSet
+
+    view = JournalingViewSet()
+    ordering = list(view.pagination_ordering)
+
+    def model_serializer(fields):
+        def serialize(rows):
+            queryset = view.project(Journaling.objects.order_by(*ordering), fields)
+            return JournalingSerializer(queryset[:rows], many=True, fields=fields).data
+
+        return serialize
+
+    def values_serializer(fields):
+        def serialize(rows):
+            queryset = view.project(Journaling.objects.order_by(*ordering), fields)
+            queryset = JournalingValuesSerializer.values(queryset, fields, extra=ordering)
+            return JournalingValuesSerializer(
+                queryset[:rows], many=True, fields=fields
+            ).data
+
+        return serialize
+
+    cases = {}
+    for name, fields in [("list", list(view.list_fields)), ("full", None)]:
+        cases[name] = {
+            "model_serializer": model_serializer(fields),
+            "values_serializer": values_serializer(fields),
+        }
+    return cases
+
+
+def run(row_counts, iterations):
+    from benchmarks.datasets import seed_dataset
+
+    largest = max(row_counts)
+    seed_dataset(PATIENTS, math.ceil(largest / PATIENTS))
+    cases = build_cases()
+    results = {}
+    for rows in row_counts:
+        for name, serializers in cases.items():
+            key = f"{name}.{rows}"
+            results[key] = {}
+            for serializer_name, serialize in serializers.items():
+                # Menos repetições nas massas grandes
+                count = max(1, iterations * min(row_counts) // rows)
+                results[key][serializer_name] = summarize(
+                    time_calls(lambda: serialize(rows), count, warmup=1)
+                )
+    return {"dataset": {"rows": largest}, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        report(run(args.rows, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Rotas usadas só pelos benchmarks: as mesmas listagens servidas pela view
+síncrona do DRF e pela view assíncrona de `AsyncReadMixin`.
+"""
+
+from django.urls import path
+
+from activities.journaling.views import JournalingViewSet
+from core.views.relationship import RelationshipViewSet
+
+
+urlpatterns = [
+    path("sync/journaling/", JournalingViewSet.as_view({"get": "list"})),
+    path("async/journaling/", JournalingViewSet.as_async_view({"get": "list"})),
+    path("sync/relationships/", RelationshipViewSet.as_view({"get": "list"})),
+    path("async/relationships/", RelationshipViewSet.as_async_view({"get": "list"})),
+]
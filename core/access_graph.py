@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+
+from core.models.relationship import Relationship
+from activities.models import activity_types_from_mask
+
+
+VERSION_KEY = "access-graph:version:{}"
+
+
+@dataclass(frozen=True)
+class AccessGraph:
+    """
+    Relacionamentos de um usuário e os tipos de atividade liberados em cada um.
+    """
+
+    user_id: int
+    # relationship_id -> (therapist_id, patient_id)
+    relationships: dict = field(default_factory=dict)
+    # relationship_id -> tipos de atividade com is_allowed=True
+    grants: dict = field(default_factory=dict)
+
+    @property
+    def relationship_ids(self):
+        return frozenset(self.relationships)
+
+    @property
+    def patient_ids(self):
+        return frozenset(
+            patient_id
+            for therapist_id, patient_id in self.relationships.values()
+            if therapist_id == self.user_id
+        )
+
+    @property
+    def therapist_ids(self):
+        return frozenset(
+            therapist_id
+            for therapist_id, patient_id in self.relationships.values()
+            if patient_id == self.user_id
+        )
+
+    def is_therapist_of(self, relationship_id):
+        relationship = self.relationships.get(relationship_id)
+        return relationship is not None and relationship[0] == self.user_id
+
+    def granted_activity_types(self, relationship_id=None):
+        if relationship_id is not None:
+            return self.grants.get(relationship_id, frozenset())
+        return frozenset().union(*self.grants.values())
+
+
+def access_graph_rows(user_id):
+    # Sempre do primário: o grafo fica em cache até a próxima invalidação, e
+    # um grafo lido de uma réplica atrasada continuaria desatualizado
+    return (
+        Relationship.objects.using(DEFAULT_DB_ALIAS)
+        .filter(Q(therapist_id=user_id) | Q(patient_id=user_id))
+        .values_list("id", "therapist_id", "patient_id", "activity_mask")
+        .order_by()
+    )
+
+
+def make_access_graph(user_id, rows):
+    relationships = {}
+    grants = {}
+    # Uma linha por relacionamento: os tipos liberados vêm da máscara, sem JOIN
+    # com as linhas de `AllowedActivity`
+    for relationship_id, therapist_id, patient_id, activity_mask in rows:
+        relationships[relationship_id] = (therapist_id, patient_id)
+        grants[relationship_id] = activity_types_from_mask(activity_mask)
+    return AccessGraph(user_id=user_id, relationships=relationships, grants=grants)
+
+
+def build_access_graph(user_id):
+    return make_access_graph(user_id, access_graph_rows(user_id))
+
+
+async def abuild_access_graph(user_id):
+    return make_access_graph(
+        user_id, [row async for row in access_graph_rows(user_id)]
+    )
+
+
+def get_version(user_id):
+    key = VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(user_id):
+    key = VERSION_KEY.format(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def invalidate_access_graph(*user_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Troca a versão dos usuários informados. Um valor novo (e não um contador)
+    evita reaproveitar uma versão antiga caso a chave seja descartada do cache.
+
+    Dentro de uma transação a troca se repete após o commit: até lá outra
+    requisição ainda lê as linhas antigas e guardaria um grafo desatualizado
+    sob a versão nova, sem expiração. A primeira troca serve às leituras da
+    própria transação.
+    """
+
+    def bump():
+        cache.set_many(
+            {VERSION_KEY.format(user_id): time.time_ns() for user_id in user_ids},
+            timeout=None,
+        )
+
+    bump()
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(bump, using=using)
+
+
+class AccessGraphCache:
+    """
+    LRU limitado, por processo, de `AccessGraph` por usuário. Cada entrada
+    guarda a versão com que foi montada e é descartada quando a versão no
+    cache do Django muda, então um cache compartilhado propaga a invalidação
+    entre processos.
+
+    As entradas também expiram após `ttl` segundos: com um cache por processo
+    (LocMem) a troca de versão não chega aos outros processos, e a expiração
+    limita por quanto tempo eles ainda autorizam com um grafo revogado.
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = maxsize or settings.ACCESS_GRAPH_CACHE_SIZE
+        self.ttl = settings.ACCESS_GRAPH_CACHE_TTL if ttl is None else ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        version = get_version(user_id)
+        graph = self._lookup(user_id, version)
+        if graph is None:
+            graph = self._store(user_id, version, build_access_graph(user_id))
+        return graph
+
+    async def aget(self, user_id):
+        version = await aget_version(user_id)
+        graph = self._lookup(user_id, version)
+        if graph is None:
+            graph = self._store(user_id, version, await abuild_access_graph(user_id))
+        return graph
+
+    def _lookup(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if (
+                entry is not None
+                and entry[0] == version
+                and entry[2] > time.monotonic()
+            ):
+                self._entries.move_to_end(user_id)
+                return entry[1]
+        return None
+
+    def _store(self, user_id, version, graph):
+        with self._lock:
+            self._entries[user_id] = (version, graph, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return graph
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+access_graphs = AccessGraphCache()
+
+
+def get_access_graph(user):
+    return access_graphs.get(getattr(user, "pk", user))
+
+
+async def aget_access_graph(user):
+    return await access_graphs.aget(getattr(user, "pk", user))
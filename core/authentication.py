@@ -0,0 +1,125 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.instrumentation import phase
+from core.models.user import User
+
+
+ROLE_CLAIM = "role"
+IS_ACTIVE_CLAIM = "is_active"
+
+
+def add_user_claims(token, user):
+    token[ROLE_CLAIM] = user.role
+    token[IS_ACTIVE_CLAIM] = user.is_active
+    return token
+
+
+class ClaimsUser:
+    """
+    Usuário montado a partir das claims do token, sem consultar o banco.
+
+    Expõe `id`, `pk`, `role` e `is_active`; qualquer outro atributo carrega o
+    `User` completo na primeira vez que for lido.
+    """
+
+    __slots__ = ("id", "role", "is_active", "_instance")
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, id, role, is_active=True):
+        self.id = id
+        self.role = role
+        self.is_active = is_active
+        self._instance = None
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def instance(self):
+        if self._instance is None:
+            self._instance = User.objects.get(pk=self.id)
+        return self._instance
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.instance, name)
+
+    def __eq__(self, other):
+        if isinstance(other, (ClaimsUser, User)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return f"ClaimsUser {self.id}"
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Autenticação JWT que monta `request.user` a partir das claims `role` e
+    `is_active`, sem ir ao banco em cada requisição.
+
+    Tokens sem essas claims e a configuração `CHECK_REVOKE_TOKEN` continuam
+    usando a busca no banco. Como as claims são gravadas na emissão do token,
+    mudanças de papel ou desativação só valem a partir do próximo access token.
+    """
+
+    def authenticate(self, request):
+        with phase("auth"):
+            return super().authenticate(request)
+
+    async def aauthenticate(self, request):
+        """
+        Versão assíncrona de `authenticate` para as views assíncronas; só usa
+        uma thread quando o usuário precisa ser buscado no banco.
+        """
+        with phase("auth"):
+            header = self.get_header(request)
+            if header is None:
+                return None
+            raw_token = self.get_raw_token(header)
+            if raw_token is None:
+                return None
+            validated_token = self.get_validated_token(raw_token)
+            return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if self.uses_database(validated_token):
+            return await sync_to_async(super().get_user)(validated_token)
+        return self.get_claims_user(validated_token)
+
+    def get_user(self, validated_token):
+        if self.uses_database(validated_token):
+            return super().get_user(validated_token)
+        return self.get_claims_user(validated_token)
+
+    def uses_database(self, validated_token):
+        return api_settings.CHECK_REVOKE_TOKEN or ROLE_CLAIM not in validated_token
+
+    def get_claims_user(self, validated_token):
+        try:
+            user_id = User._meta.pk.to_python(
+                validated_token[api_settings.USER_ID_CLAIM]
+            )
+        except (KeyError, ValidationError) as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        is_active = validated_token.get(IS_ACTIVE_CLAIM, True)
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return ClaimsUser(user_id, validated_token[ROLE_CLAIM], is_active)
+
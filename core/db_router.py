@@ -0,0 +1,49 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+# Banco usado para leituras na requisição atual; None fora do
+# `ReplicaRoutingMiddleware` (comandos, workers, shell), que leem do primário
+_read_database = ContextVar("read_database", default=None)
+
+
+def choose_replica():
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def read_from(alias):
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Leituras vão para o banco escolhido pelo `ReplicaRoutingMiddleware` para a
+    requisição (uma réplica de `DATABASE_REPLICAS` ou o primário); escritas
+    sempre para o primário, inclusive de objetos lidos de uma réplica.
+
+    Não há `allow_migrate`: `migrate` roda no primário e a replicação leva o
+    esquema às réplicas; nos testes as réplicas espelham o primário.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
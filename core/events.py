@@ -0,0 +1,196 @@
+"""
+Pub/sub de eventos para as conexões de streaming (SSE).
+
+`publish` pode ser chamado de qualquer thread (views síncronas, sinais,
+workers); cada assinatura pertence ao event loop que a criou e recebe as
+mensagens em uma fila própria, sem ocupar threads enquanto espera.
+
+O backend é escolhido por `EVENT_BROKER`: `InMemoryBroker` entrega só dentro
+do processo (desenvolvimento, testes e servidores com um único processo);
+`PostgresBroker` repassa as mensagens entre processos com LISTEN/NOTIFY.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+# Entregue no lugar das mensagens descartadas quando a fila enche: o cliente
+# deve se ressincronizar (ex.: com `journaling/changes/`)
+OVERFLOW = object()
+
+
+class Subscription:
+    """Fila de mensagens de um conjunto de canais, ligada a um event loop."""
+
+    def __init__(self, broker, channels, queue_size):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def put(self, message):
+        """Thread-safe: agenda a entrega no loop da assinatura."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Loop já encerrado; a assinatura é descartada
+            self.close()
+
+    def _put(self, message):
+        if self.queue.full():
+            # Cliente lento: descarta o que estava pendente e avisa
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = OVERFLOW
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Próxima mensagem, ou None se nada chegar em `timeout` segundos."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broker.unsubscribe(self)
+
+
+class BaseBroker:
+    """
+    Interface dos backends: `publish(channel, message)` com uma mensagem
+    serializável pelo `DjangoJSONEncoder` e `subscribe(channels)`, chamado
+    dentro de um event loop, devolvendo uma `Subscription`.
+    """
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def subscribe(self, channels):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class InMemoryBroker(BaseBroker):
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.EVENT_QUEUE_SIZE
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels, self.queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscriptions.get(channel, ()))
+
+
+class PostgresBroker(InMemoryBroker):
+    """
+    Entre processos via LISTEN/NOTIFY do Postgres (requer psycopg 3).
+
+    `publish` faz `pg_notify` na conexão do Django, então a mensagem só é
+    entregue após o commit da transação atual. Cada processo mantém uma única
+    conexão assíncrona escutando o canal e distribui as mensagens para as
+    assinaturas locais. O payload do NOTIFY é limitado a 8000 bytes.
+    """
+
+    notify_channel = "behavior_stream_events"
+
+    def __init__(self, queue_size=None, using=DEFAULT_DB_ALIAS):
+        super().__init__(queue_size)
+        self.using = using
+        self._listeners = {}
+
+    def publish(self, channel, message):
+        payload = json.dumps(
+            {"channel": channel, "message": message}, cls=DjangoJSONEncoder
+        )
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.notify_channel, payload])
+
+    def subscribe(self, channels):
+        loop = asyncio.get_running_loop()
+        listener = self._listeners.get(loop)
+        if listener is None or listener.done():
+            self._listeners[loop] = loop.create_task(self.listen())
+        return super().subscribe(channels)
+
+    async def listen(self):
+        import psycopg
+        from psycopg.conninfo import make_conninfo
+
+        db = connections[self.using].settings_dict
+        conninfo = make_conninfo(
+            dbname=db["NAME"],
+            user=db["USER"] or None,
+            password=db["PASSWORD"] or None,
+            host=db["HOST"] or None,
+            port=db["PORT"] or None,
+        )
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    conninfo, autocommit=True
+                ) as connection:
+                    await connection.execute(f"LISTEN {self.notify_channel}")
+                    async for notify in connection.notifies():
+                        payload = json.loads(notify.payload)
+                        super().publish(payload["channel"], payload["message"])
+            except psycopg.OperationalError:
+                logger.warning("Event listener lost its connection; reconnecting")
+                await asyncio.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.EVENT_BROKER)()
+        return _broker
+
+
+@receiver(setting_changed)
+def reset_broker(setting, **kwargs):
+    global _broker
+    if setting in ("EVENT_BROKER", "EVENT_QUEUE_SIZE"):
+        _broker = None
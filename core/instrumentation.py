@@ -0,0 +1,66 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Consultas e tempos por fase de uma requisição, preenchidos enquanto o
+    `ServerTimingMiddleware` está ativo.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.timings = {}
+        self.view_name = None
+        self._active = set()
+
+    def add(self, name, duration):
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+
+    def __call__(self, execute, sql, params, many, context):
+        # Usado como `connection.execute_wrapper`
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.add("db", time.perf_counter() - start)
+
+
+def get_metrics():
+    return _current_metrics.get()
+
+
+@contextmanager
+def collect_metrics():
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """
+    Soma o tempo do bloco na fase `name` da requisição atual. Chamadas
+    aninhadas da mesma fase (ex.: um serializer dentro de outro) contam uma
+    vez só; fora do middleware não faz nada.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or name in metrics._active:
+        yield
+        return
+
+    metrics._active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(name, time.perf_counter() - start)
+        metrics._active.discard(name)
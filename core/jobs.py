@@ -0,0 +1,277 @@
+"""
+Fila de jobs no banco, para tarefas demoradas que não cabem no ciclo da
+requisição (exportações, exclusões em cascata grandes etc.).
+
+A view registra um `Job` com `enqueue` e responde 202; o worker
+(`python manage.py run_jobs`) reserva os jobs pendentes com
+`SELECT ... FOR UPDATE SKIP LOCKED`, então vários workers podem rodar ao
+mesmo tempo sem pegar o mesmo job, e os executa em um pool de threads. Uma
+falha é tentada de novo após um intervalo que dobra a cada tentativa, até
+`max_attempts`. Não depende de Redis nem de Celery: só do banco.
+
+As tarefas são funções registradas com `@task("nome")`, que recebem o `Job`
+e devolvem um resultado serializável em JSON.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from activities.journaling.sync import delete_expired_tombstones
+from core.models.job import Job, JobStatus
+
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+def task(name):
+    """Registra a função decorada como a tarefa `name`."""
+
+    def register(func):
+        if name in _tasks and _tasks[name] is not func:
+            raise ValueError(f"Task {name!r} is already registered")
+        _tasks[name] = func
+        return func
+
+    return register
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f"Unknown task {name!r}") from None
+
+
+def enqueue(name, payload=None, user=None, max_attempts=None, delay=0):
+    """
+    Cria o job da tarefa `name`. Dentro de uma transação, o worker só o vê
+    depois do commit.
+    """
+    get_task(name)
+    return Job.objects.create(
+        task=name,
+        payload=payload or {},
+        created_by_id=getattr(user, "pk", user),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def prefers_async(request):
+    """Se o cliente pediu resposta assíncrona com `Prefer: respond-async`."""
+    preferences = request.headers.get("Prefer", "")
+    return any(
+        preference.split(";")[0].strip().lower() == "respond-async"
+        for preference in preferences.split(",")
+    )
+
+
+def retry_delay(attempts):
+    """Segundos até a próxima tentativa: a base dobra a cada falha."""
+    delay = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0)
+    return min(delay, settings.JOB_RETRY_BACKOFF_MAX_SECONDS)
+
+
+def claim_jobs(worker_id, limit, using=DEFAULT_DB_ALIAS):
+    """
+    Reserva até `limit` jobs pendentes para `worker_id`. Linhas travadas por
+    outro worker são puladas em vez de esperadas (no SQLite, que não tem
+    `FOR UPDATE`, a transação de escrita já serializa os workers).
+    """
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        jobs = list(
+            Job.objects.using(using)
+            .select_for_update(skip_locked=True)
+            .filter(status=JobStatus.pending, run_after__lte=now)
+            .order_by("run_after", "id")[:limit]
+        )
+        if not jobs:
+            return []
+        Job.objects.using(using).filter(pk__in=[job.pk for job in jobs]).update(
+            status=JobStatus.running,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+    for job in jobs:
+        job.status = JobStatus.running
+        job.locked_by = worker_id
+        job.locked_at = now
+        job.attempts += 1
+    return jobs
+
+
+def release_stale_jobs(using=DEFAULT_DB_ALIAS):
+    """
+    Devolve à fila os jobs `running` há mais de `JOB_LOCK_TIMEOUT_SECONDS`
+    (worker encerrado no meio da execução); os que já esgotaram as
+    tentativas são marcados como `failed`.
+    """
+    now = timezone.now()
+    stale = Job.objects.using(using).filter(
+        status=JobStatus.running,
+        locked_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS),
+    )
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=JobStatus.failed,
+        error="Worker lost while running the job.",
+        locked_by="",
+        locked_at=None,
+        finished_at=now,
+        updated_at=now,
+    )
+    released = stale.update(
+        status=JobStatus.pending,
+        locked_by="",
+        locked_at=None,
+        run_after=now,
+        updated_at=now,
+    )
+    return released + failed
+
+
+def delete_expired_jobs(using=DEFAULT_DB_ALIAS):
+    """
+    Apaga os jobs terminados há mais de `JOB_RESULT_RETENTION_SECONDS`, com
+    os arquivos que geraram (`result.file`, ex.: exportações).
+    """
+    expired = list(
+        Job.objects.using(using)
+        .filter(
+            status__in=[JobStatus.succeeded, JobStatus.failed],
+            finished_at__lt=timezone.now()
+            - timedelta(seconds=settings.JOB_RESULT_RETENTION_SECONDS),
+        )
+        .values_list("pk", "result")
+    )
+    for pk, result in expired:
+        name = (result or {}).get("file")
+        if name:
+            default_storage.delete(name)
+    Job.objects.using(using).filter(pk__in=[pk for pk, result in expired]).delete()
+    return len(expired)
+
+
+def run_job(job, using=DEFAULT_DB_ALIAS):
+    """Executa um job já reservado e grava o resultado ou a falha."""
+    try:
+        result = get_task(job.task)(job)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job.pk, job.task)
+        now = timezone.now()
+        job.error = f"{type(e).__name__}: {e}"
+        if job.attempts < job.max_attempts:
+            job.status = JobStatus.pending
+            job.run_after = now + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status = JobStatus.failed
+            job.finished_at = now
+    else:
+        now = timezone.now()
+        job.status = JobStatus.succeeded
+        job.result = result
+        job.error = ""
+        job.finished_at = now
+
+    # Só grava se o job ainda for deste worker (não foi liberado como órfão)
+    Job.objects.using(using).filter(
+        pk=job.pk, status=JobStatus.running, locked_by=job.locked_by
+    ).update(
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        run_after=job.run_after,
+        locked_by="",
+        locked_at=None,
+        finished_at=job.finished_at,
+        updated_at=now,
+    )
+    job.locked_by = ""
+    job.locked_at = None
+    return job
+
+
+class Worker:
+    """
+    Executa jobs em até `concurrency` threads, buscando novos a cada
+    `poll_interval` segundos enquanto houver threads livres. A cada
+    `cleanup_interval` segundos apaga os jobs expirados e as marcas de
+    exclusão de journaling além do horizonte de sincronização.
+    """
+
+    cleanup_interval = 60
+
+    def __init__(self, concurrency=None, poll_interval=None, using=DEFAULT_DB_ALIAS):
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL_SECONDS
+        self.using = using
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stop_event = threading.Event()
+        self.next_cleanup = 0
+
+    def execute(self, job):
+        try:
+            return run_job(job, using=self.using)
+        finally:
+            close_old_connections()
+
+    def cleanup(self):
+        now = time.monotonic()
+        if now >= self.next_cleanup:
+            self.next_cleanup = now + self.cleanup_interval
+            delete_expired_jobs(using=self.using)
+            delete_expired_tombstones(using=self.using)
+
+    def run_once(self):
+        """
+        Executa, na thread atual, os jobs disponíveis agora e devolve quantos
+        foram (para `run_jobs --once`, cron e testes).
+        """
+        count = 0
+        self.cleanup()
+        release_stale_jobs(using=self.using)
+        while jobs := claim_jobs(self.id, self.concurrency, using=self.using):
+            for job in jobs:
+                run_job(job, using=self.using)
+            count += len(jobs)
+        return count
+
+    def run(self):
+        """Roda até `stop()`, terminando os jobs em andamento."""
+        logger.info("Job worker %s started", self.id)
+        running = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while not self.stop_event.is_set():
+                self.cleanup()
+                release_stale_jobs(using=self.using)
+                free = self.concurrency - len(running)
+                jobs = claim_jobs(self.id, free, using=self.using) if free else []
+                running.update(pool.submit(self.execute, job) for job in jobs)
+                close_old_connections()
+                if running:
+                    running = wait(
+                        running, timeout=self.poll_interval, return_when=FIRST_COMPLETED
+                    ).not_done
+                else:
+                    self.stop_event.wait(self.poll_interval)
+            wait(running)
+        logger.info("Job worker %s stopped", self.id)
+
+    def stop(self):
+        self.stop_event.set()
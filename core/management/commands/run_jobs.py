@@ -0,0 +1,67 @@
+import signal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Executa os jobs em segundo plano (exportações, exclusões grandes). "
+        "Pode haver vários workers ao mesmo tempo; SIGTERM ou Ctrl+C encerra "
+        "depois de terminar os jobs em andamento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="Jobs executados em paralelo (padrão: JOB_WORKER_CONCURRENCY).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            help="Segundos entre as buscas por jobs novos "
+            "(padrão: JOB_POLL_INTERVAL_SECONDS).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Executa os jobs disponíveis agora e sai (ex.: via cron).",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options["concurrency"] is not None and options["concurrency"] < 1:
+            raise CommandError("--concurrency deve ser ao menos 1.")
+        # Os jobs gravam pelos mesmos sinais das views, que invalidam o grafo
+        # de acesso e as respostas no cache: um cache por processo deixaria os
+        # servidores web com dados antigos
+        if isinstance(caches["default"], LocMemCache):
+            raise CommandError(
+                "O worker precisa de um cache compartilhado com os servidores "
+                "web: defina CACHE_URL (ex.: filecache:///var/tmp/behavior_stream_cache)."
+            )
+        if settings.EVENT_BROKER == "core.events.InMemoryBroker":
+            self.stderr.write(
+                "Aviso: com core.events.InMemoryBroker os eventos dos jobs não "
+                "chegam ao stream de journaling; use core.events.PostgresBroker."
+            )
+        worker = Worker(
+            concurrency=options["concurrency"],
+            poll_interval=options["poll_interval"],
+            using=options["database"],
+        )
+        if options["once"]:
+            count = worker.run_once()
+            self.stdout.write(f"{count} job(s) executado(s).")
+            return
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: worker.stop())
+        self.stdout.write(f"Worker {worker.id} aguardando jobs.")
+        worker.run()
@@ -0,0 +1,200 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from core.db_router import choose_replica, read_from
+from core.instrumentation import collect_metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """
+    Conta e cronometra as consultas SQL de cada requisição (via
+    `execute_wrapper` em todas as conexões) e devolve, no cabeçalho
+    `Server-Timing`, o tempo de banco, autenticação, serialização e o total.
+
+    Requisições acima de `SLOW_REQUEST_QUERY_COUNT` consultas ou
+    `SLOW_REQUEST_MS` milissegundos são registradas no log com o nome da
+    view e a ação (ex.: `JournalingViewSet.list`). Ativado com
+    `SERVER_TIMING = True`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with collect_metrics() as metrics, self.instrument_queries(metrics):
+            request.metrics = metrics
+            response = self.get_response(request)
+        return self.finish(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with collect_metrics() as metrics:
+            request.metrics = metrics
+            # As conexões são por thread: os wrappers precisam ser instalados
+            # na thread onde o ORM assíncrono executa as consultas
+            queries = await sync_to_async(self.instrument_queries)(metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(queries.close)()
+        return self.finish(request, response, metrics, start)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, "metrics", None)
+        if metrics is not None:
+            metrics.view_name = get_view_name(request, view_func)
+
+    def instrument_queries(self, metrics):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+        return stack.pop_all()
+
+    def finish(self, request, response, metrics, start):
+        metrics.add("total", time.perf_counter() - start)
+        response["Server-Timing"] = format_server_timing(metrics)
+
+        total_ms = metrics.timings["total"] * 1000
+        if (
+            metrics.queries > settings.SLOW_REQUEST_QUERY_COUNT
+            or total_ms > settings.SLOW_REQUEST_MS
+        ):
+            logger.warning(
+                "Slow request %s %s (%s): %.1f ms, %d queries, %s",
+                request.method,
+                request.path,
+                metrics.view_name or "-",
+                total_ms,
+                metrics.queries,
+                format_server_timing(metrics),
+            )
+        return response
+
+
+def get_view_name(request, view_func):
+    """`Classe.ação` para viewsets do DRF, `Classe` para views de classe."""
+    cls = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    if cls is None:
+        return getattr(view_func, "__name__", None)
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(request.method.lower())
+    return f"{cls.__name__}.{action}" if action else cls.__name__
+
+
+def format_server_timing(metrics):
+    entries = []
+    for name, duration in metrics.timings.items():
+        entry = f"{name};dur={duration * 1000:.1f}"
+        if name == "db":
+            entry += f';desc="{metrics.queries} queries"'
+        entries.append(entry)
+    if "db" not in metrics.timings:
+        entries.insert(0, 'db;dur=0.0;desc="0 queries"')
+    return ", ".join(entries)
+
+
+PIN_KEY = "db:primary-pin:{}"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Escolhe o banco de leitura de cada requisição para o `ReplicaRouter`:
+    métodos seguros leem de uma réplica e os demais do primário.
+
+    Depois de uma escrita bem-sucedida o cliente (usuário do token JWT ou a
+    sessão) fica preso ao primário por `REPLICA_STICKINESS_SECONDS`, para não
+    ler dados que a réplica ainda não recebeu. A marca fica no cache do
+    Django, que deve ser compartilhado entre os processos.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.authentication = JWTAuthentication()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        client = self.get_client(request)
+        with read_from(self.get_read_database(request, cache.get_many(client))):
+            response = self.get_response(request)
+        if self.should_pin(request, response):
+            cache.set_many(dict.fromkeys(client, True), settings.REPLICA_STICKINESS_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        client = self.get_client(request)
+        pinned = await cache.aget_many(client)
+        with read_from(self.get_read_database(request, pinned)):
+            response = await self.get_response(request)
+        if self.should_pin(request, response):
+            await cache.aset_many(
+                dict.fromkeys(client, True), settings.REPLICA_STICKINESS_SECONDS
+            )
+        return response
+
+    def get_client(self, request):
+        """Chaves de cache que identificam quem fez a requisição."""
+        keys = []
+        user_id = self.get_token_user_id(request)
+        if user_id is not None:
+            keys.append(PIN_KEY.format(f"user:{user_id}"))
+        session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if session_key:
+            keys.append(PIN_KEY.format(f"session:{session_key}"))
+        return keys
+
+    def get_token_user_id(self, request):
+        # Validar o token não consulta o banco; a autenticação de fato (e a
+        # resposta 401 para um cabeçalho inválido) continua nas views
+        try:
+            header = self.authentication.get_header(request)
+            raw_token = header and self.authentication.get_raw_token(header)
+            if not raw_token:
+                return None
+            token = self.authentication.get_validated_token(raw_token)
+        except (AuthenticationFailed, InvalidToken, TokenError):
+            return None
+        return token.get(api_settings.USER_ID_CLAIM)
+
+    def get_read_database(self, request, pinned):
+        if request.method not in SAFE_METHODS or pinned:
+            return DEFAULT_DB_ALIAS
+        return choose_replica()
+
+    def should_pin(self, request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 400
@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def remove_duplicates(apps, schema_editor):
+    Relationship = apps.get_model("core", "Relationship")
+    AllowedActivity = apps.get_model("core", "AllowedActivity")
+
+    # Mantém o relacionamento mais antigo e move as permissões dos duplicados
+    duplicated = (
+        Relationship.objects.values("therapist", "patient")
+        .annotate(keep=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for row in duplicated:
+        extra = Relationship.objects.filter(
+            therapist=row["therapist"], patient=row["patient"]
+        ).exclude(id=row["keep"])
+        AllowedActivity.objects.filter(relationship__in=extra).update(
+            relationship=row["keep"]
+        )
+        extra.delete()
+
+    duplicated = (
+        AllowedActivity.objects.values("relationship", "activity_type")
+        .annotate(keep=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for row in duplicated:
+        AllowedActivity.objects.filter(
+            relationship=row["relationship"], activity_type=row["activity_type"]
+        ).exclude(id=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0002_remove_duplicate_access_rows'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'created_at', 'id'], name='user_role_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='allowedactivity',
+            constraint=models.UniqueConstraint(fields=('relationship', 'activity_type'), name='unique_allowed_activity'),
+        ),
+        migrations.AddConstraint(
+            model_name='relationship',
+            constraint=models.UniqueConstraint(fields=('therapist', 'patient'), name='unique_relationship'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+from activities.models import ACTIVITY_BITS
+
+
+BATCH_SIZE = 1000
+
+
+def fill_activity_masks(apps, schema_editor):
+    Relationship = apps.get_model("core", "Relationship")
+    AllowedActivity = apps.get_model("core", "AllowedActivity")
+
+    masks = {}
+    granted = AllowedActivity.objects.filter(is_allowed=True).values_list(
+        "relationship_id", "activity_type"
+    )
+    for relationship_id, activity_type in granted.iterator():
+        masks[relationship_id] = masks.get(relationship_id, 0) | ACTIVITY_BITS.get(
+            activity_type, 0
+        )
+
+    # Um UPDATE por valor de máscara (e lote de ids), não por relacionamento
+    by_mask = {}
+    for relationship_id, mask in masks.items():
+        by_mask.setdefault(mask, []).append(relationship_id)
+    for mask, ids in by_mask.items():
+        for start in range(0, len(ids), BATCH_SIZE):
+            Relationship.objects.filter(pk__in=ids[start : start + BATCH_SIZE]).update(
+                activity_mask=mask
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relationship',
+            name='activity_mask',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_activity_masks, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from .user import User
 from .relationship import Relationship
+from .job import Job
 
 # Se houver mais modelos, continue importando-os aqui
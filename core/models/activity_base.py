@@ -16,6 +16,10 @@ class ActivityBase(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Valor de `ActivityChoices` do tipo; também identifica as linhas na
+    # linha do tempo do paciente (`core.timeline`)
+    activity_type = None
+
     class Meta:
         abstract = True
 
@@ -1,7 +1,35 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 
 from core.models.relationship import Relationship
-from activities.models import ActivityChoices
+from activities.models import ACTIVITY_BITS, ActivityChoices
+
+
+def sync_activity_masks(relationship_ids, using=None):
+    """
+    Recalcula `Relationship.activity_mask` a partir das linhas liberadas de
+    `AllowedActivity`, com um único UPDATE. Cada tipo aparece no máximo uma
+    vez por relacionamento, então a soma dos bits equivale ao OU.
+    """
+    bits = Case(
+        *(
+            When(activity_type=activity_type, then=Value(bit))
+            for activity_type, bit in ACTIVITY_BITS.items()
+        ),
+        default=Value(0),
+    )
+    masks = (
+        AllowedActivity.objects.filter(relationship_id=OuterRef("pk"), is_allowed=True)
+        .order_by()
+        .values("relationship_id")
+        .annotate(mask=Sum(bits))
+        .values("mask")
+    )
+    manager = Relationship.objects.db_manager(using)
+    return manager.filter(pk__in=set(relationship_ids)).update(
+        activity_mask=Coalesce(Subquery(masks), Value(0))
+    )
 
 
 class AllowedActivity(models.Model):
@@ -17,6 +45,27 @@ class AllowedActivity(models.Model):
     )
     is_allowed = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["relationship", "activity_type"],
+                name="unique_allowed_activity",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Para recalcular a máscara do relacionamento anterior se ele mudar
+        instance._loaded_relationship_id = instance.__dict__.get("relationship_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # O sinal `post_save` (que atualiza a máscara) roda na mesma transação
+        with transaction.atomic(using=kwargs.get("using") or self._state.db):
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.relationship.therapist.email} -> {self.relationship.patient.email} | {self.activity_type}"
@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils import timezone
+
+from .user import User
+
+
+class JobStatus(models.TextChoices):
+    pending = "pending", "Pending"
+    running = "running", "Running"
+    succeeded = "succeeded", "Succeeded"
+    failed = "failed", "Failed"
+
+
+class Job(models.Model):
+    """
+    Tarefa demorada executada fora da requisição por `manage.py run_jobs`.
+
+    `task` é o nome registrado em `core.jobs`; `payload` e `result` são JSON.
+    Um job `pending` só é executado a partir de `run_after`, que também adia
+    as novas tentativas após uma falha.
+    """
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=20, choices=JobStatus.choices, default=JobStatus.pending
+    )
+    created_by = models.ForeignKey(
+        User, related_name="jobs", null=True, on_delete=models.SET_NULL
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Busca dos próximos jobs pelo worker
+            models.Index(fields=["status", "run_after", "id"], name="job_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
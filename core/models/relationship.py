@@ -1,6 +1,15 @@
 from django.db import models
+from django.db.models import F
 
 from .user import User
+from activities.models import ACTIVITY_BITS
+
+
+class RelationshipQuerySet(models.QuerySet):
+    def allowing(self, activity_type):
+        """Relacionamentos com `activity_type` liberado (bit a bit, no banco)."""
+        bit = ACTIVITY_BITS[activity_type]
+        return self.alias(granted=F("activity_mask").bitand(bit)).filter(granted=bit)
 
 
 class Relationship(models.Model):
@@ -16,8 +25,31 @@ class Relationship(models.Model):
         on_delete=models.CASCADE,
         limit_choices_to={"role": "patient"},
     )
+    # Tipos de atividade liberados (bits de `ACTIVITY_BITS`), mantido pelas
+    # escritas em `AllowedActivity` na mesma transação
+    activity_mask = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RelationshipQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["therapist", "patient"], name="unique_relationship"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Uma instância antiga não sobrescreve a máscara, que só muda por
+        # `sync_activity_masks`
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "activity_mask"
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.therapist.email} - {self.patient.email}"
@@ -44,5 +44,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["role"]
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["role", "created_at", "id"], name="user_role_idx"),
+        ]
+
     def __str__(self):
         return self.email
@@ -0,0 +1,271 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+Cursor = namedtuple("Cursor", ["values", "reverse"])
+
+
+class CappedLimitOffsetPagination(LimitOffsetPagination):
+    max_limit = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) sobre uma chave de ordenação estável.
+
+    Cada página filtra a partir dos valores da última linha da página anterior,
+    então a página N custa o mesmo que a página 1. A ordenação é lida de
+    `view.get_pagination_ordering()` (ou `view.pagination_ordering`) e deve
+    terminar em um campo único (ex.: `id`); anotações do queryset também podem
+    fazer parte da chave.
+    A paginação por offset continua disponível quando o cliente envia `?offset=`.
+    """
+
+    ordering = ("created_at", "id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+    offset_pagination_class = CappedLimitOffsetPagination
+
+    def __init__(self):
+        self.page_size = None
+        self.offset_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare_queryset(queryset, request, view)
+        if self.offset_paginator is not None:
+            return self.offset_paginator.paginate_queryset(queryset, request, view)
+        return self.build_page(list(queryset[: self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare_queryset(queryset, request, view)
+        if self.offset_paginator is not None:
+            return await sync_to_async(self.offset_paginator.paginate_queryset)(
+                queryset, request, view
+            )
+        return self.build_page(
+            [instance async for instance in queryset[: self.page_size + 1]]
+        )
+
+    def prepare_queryset(self, queryset, request, view):
+        """Ordena e filtra a partir do cursor; devolve o queryset da página."""
+        self.ordering = self.get_ordering(view)
+        self.model = queryset.model
+        self.annotations = queryset.query.annotations
+
+        offset_paginator = self.offset_pagination_class()
+        if offset_paginator.offset_query_param in request.query_params:
+            self.offset_paginator = offset_paginator
+            return queryset.order_by(*self.get_order_by())
+
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(self.cursor))
+        return queryset
+
+    def build_page(self, results):
+        reverse = self.cursor is not None and self.cursor.reverse
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.page = results
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return results
+
+    def get_paginated_response(self, data):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_paginated_response(data)
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return min(api_settings.PAGE_SIZE or self.max_page_size, self.max_page_size)
+
+    def get_ordering(self, view):
+        if hasattr(view, "get_pagination_ordering"):
+            return tuple(view.get_pagination_ordering())
+        return tuple(getattr(view, "pagination_ordering", self.ordering))
+
+    def get_ordering_fields(self):
+        for term in self.ordering:
+            name = term.lstrip("-")
+            if name in self.annotations:
+                field = self.annotations[name].output_field
+            else:
+                field = self.model._meta.get_field(name)
+            yield name, field, term.startswith("-")
+
+    def get_order_by(self, reverse=False):
+        order_by = []
+        for name, field, descending in self.get_ordering_fields():
+            nulls = {}
+            if field.null:
+                nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+            expression = F(name)
+            if descending != reverse:
+                order_by.append(expression.desc(**nulls))
+            else:
+                order_by.append(expression.asc(**nulls))
+        return order_by
+
+    def get_keyset_filter(self, cursor):
+        """
+        Monta `(a, b, c) > (x, y, z)` respeitando a direção de cada campo e
+        mantendo os nulos no fim da ordenação (ou no início, ao voltar).
+        """
+        after = Q(pk__in=[])
+        equal = Q()
+        for (name, field, descending), value in zip(
+            self.get_ordering_fields(), cursor.values
+        ):
+            lookup = "lt" if descending != cursor.reverse else "gt"
+            if value is None:
+                step = None if not cursor.reverse else Q(**{f"{name}__isnull": False})
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                step = Q(**{f"{name}__{lookup}": value})
+                if field.null and not cursor.reverse:
+                    step |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            if step is not None:
+                after |= equal & step
+            equal &= same
+        return after
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            raw_values = payload["v"]
+            reverse = bool(payload.get("r", False))
+            fields = list(self.get_ordering_fields())
+            if len(raw_values) != len(fields):
+                raise ValueError
+            values = [
+                None if raw is None else field.to_python(raw)
+                for (_, field, _), raw in zip(fields, raw_values)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(values=values, reverse=reverse)
+
+    def encode_cursor(self, instance, reverse):
+        values = []
+        for name, _, _ in self.get_ordering_fields():
+            # Linhas de `.values()` também podem ser paginadas
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(instance, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        payload = {"v": values}
+        if reverse:
+            payload["r"] = True
+        encoded = urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("ascii")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Voltamos além do início: a próxima página é a primeira.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class TimelinePagination(KeysetPagination):
+    """
+    Keyset sobre a união (`UNION ALL`) de vários querysets `.values()` com as
+    mesmas colunas, recebidos como lista em `paginate_queryset`.
+
+    O filtro do cursor entra em cada parte antes da união, para que cada uma
+    use o próprio índice; onde o banco permite (Postgres), cada parte também
+    é ordenada e limitada ao tamanho da página. A chave precisa ser única na
+    união: `type` (anotado em cada parte) separa ids iguais de tipos
+    diferentes.
+    """
+
+    ordering = ("date", "created_at", "type", "id")
+
+    def prepare_queryset(self, querysets, request, view):
+        self.ordering = self.get_ordering(view)
+        self.model = querysets[0].model
+        self.annotations = querysets[0].query.annotations
+
+        offset_paginator = self.offset_pagination_class()
+        if offset_paginator.offset_query_param in request.query_params:
+            self.offset_paginator = offset_paginator
+            return self.combine(querysets)
+
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        if self.cursor is not None:
+            keyset_filter = self.get_keyset_filter(self.cursor)
+            querysets = [queryset.filter(keyset_filter) for queryset in querysets]
+        return self.combine(querysets, reverse, limit=self.page_size + 1)
+
+    def combine(self, querysets, reverse=False, limit=None):
+        order_by = self.get_order_by(reverse)
+        first, *others = querysets
+        if not others:
+            return first.order_by(*order_by)
+        features = connections[first.db].features
+        if limit is not None and features.supports_slicing_ordering_in_compound:
+            first, *others = [
+                queryset.order_by(*order_by)[:limit] for queryset in querysets
+            ]
+        return first.union(*others, all=True).order_by(*order_by)
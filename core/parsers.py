@@ -0,0 +1,52 @@
+import codecs
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from core.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+
+
+class ORJSONParser(JSONParser):
+    """
+    `JSONParser` com orjson. Sem o orjson, ou com um charset diferente de
+    UTF-8 no `Content-Type`, usa o do DRF.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or not is_utf8(encoding):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read() if stream is not None else b"")
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackParser(BaseParser):
+    """Corpos `application/msgpack` (requer o pacote `msgpack`)."""
+
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if msgpack is None:
+            raise ImproperlyConfigured("MessagePackParser requer o pacote msgpack.")
+        try:
+            return msgpack.unpackb(
+                stream.read() if stream is not None else b"",
+                raw=False,
+                strict_map_key=False,
+            )
+        except (ValueError, msgpack.exceptions.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
+
+
+def is_utf8(encoding):
+    try:
+        return codecs.lookup(encoding).name == "utf-8"
+    except LookupError:
+        return False
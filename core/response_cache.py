@@ -0,0 +1,65 @@
+import time
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+DATA_VERSION_KEY = "data-version:{}"
+# Escopo compartilhado por todos os usuários (ex.: a lista de pacientes)
+USERS_SCOPE = "users"
+
+
+def user_scope(user_id):
+    return f"user:{user_id}"
+
+
+def get_data_versions(*scopes):
+    """
+    Versão atual de cada escopo, criando as que ainda não existem. Assim
+    como no grafo de acesso, um valor novo a cada troca evita reaproveitar
+    respostas antigas caso a chave seja descartada do cache.
+    """
+    keys = [DATA_VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key) for key in keys]
+
+
+async def aget_data_versions(*scopes):
+    keys = [DATA_VERSION_KEY.format(scope) for scope in scopes]
+    versions = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+        versions.update(await cache.aget_many(missing))
+    return [versions.get(key) for key in keys]
+
+
+def bump_data_versions(*scopes, using=DEFAULT_DB_ALIAS):
+    """
+    Troca a versão dos escopos e, dentro de uma transação, de novo após o
+    commit: até lá outras requisições (ou uma réplica atrasada) ainda leem as
+    linhas antigas e guardariam a resposta sob a versão nova.
+    """
+
+    def bump():
+        cache.set_many(
+            {DATA_VERSION_KEY.format(scope): time.time_ns() for scope in scopes},
+            timeout=None,
+        )
+
+    bump()
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(bump, using=using)
+
+
+def bump_user_data(*user_ids, using=DEFAULT_DB_ALIAS):
+    """Invalida as respostas em cache dos usuários informados."""
+    bump_data_versions(
+        *(user_scope(user_id) for user_id in user_ids if user_id), using=using
+    )
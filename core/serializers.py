@@ -1,10 +1,137 @@
-from rest_framework import serializers
+from functools import lru_cache
+from operator import methodcaller
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import add_user_claims
+from .instrumentation import phase
 from .models.user import User, RoleChoices
 from .models.relationship import Relationship
 from .models.allowed_activity import AllowedActivity
+from .models.job import Job
+from activities.models import ActivityChoices
+
+
+class SparseFieldsetMixin:
+    """
+    Permite escolher os campos do serializer com `fields=[...]`. Sem a opção,
+    usa `Meta.fields` menos `Meta.optional_fields` (campos que só existem
+    quando a view os anota no queryset).
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            fields = set(self.fields) - set(getattr(self.Meta, "optional_fields", ()))
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
+
+
+class InstrumentedSerializerMixin:
+    """Soma o tempo de `to_representation` na fase `serialize` do `Server-Timing`."""
+
+    def to_representation(self, instance):
+        with phase("serialize"):
+            return super().to_representation(instance)
+
+
+class ValuesSerializer:
+    """
+    Serializer somente leitura para linhas de `.values()`, com a mesma saída
+    de `serializer_class` (um `ModelSerializer` com campos planos).
+
+    Os conversores de cada campo são montados uma vez por conjunto de campos:
+    campos cujo valor já sai do banco no tipo da resposta (texto, inteiro,
+    booleano, chave estrangeira) são copiados sem conversão, datas usam
+    `isoformat` e os demais campos chamam o `to_representation` do próprio
+    campo do DRF. Assim a montagem de cada linha é um único laço, sem a
+    resolução de atributos e a validação por campo do `ModelSerializer`.
+    """
+
+    serializer_class = None
+    identity_fields = (
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.BooleanField,
+        serializers.PrimaryKeyRelatedField,
+    )
+
+    def __init__(self, instance=None, many=False, fields=None, context=None):
+        self.instance = instance
+        self.many = many
+        self.plan = self.compile(fields)
+
+    @classmethod
+    def compile(cls, fields=None):
+        """(nome na resposta, coluna do `.values()`, conversor ou None)."""
+        return cls.build_plan(tuple(fields) if fields is not None else None)
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def build_plan(cls, fields):
+        serializer = cls.serializer_class(fields=fields)
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or "." in field.source:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} does not support the field {name!r}"
+                )
+            plan.append((name, field.source, cls.get_converter(field)))
+        return tuple(plan)
+
+    @classmethod
+    def get_converter(cls, field):
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field:
+            return field.to_representation
+        if isinstance(field, cls.identity_fields):
+            return None
+        if isinstance(field, serializers.DateField):
+            output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+            if output_format and output_format.lower() == ISO_8601:
+                return methodcaller("isoformat")
+        return field.to_representation
+
+    @classmethod
+    def get_columns(cls, fields=None):
+        return [column for _, column, _ in cls.compile(fields)]
+
+    @classmethod
+    def values(cls, queryset, fields=None, extra=()):
+        """
+        O queryset como `.values()` com as colunas dos campos e `extra` (ex.:
+        os campos da paginação, lidos para montar o cursor).
+        """
+        columns = dict.fromkeys([*cls.get_columns(fields), *extra])
+        return queryset.values(*columns)
+
+    def to_representation(self, row):
+        data = {}
+        for name, column, convert in self.plan:
+            value = row[column]
+            if convert is not None and value is not None:
+                value = convert(value)
+            data[name] = value
+        return data
+
+    @property
+    def data(self):
+        with phase("serialize"):
+            if self.many:
+                return [self.to_representation(row) for row in self.instance]
+            return self.to_representation(self.instance)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "name", "email", "role", "password", "is_active"]
@@ -19,14 +146,106 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class RelationshipSerializer(serializers.ModelSerializer):
+class RelationshipSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Relationship
         fields = ["id", RoleChoices.therapist, RoleChoices.patient, "created_at", "updated_at"]
 
 
-class AllowedActivitySerializer(serializers.ModelSerializer):
+class AllowedActivitySerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = AllowedActivity
         fields = "__all__"
         read_only_fields = ("created_at",)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "task",
+            "status",
+            "attempts",
+            "max_attempts",
+            "run_after",
+            "result",
+            "error",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class AllowedActivityBulkSerializer(serializers.Serializer):
+    relationships = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+    activity_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=ActivityChoices.choices),
+        allow_empty=False,
+    )
+    is_allowed = serializers.BooleanField(default=True)
+
+    def validate_relationships(self, value):
+        return sorted(set(value))
+
+    def validate_activity_types(self, value):
+        return sorted(set(value))
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh que renova as claims com o estado atual do usuário. Repete o
+    `validate` do simplejwt para reaproveitar a única busca do usuário.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+
+        # O refresh token carrega as claims da emissão; renova com o estado atual
+        add_user_claims(refresh, user)
+        data = {"access": str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Sem o app de blacklist instalado
+                    pass
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class DashboardPatientSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+    relationship = serializers.IntegerField(source="id")
+    patient = serializers.IntegerField(source="patient_id")
+    name = serializers.CharField(source="patient__name")
+    allowed_activities = serializers.ListField(child=serializers.CharField())
+    last_entry_date = serializers.DateField()
+    entries_today = serializers.IntegerField()
+    entries_last_7_days = serializers.IntegerField()
+    entries_last_30_days = serializers.IntegerField()
+    entries_total = serializers.IntegerField()
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.access_graph import invalidate_access_graph
+from core.models.allowed_activity import AllowedActivity, sync_activity_masks
+from core.models.relationship import Relationship
+from core.models.user import User
+from core.response_cache import USERS_SCOPE, bump_data_versions, bump_user_data
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, using, **kwargs):
+    # Um usuário novo pode reaproveitar um id (ex.: SQLite após rollback)
+    if created:
+        invalidate_access_graph(instance.pk, using=using)
+        bump_user_data(instance.pk, using=using)
+    bump_data_versions(USERS_SCOPE, using=using)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, using, **kwargs):
+    invalidate_access_graph(instance.pk, using=using)
+    bump_user_data(instance.pk, using=using)
+    bump_data_versions(USERS_SCOPE, using=using)
+
+
+@receiver(post_save, sender=Relationship)
+@receiver(post_delete, sender=Relationship)
+def relationship_changed(sender, instance, using, **kwargs):
+    invalidate_access_graph(instance.therapist_id, instance.patient_id, using=using)
+    bump_user_data(instance.therapist_id, instance.patient_id, using=using)
+
+
+@receiver(post_save, sender=AllowedActivity)
+@receiver(post_delete, sender=AllowedActivity)
+def allowed_activity_changed(sender, instance, using, **kwargs):
+    relationship_ids = {instance.relationship_id}
+    # Permissão movida para outro relacionamento: o anterior também muda
+    previous = getattr(instance, "_loaded_relationship_id", None)
+    if previous is not None:
+        relationship_ids.add(previous)
+    instance._loaded_relationship_id = instance.relationship_id
+    sync_activity_masks(relationship_ids, using=using)
+
+    if len(relationship_ids) == 1 and AllowedActivity.relationship.is_cached(instance):
+        relationship = instance.relationship
+        user_ids = (relationship.therapist_id, relationship.patient_id)
+    else:
+        user_ids = [
+            user_id
+            for pair in Relationship.objects.filter(pk__in=relationship_ids)
+            .values_list("therapist_id", "patient_id")
+            .order_by()
+            for user_id in pair
+        ]
+    if user_ids:
+        invalidate_access_graph(*user_ids, using=using)
+        bump_user_data(*user_ids, using=using)
@@ -0,0 +1,9 @@
+from core.jobs import task
+from core.models.user import User
+
+
+@task("users.delete")
+def delete_user(job):
+    """Exclui o usuário e, em cascata, relacionamentos e registros."""
+    deleted, per_model = User.objects.filter(pk=job.payload["user_id"]).delete()
+    return {"deleted": per_model}
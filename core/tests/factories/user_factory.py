@@ -15,6 +15,11 @@ class UserFactory(factory.django.DjangoModelFactory):
     role = RoleChoices.patient  
     raw_password = factory.LazyFunction(lambda: "testpass123")
 
+    @classmethod
+    def _build(cls, model_class, *args, **kwargs):
+        kwargs.pop("raw_password", None)
+        return model_class(*args, **kwargs)
+
     @classmethod
     def _create(cls, model_class, *args, **kwargs):
         raw_password = kwargs.pop("raw_password", "testpass123")
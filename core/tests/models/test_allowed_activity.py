@@ -1,6 +1,15 @@
 from django.test import TestCase
 
+from activities.models import (
+    ACTIVITY_BITS,
+    ActivityChoices,
+    activity_mask,
+    activity_types_from_mask,
+)
+from core.models.allowed_activity import AllowedActivity, sync_activity_masks
+from core.models.relationship import Relationship
 from core.tests.factories.allowed_activity_factory import AllowedActivityFactory
+from core.tests.factories.relationship_factory import RelationshipFactory
 
 
 class AllowedActivityModelTest(TestCase):
@@ -12,3 +21,67 @@ class AllowedActivityModelTest(TestCase):
             str(self.allowed_activity),
             f"{self.allowed_activity.relationship.therapist.email} -> {self.allowed_activity.relationship.patient.email} | journaling",
         )
+
+
+class ActivityMaskTest(TestCase):
+    def setUp(self):
+        self.relationship = RelationshipFactory()
+        self.bit = ACTIVITY_BITS[ActivityChoices.journaling]
+
+    def mask(self, relationship=None):
+        relationship = relationship or self.relationship
+        return Relationship.objects.values_list("activity_mask", flat=True).get(
+            pk=relationship.pk
+        )
+
+    def test_mask_follows_allowed_activity_writes(self):
+        self.assertEqual(self.mask(), 0)
+        allowed_activity = AllowedActivityFactory(relationship=self.relationship)
+        self.assertEqual(self.mask(), self.bit)
+
+        allowed_activity.is_allowed = False
+        allowed_activity.save()
+        self.assertEqual(self.mask(), 0)
+
+        allowed_activity.is_allowed = True
+        allowed_activity.save()
+        allowed_activity.delete()
+        self.assertEqual(self.mask(), 0)
+
+    def test_moving_allowed_activity_updates_both_relationships(self):
+        allowed_activity = AllowedActivityFactory(relationship=self.relationship)
+        other = RelationshipFactory()
+        allowed_activity = AllowedActivity.objects.get(pk=allowed_activity.pk)
+        allowed_activity.relationship = other
+        allowed_activity.save()
+        self.assertEqual(self.mask(), 0)
+        self.assertEqual(self.mask(other), self.bit)
+
+    def test_stale_relationship_save_keeps_mask(self):
+        AllowedActivityFactory(relationship=self.relationship)
+        self.relationship.save()
+        self.assertEqual(self.mask(), self.bit)
+
+    def test_sync_after_bulk_create(self):
+        relationships = [RelationshipFactory() for _ in range(3)]
+        AllowedActivity.objects.bulk_create(
+            AllowedActivity(relationship=relationship, is_allowed=index != 1)
+            for index, relationship in enumerate(relationships)
+        )
+        self.assertEqual(sync_activity_masks([r.pk for r in relationships]), 3)
+        self.assertEqual([self.mask(r) for r in relationships], [self.bit, 0, self.bit])
+
+    def test_allowing_filters_by_bit(self):
+        AllowedActivityFactory(relationship=self.relationship)
+        AllowedActivityFactory(is_allowed=False)
+        RelationshipFactory()
+        self.assertQuerySetEqual(
+            Relationship.objects.allowing(ActivityChoices.journaling),
+            [self.relationship],
+        )
+
+    def test_mask_helpers(self):
+        mask = activity_mask([ActivityChoices.journaling])
+        self.assertEqual(mask, self.bit)
+        self.assertEqual(activity_types_from_mask(mask), {ActivityChoices.journaling})
+        self.assertEqual(activity_types_from_mask(0), frozenset())
@@ -0,0 +1,129 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.access_graph import AccessGraphCache, get_access_graph
+from core.models.user import RoleChoices
+from core.tests.factories import (
+    AllowedActivityFactory,
+    RelationshipFactory,
+    UserFactory,
+)
+from activities.models import ActivityChoices
+
+
+class AccessGraphTests(TestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        self.other_patient = UserFactory(role=RoleChoices.patient)
+        self.relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.patient
+        )
+        self.other_relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.other_patient
+        )
+        self.allowed_activity = AllowedActivityFactory(
+            relationship=self.relationship, activity_type=ActivityChoices.journaling
+        )
+        self.graphs = AccessGraphCache(maxsize=2)
+
+    def test_therapist_graph(self):
+        graph = self.graphs.get(self.therapist.id)
+        self.assertEqual(graph.patient_ids, {self.patient.id, self.other_patient.id})
+        self.assertEqual(graph.therapist_ids, set())
+        self.assertTrue(graph.is_therapist_of(self.relationship.id))
+        self.assertEqual(
+            graph.granted_activity_types(self.relationship.id),
+            {ActivityChoices.journaling},
+        )
+        self.assertEqual(graph.granted_activity_types(self.other_relationship.id), set())
+
+    def test_patient_graph(self):
+        graph = self.graphs.get(self.patient.id)
+        self.assertEqual(graph.therapist_ids, {self.therapist.id})
+        self.assertEqual(graph.patient_ids, set())
+        self.assertFalse(graph.is_therapist_of(self.relationship.id))
+        self.assertEqual(graph.granted_activity_types(), {ActivityChoices.journaling})
+
+    def test_graph_is_cached(self):
+        self.graphs.get(self.therapist.id)
+        with self.assertNumQueries(0):
+            self.graphs.get(self.therapist.id)
+
+    def test_graph_expires_without_version_change(self):
+        # Outro processo com cache não compartilhado nunca vê a troca de versão
+        graphs = AccessGraphCache(maxsize=2, ttl=30)
+        with mock.patch("core.access_graph.time.monotonic", return_value=100.0):
+            graphs.get(self.therapist.id)
+        with mock.patch("core.access_graph.time.monotonic", return_value=129.0):
+            with self.assertNumQueries(0):
+                graphs.get(self.therapist.id)
+        with mock.patch("core.access_graph.time.monotonic", return_value=131.0):
+            with self.assertNumQueries(1):
+                graphs.get(self.therapist.id)
+
+    def test_cache_is_bounded(self):
+        self.graphs.get(self.therapist.id)
+        self.graphs.get(self.patient.id)
+        self.graphs.get(self.other_patient.id)
+        self.assertEqual(len(self.graphs), 2)
+        with self.assertNumQueries(1):
+            self.graphs.get(self.therapist.id)
+
+    def test_relationship_changes_invalidate_graph(self):
+        self.graphs.get(self.therapist.id)
+        new_patient = UserFactory(role=RoleChoices.patient)
+        relationship = RelationshipFactory(therapist=self.therapist, patient=new_patient)
+        self.assertIn(new_patient.id, self.graphs.get(self.therapist.id).patient_ids)
+
+        relationship.delete()
+        self.assertNotIn(new_patient.id, self.graphs.get(self.therapist.id).patient_ids)
+
+    def test_allowed_activity_changes_invalidate_graph(self):
+        self.graphs.get(self.patient.id)
+        self.allowed_activity.is_allowed = False
+        self.allowed_activity.save()
+        self.assertEqual(self.graphs.get(self.patient.id).granted_activity_types(), set())
+
+        self.allowed_activity.delete()
+        AllowedActivityFactory(relationship=self.other_relationship)
+        self.assertEqual(
+            self.graphs.get(self.other_patient.id).granted_activity_types(),
+            {ActivityChoices.journaling},
+        )
+
+    def test_graph_cached_before_commit_is_discarded_after_commit(self):
+        stale = self.graphs.get(self.therapist.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.relationship.delete()
+            # Requisição concorrente que ainda lê as linhas de antes do commit
+            with mock.patch("core.access_graph.build_access_graph", return_value=stale):
+                self.assertIs(self.graphs.get(self.therapist.id), stale)
+        self.assertNotIn(self.patient.id, self.graphs.get(self.therapist.id).patient_ids)
+
+
+class AccessGraphViewQueryTests(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.relationship = RelationshipFactory(therapist=self.therapist)
+        self.client.force_authenticate(user=self.therapist)
+
+    def test_journaling_list_uses_cached_graph(self):
+        get_access_graph(self.therapist)
+        # validador do GET condicional + a listagem
+        with self.assertNumQueries(2):
+            self.client.get(reverse("journaling-list"))
+
+    def test_allowed_activity_create_uses_cached_graph(self):
+        get_access_graph(self.therapist)
+        data = {
+            "relationship": self.relationship.id,
+            "activity_type": ActivityChoices.journaling,
+        }
+        # validação de unicidade, busca da FK, INSERT e a máscara do vínculo
+        # (mais o savepoint); nenhuma leitura de Relationship.therapist
+        with self.assertNumQueries(6):
+            self.client.post(reverse("allowedactivity-list"), data, format="json")
@@ -0,0 +1,99 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from core.authentication import ClaimsJWTAuthentication, ClaimsUser, add_user_claims
+from core.models.user import User, RoleChoices
+from core.tests.factories import RelationshipFactory, UserFactory
+
+
+class ClaimsJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.factory = APIRequestFactory()
+
+    def authenticate(self, token):
+        request = self.factory.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        request = APIView().initialize_request(request)
+        return ClaimsJWTAuthentication().authenticate(request)
+
+    def claims_token(self, user):
+        return add_user_claims(AccessToken.for_user(user), user)
+
+    def test_obtained_token_contains_role_and_is_active(self):
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"email": self.therapist.email, "password": "testpass123"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = AccessToken(response.data["access"])
+        self.assertEqual(access["role"], RoleChoices.therapist)
+        self.assertTrue(access["is_active"])
+
+    def test_user_is_built_from_claims_without_queries(self):
+        token = self.claims_token(self.therapist)
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(token)
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.id, self.therapist.id)
+        self.assertEqual(user.pk, self.therapist.id)
+        self.assertEqual(user.role, RoleChoices.therapist)
+        self.assertTrue(user.is_authenticated)
+        self.assertEqual(user, self.therapist)
+
+    def test_other_attributes_load_the_full_user(self):
+        user, _ = self.authenticate(self.claims_token(self.therapist))
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, self.therapist.email)
+            self.assertEqual(user.name, self.therapist.name)
+
+    def test_token_without_claims_falls_back_to_database(self):
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate(AccessToken.for_user(self.therapist))
+        self.assertIsInstance(user, User)
+
+    def test_inactive_claim_is_rejected(self):
+        token = self.claims_token(self.therapist)
+        token["is_active"] = False
+        response = self.client.get(
+            reverse("relationship-list"), HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_endpoints_work_with_claims_user(self):
+        relationship = RelationshipFactory(therapist=self.therapist)
+        response = self.client.get(
+            reverse("relationship-list"),
+            HTTP_AUTHORIZATION=f"Bearer {self.claims_token(self.therapist)}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], relationship.id)
+
+    def test_refresh_updates_role_claim(self):
+        refresh = add_user_claims(RefreshToken.for_user(self.therapist), self.therapist)
+        User.objects.filter(pk=self.therapist.pk).update(role=RoleChoices.patient)
+
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data["access"])["role"], RoleChoices.patient)
+
+    def test_refresh_loads_the_user_once(self):
+        refresh = add_user_claims(RefreshToken.for_user(self.therapist), self.therapist)
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_refresh_for_deleted_user_is_rejected(self):
+        refresh = RefreshToken.for_user(self.therapist)
+        self.therapist.delete()
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": str(refresh)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+from django.test import SimpleTestCase
+
+from core.events import OVERFLOW, InMemoryBroker
+
+
+class InMemoryBrokerTests(SimpleTestCase):
+    async def test_delivers_only_subscribed_channels(self):
+        broker = InMemoryBroker(queue_size=10)
+        subscription = broker.subscribe(["a", "b"])
+        broker.publish("a", {"n": 1})
+        broker.publish("c", {"n": 2})
+        broker.publish("b", {"n": 3})
+
+        self.assertEqual(await subscription.get(timeout=1), {"n": 1})
+        self.assertEqual(await subscription.get(timeout=1), {"n": 3})
+        self.assertIsNone(await subscription.get(timeout=0.01))
+
+    async def test_publish_from_another_thread(self):
+        broker = InMemoryBroker(queue_size=10)
+        subscription = broker.subscribe(["a"])
+        thread = threading.Thread(target=broker.publish, args=("a", {"n": 1}))
+        thread.start()
+        thread.join()
+        self.assertEqual(await subscription.get(timeout=1), {"n": 1})
+
+    async def test_slow_subscriber_receives_overflow(self):
+        broker = InMemoryBroker(queue_size=2)
+        subscription = broker.subscribe(["a"])
+        for n in range(3):
+            broker.publish("a", {"n": n})
+        await asyncio.sleep(0)
+        self.assertIs(await subscription.get(timeout=1), OVERFLOW)
+
+    async def test_close_unsubscribes(self):
+        broker = InMemoryBroker(queue_size=10)
+        subscription = broker.subscribe(["a"])
+        self.assertEqual(broker.subscriber_count("a"), 1)
+        subscription.close()
+        self.assertEqual(broker.subscriber_count("a"), 0)
+        broker.publish("a", {"n": 1})
@@ -0,0 +1,142 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from core.jobs import (
+    Worker,
+    claim_jobs,
+    enqueue,
+    prefers_async,
+    release_stale_jobs,
+    retry_delay,
+    run_job,
+    task,
+)
+from core.models.job import Job, JobStatus
+
+
+calls = []
+
+
+@task("tests.echo")
+def echo(job):
+    calls.append(job.pk)
+    return {"echo": job.payload}
+
+
+@task("tests.fail")
+def fail(job):
+    raise RuntimeError("boom")
+
+
+@override_settings(JOB_RETRY_BACKOFF_SECONDS=10, JOB_RETRY_BACKOFF_MAX_SECONDS=25)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_rejects_unknown_task(self):
+        with self.assertRaises(LookupError):
+            enqueue("tests.missing")
+
+    def test_claim_reserves_due_jobs_in_order(self):
+        first = enqueue("tests.echo")
+        second = enqueue("tests.echo")
+        enqueue("tests.echo", delay=60)
+
+        jobs = claim_jobs("worker-1", limit=10)
+        self.assertEqual([job.pk for job in jobs], [first.pk, second.pk])
+        self.assertEqual(claim_jobs("worker-2", limit=10), [])
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, JobStatus.running)
+        self.assertEqual(first.locked_by, "worker-1")
+        self.assertEqual(first.attempts, 1)
+
+    def test_success_stores_result(self):
+        job = enqueue("tests.echo", {"value": 1})
+        [claimed] = claim_jobs("worker", limit=1)
+        run_job(claimed)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.succeeded)
+        self.assertEqual(job.result, {"echo": {"value": 1}})
+        self.assertEqual(job.locked_by, "")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failure_is_retried_with_backoff_then_fails(self):
+        self.assertEqual([retry_delay(n) for n in (1, 2, 3)], [10, 20, 25])
+        job = enqueue("tests.fail", max_attempts=2)
+
+        [claimed] = claim_jobs("worker", limit=1)
+        before = timezone.now()
+        run_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.pending)
+        self.assertEqual(job.error, "RuntimeError: boom")
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=10))
+        self.assertEqual(claim_jobs("worker", limit=1), [])
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        [claimed] = claim_jobs("worker", limit=1)
+        run_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.failed)
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOB_LOCK_TIMEOUT_SECONDS=60)
+    def test_stale_jobs_are_released(self):
+        job = enqueue("tests.echo")
+        exhausted = enqueue("tests.echo", max_attempts=1)
+        claim_jobs("lost-worker", limit=2)
+        Job.objects.update(locked_at=timezone.now() - timedelta(seconds=120))
+
+        self.assertEqual(release_stale_jobs(), 2)
+        job.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.pending)
+        self.assertEqual(exhausted.status, JobStatus.failed)
+
+    def test_result_of_released_job_is_not_overwritten(self):
+        enqueue("tests.echo")
+        [claimed] = claim_jobs("worker-1", limit=1)
+        Job.objects.filter(pk=claimed.pk).update(status=JobStatus.pending, locked_by="")
+        run_job(claimed)
+        self.assertEqual(Job.objects.get(pk=claimed.pk).status, JobStatus.pending)
+
+    def test_worker_run_once_drains_the_queue(self):
+        jobs = [enqueue("tests.echo") for _ in range(3)]
+        self.assertEqual(Worker(concurrency=2).run_once(), 3)
+        self.assertEqual(calls, [job.pk for job in jobs])
+        self.assertEqual(Worker().run_once(), 0)
+
+    def test_worker_run_stops(self):
+        worker = Worker(concurrency=1, poll_interval=0.01)
+        with mock.patch("core.jobs.claim_jobs", return_value=[]) as claim:
+            claim.side_effect = lambda *args, **kwargs: worker.stop() or []
+            worker.run()
+        claim.assert_called_once()
+
+    def test_run_jobs_requires_shared_cache(self):
+        enqueue("tests.echo")
+        with self.assertRaisesMessage(CommandError, "CACHE_URL"):
+            call_command("run_jobs", "--once", stdout=io.StringIO())
+        self.assertEqual(calls, [])
+
+        shared = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        with override_settings(CACHES=shared):
+            stdout = io.StringIO()
+            call_command("run_jobs", "--once", stdout=stdout, stderr=io.StringIO())
+        self.assertIn("1 job(s)", stdout.getvalue())
+
+    def test_prefers_async(self):
+        factory = RequestFactory()
+        self.assertTrue(prefers_async(factory.get("/", HTTP_PREFER="respond-async")))
+        request = factory.get("/", HTTP_PREFER="return=minimal, respond-async; wait=10")
+        self.assertTrue(prefers_async(request))
+        self.assertFalse(prefers_async(factory.get("/")))
+        self.assertFalse(prefers_async(factory.get("/", HTTP_PREFER="return=minimal")))
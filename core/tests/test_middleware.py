@@ -0,0 +1,174 @@
+import unittest
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import add_user_claims
+from core.middleware import ReplicaRoutingMiddleware, ServerTimingMiddleware
+from core.models.user import User, RoleChoices
+from core.tests.factories import (
+    AllowedActivityFactory,
+    RelationshipFactory,
+    UserFactory,
+)
+from activities.journaling.tests.journaling_factory import JournalingFactory
+
+
+def parse_server_timing(header):
+    timings = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        timings[name] = dict(param.split("=", 1) for param in params)
+    return timings
+
+
+@override_settings(SERVER_TIMING=True, SLOW_REQUEST_QUERY_COUNT=20, SLOW_REQUEST_MS=10_000)
+class ServerTimingMiddlewareTests(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        relationship = RelationshipFactory(therapist=self.therapist)
+        AllowedActivityFactory(relationship=relationship)
+        JournalingFactory.create_batch(3, patient=relationship.patient)
+        token = add_user_claims(AccessToken.for_user(self.therapist), self.therapist)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("journaling-list"))
+        timings = parse_server_timing(response["Server-Timing"])
+
+        self.assertEqual(timings["db"]["desc"], f'"{len(queries)} queries"')
+        for name in ["db", "auth", "serialize", "total"]:
+            self.assertGreaterEqual(float(timings[name]["dur"]), 0)
+
+    def test_slow_request_is_logged_with_view_and_action(self):
+        with self.settings(SLOW_REQUEST_QUERY_COUNT=0):
+            with self.assertLogs("core.middleware", "WARNING") as logs:
+                self.client.get(reverse("journaling-list"))
+        self.assertIn("JournalingViewSet.list", logs.output[0])
+
+    def test_fast_request_is_not_logged(self):
+        with self.assertNoLogs("core.middleware", "WARNING"):
+            self.client.get(reverse("relationship-list"))
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse("relationship-list"))
+        self.assertNotIn("Server-Timing", response)
+
+
+@override_settings(SERVER_TIMING=True, SLOW_REQUEST_QUERY_COUNT=20, SLOW_REQUEST_MS=10_000)
+class AsyncServerTimingMiddlewareTests(TestCase):
+    async def test_counts_queries_of_async_views(self):
+        async def view(request):
+            await User.objects.acount()
+            await User.objects.acount()
+            return HttpResponse()
+
+        middleware = ServerTimingMiddleware(view)
+        response = await middleware(RequestFactory().get("/"))
+        timings = parse_server_timing(response["Server-Timing"])
+        self.assertEqual(timings["db"]["desc"], '"2 queries"')
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], REPLICA_STICKINESS_SECONDS=60)
+class ReplicaRoutingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory(role=RoleChoices.patient)
+        token = add_user_claims(AccessToken.for_user(self.user), self.user)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.factory = RequestFactory()
+
+    def request(self, method, status=200, **extra):
+        def view(request):
+            return HttpResponse(router.db_for_read(User), status=status)
+
+        request = getattr(self.factory, method)("/", **extra)
+        return ReplicaRoutingMiddleware(view)(request).content.decode()
+
+    def test_reads_from_replica_and_writes_read_from_primary(self):
+        self.assertEqual(self.request("get", **self.headers), "replica_1")
+        self.assertEqual(self.request("post", **self.headers), DEFAULT_DB_ALIAS)
+
+    def test_outside_requests_reads_go_to_primary(self):
+        self.assertEqual(router.db_for_read(User), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_write(User), DEFAULT_DB_ALIAS)
+
+    def test_user_is_pinned_to_primary_after_write(self):
+        self.request("patch", **self.headers)
+        self.assertEqual(self.request("get", **self.headers), DEFAULT_DB_ALIAS)
+        # Outros clientes continuam na réplica
+        self.assertEqual(self.request("get"), "replica_1")
+
+        cache.clear()
+        self.assertEqual(self.request("get", **self.headers), "replica_1")
+
+    def test_failed_write_does_not_pin(self):
+        self.request("post", status=400, **self.headers)
+        self.assertEqual(self.request("get", **self.headers), "replica_1")
+
+    def test_malformed_authorization_header_is_ignored(self):
+        headers = {"HTTP_AUTHORIZATION": "Bearer a b"}
+        self.assertEqual(self.request("post", **headers), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.request("get", **headers), "replica_1")
+
+    def test_session_is_pinned_after_write(self):
+        cookie = {"HTTP_COOKIE": f"{settings.SESSION_COOKIE_NAME}=abc"}
+        self.request("post", **cookie)
+        self.assertEqual(self.request("get", **cookie), DEFAULT_DB_ALIAS)
+
+    async def test_async_requests(self):
+        async def view(request):
+            return HttpResponse(router.db_for_read(User))
+
+        middleware = ReplicaRoutingMiddleware(view)
+        response = await middleware(self.factory.post("/", **self.headers))
+        self.assertEqual(response.content.decode(), DEFAULT_DB_ALIAS)
+        response = await middleware(self.factory.get("/", **self.headers))
+        self.assertEqual(response.content.decode(), DEFAULT_DB_ALIAS)
+
+
+@unittest.skipUnless(
+    settings.DATABASE_REPLICAS,
+    "Rode com DATABASE_REPLICA_URLS=sqlite:////tmp/replica.sqlite3 e -k Replica",
+)
+class ReplicaRoutingIntegrationTests(APITransactionTestCase):
+    # A réplica espelha o banco de teste do primário (`TEST.MIRROR`), então os
+    # dados são os mesmos e o que se verifica é qual conexão atendeu a leitura
+    databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS[:1]}
+
+    def setUp(self):
+        cache.clear()
+        self.replica = connections[settings.DATABASE_REPLICAS[0]]
+        self.patient = UserFactory(role=RoleChoices.patient)
+        relationship = RelationshipFactory(patient=self.patient)
+        AllowedActivityFactory(relationship=relationship)
+        token = add_user_claims(AccessToken.for_user(self.patient), self.patient)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def list_titles(self):
+        response = self.client.get(reverse("journaling-list"))
+        return [item["title"] for item in response.data["results"]]
+
+    def test_reads_after_write_see_the_write_until_the_pin_expires(self):
+        response = self.client.post(
+            reverse("journaling-list"), {"title": "Novo", "date": "2026-01-01"}
+        )
+        self.assertEqual(response.status_code, 201)
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            self.assertEqual(self.list_titles(), ["Novo"])
+        self.assertEqual(len(replica_queries), 0)
+
+        cache.clear()
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            self.assertEqual(self.list_titles(), ["Novo"])
+        self.assertGreater(len(replica_queries), 0)
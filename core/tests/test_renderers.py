@@ -0,0 +1,116 @@
+import datetime
+import decimal
+import io
+import unittest
+import uuid
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import JSONParser
+from rest_framework.test import APITestCase
+
+from core.parsers import MessagePackParser, ORJSONParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+from core.models.user import RoleChoices
+from core.tests.factories import RelationshipFactory, UserFactory
+
+
+SAMPLE = {
+    "id": 1,
+    "title": "Relato — ação linha",
+    "created_at": datetime.datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+    "date": datetime.date(2026, 1, 2),
+    "amount": decimal.Decimal("1.50"),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "label": gettext_lazy("Journaling"),
+    "errors": {0: ["Campo obrigatório."]},
+    "items": (1, 2.5, None, True),
+}
+
+
+@unittest.skipIf(orjson is None, "orjson não instalado")
+class ORJSONRendererTests(SimpleTestCase):
+    def test_output_matches_drf_json_renderer(self):
+        self.assertEqual(ORJSONRenderer().render(SAMPLE), JSONRenderer().render(SAMPLE))
+
+    def test_numbers_orjson_formats_differently_match_drf(self):
+        for value in [1e-07, -2e-05, 1.5e300, 0.0001, 2**64, -(2**63) - 1]:
+            with self.subTest(value=value):
+                data = {"value": value, "title": SAMPLE["title"]}
+                self.assertEqual(
+                    ORJSONRenderer().render(data), JSONRenderer().render(data)
+                )
+
+    def test_indent_falls_back_to_drf(self):
+        media_type = "application/json; indent=4"
+        self.assertEqual(
+            ORJSONRenderer().render(SAMPLE, media_type),
+            JSONRenderer().render(SAMPLE, media_type),
+        )
+
+    def test_parser_matches_drf_json_parser(self):
+        body = JSONRenderer().render(SAMPLE)
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body))
+        )
+
+    def test_parser_rejects_invalid_json(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"title": NaN}'))
+
+
+@unittest.skipIf(msgpack is None, "msgpack não instalado")
+class MessagePackTests(SimpleTestCase):
+    def test_round_trip(self):
+        body = MessagePackRenderer().render(SAMPLE)
+        data = MessagePackParser().parse(io.BytesIO(body))
+        self.assertEqual(data["title"], SAMPLE["title"])
+        self.assertEqual(data["created_at"], "2026-01-02T03:04:05.123456Z")
+        self.assertEqual(data["errors"], {0: ["Campo obrigatório."]})
+
+    def test_parser_rejects_invalid_body(self):
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b"\xc1"))
+
+
+class RendererNegotiationTests(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        RelationshipFactory(therapist=self.therapist)
+        self.client.force_authenticate(user=self.therapist)
+
+    def test_json_is_the_default(self):
+        response = self.client.get(reverse("relationship-list"))
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_json_body_is_parsed(self):
+        patient = UserFactory(role=RoleChoices.patient)
+        response = self.client.post(
+            reverse("relationship-list"),
+            data=f'{{"therapist": {self.therapist.id}, "patient": {patient.id}}}',
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @unittest.skipIf(msgpack is None, "msgpack não instalado")
+    def test_msgpack_by_content_negotiation(self):
+        response = self.client.get(
+            reverse("relationship-list"), headers={"accept": "application/msgpack"}
+        )
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        data = msgpack.unpackb(response.content)
+        self.assertEqual(len(data["results"]), 1)
+
+        patient = UserFactory(role=RoleChoices.patient)
+        response = self.client.post(
+            reverse("relationship-list"),
+            data=msgpack.packb({"therapist": self.therapist.id, "patient": patient.id}),
+            content_type="application/msgpack",
+            headers={"accept": "application/msgpack"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
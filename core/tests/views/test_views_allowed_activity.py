@@ -28,9 +28,9 @@ class AllowedActivityAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn(
             str(self.allowed_activity.relationship.id),
-            str(response.data[0]["relationship"]),
+            str(response.data["results"][0]["relationship"]),
         )
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_list_allowed_activity_with_patient(self):
         AllowedActivityFactory(
@@ -44,9 +44,9 @@ class AllowedActivityAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn(
             str(self.allowed_activity.relationship.id),
-            str(response.data[0]["relationship"]),
+            str(response.data["results"][0]["relationship"]),
         )
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_list_allowed_activity_with_patient_with_is_allowed_false(self):
         AllowedActivityFactory(
@@ -61,9 +61,9 @@ class AllowedActivityAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn(
             str(self.allowed_activity.relationship.id),
-            str(response.data[0]["relationship"]),
+            str(response.data["results"][0]["relationship"]),
         )
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_list_allowed_activity_without_login(self):
         url = reverse("allowedactivity-list")
@@ -257,3 +257,127 @@ class AllowedActivityAPITest(APITestCase):
         self.assertTrue(
             AllowedActivity.objects.filter(id=self.allowed_activity.id).exists()
         )
+
+    def test_update_or_destroy_missing_allowed_activity_returns_not_found(self):
+        self.client.force_authenticate(
+            user=self.allowed_activity.relationship.therapist
+        )
+        url = reverse("allowedactivity-detail", args=[0])
+        data = {"is_allowed": False}
+        self.assertEqual(
+            self.client.put(url, data, format="json").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(
+            self.client.patch(url, data, format="json").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_partial_update_resolves_object_and_owner_in_one_query(self):
+        self.client.force_authenticate(
+            user=self.allowed_activity.relationship.therapist
+        )
+        url = reverse("allowedactivity-detail", args=[self.allowed_activity.id])
+        # objeto e posse em uma consulta, depois o UPDATE e a máscara do
+        # vínculo (mais o savepoint)
+        with self.assertNumQueries(5):
+            response = self.client.patch(url, {"is_allowed": False}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_cannot_move_to_other_therapist_relationship(self):
+        self.client.force_authenticate(
+            user=self.allowed_activity.relationship.therapist
+        )
+        url = reverse("allowedactivity-detail", args=[self.allowed_activity.id])
+        foreign_relationship = RelationshipFactory()
+        data = {"relationship": foreign_relationship.id}
+        response = self.client.patch(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.allowed_activity.refresh_from_db()
+        self.assertNotEqual(self.allowed_activity.relationship_id, foreign_relationship.id)
+
+
+class AllowedActivityBulkAPITest(APITestCase):
+    def setUp(self):
+        self.relationship = RelationshipFactory()
+        self.therapist = self.relationship.therapist
+        self.other_relationship = RelationshipFactory(therapist=self.therapist)
+        self.existing = AllowedActivityFactory(
+            relationship=self.relationship, is_allowed=False
+        )
+        self.url = reverse("allowedactivity-bulk")
+        self.client.force_authenticate(user=self.therapist)
+
+    def bulk(self, relationships, is_allowed=True):
+        return self.client.post(
+            self.url,
+            {
+                "relationships": relationships,
+                "activity_types": [ActivityChoices.journaling],
+                "is_allowed": is_allowed,
+            },
+            format="json",
+        )
+
+    def test_bulk_grant_creates_and_updates(self):
+        relationships = [self.relationship.id, self.other_relationship.id]
+        response = self.bulk(relationships)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["relationship"] for item in response.data["results"]], relationships
+        )
+        self.assertTrue(all(item["is_allowed"] for item in response.data["results"]))
+        self.assertEqual(AllowedActivity.objects.count(), 2)
+        self.existing.refresh_from_db()
+        self.assertTrue(self.existing.is_allowed)
+
+    def test_bulk_uses_fixed_number_of_queries(self):
+        relationships = [
+            RelationshipFactory(therapist=self.therapist).id for _ in range(10)
+        ]
+        # posse, upsert, máscaras e leitura do resultado (mais o savepoint da
+        # transação)
+        with self.assertNumQueries(6):
+            response = self.bulk(relationships)
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_bulk_revoke(self):
+        self.bulk([self.relationship.id, self.other_relationship.id])
+        response = self.bulk([self.relationship.id], is_allowed=False)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(AllowedActivity.objects.values_list("relationship_id", "is_allowed")),
+            {(self.relationship.id, False), (self.other_relationship.id, True)},
+        )
+
+    def test_bulk_grant_is_visible_to_patient(self):
+        patient = self.other_relationship.patient
+        self.client.force_authenticate(user=patient)
+        self.assertEqual(len(self.client.get(reverse("allowedactivity-list")).data["results"]), 0)
+
+        self.client.force_authenticate(user=self.therapist)
+        self.bulk([self.other_relationship.id])
+
+        self.client.force_authenticate(user=patient)
+        response = self.client.get(reverse("allowedactivity-list"))
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_bulk_with_foreign_relationship_changes_nothing(self):
+        foreign = RelationshipFactory()
+        response = self.bulk([self.other_relationship.id, foreign.id])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(AllowedActivity.objects.count(), 1)
+
+    def test_bulk_with_patient(self):
+        self.client.force_authenticate(user=self.relationship.patient)
+        response = self.bulk([self.relationship.id])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_with_invalid_activity_type(self):
+        response = self.client.post(
+            self.url,
+            {"relationships": [self.relationship.id], "activity_types": ["unknown"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
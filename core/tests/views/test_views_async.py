@@ -0,0 +1,117 @@
+import json
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import add_user_claims
+from core.models.user import RoleChoices
+from core.tests.factories import (
+    AllowedActivityFactory,
+    RelationshipFactory,
+    UserFactory,
+)
+from core.views.relationship import RelationshipViewSet
+from activities.journaling.models import Journaling
+from activities.journaling.tests.journaling_factory import JournalingFactory
+from activities.journaling.views import JournalingViewSet
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        self.relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.patient
+        )
+        AllowedActivityFactory(relationship=self.relationship)
+        JournalingFactory.create_batch(3, patient=self.patient)
+        self.entry_ids = list(
+            Journaling.objects.filter(patient=self.patient)
+            .order_by("date", "created_at", "id")
+            .values_list("id", flat=True)
+        )
+        JournalingFactory()
+        self.token = add_user_claims(AccessToken.for_user(self.therapist), self.therapist)
+        self.factory = APIRequestFactory()
+
+    async def call(self, viewset, actions, path="/", token=None, headers=None, **kwargs):
+        view = viewset.as_async_view(actions)
+        request = self.factory.get(
+            path,
+            HTTP_AUTHORIZATION=f"Bearer {token or self.token}",
+            **(headers or {}),
+        )
+        response = await view(request, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    async def test_list_is_a_coroutine_view(self):
+        response = await self.call(JournalingViewSet, {"get": "list"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = json.loads(response.content)["results"]
+        self.assertEqual([item["id"] for item in results], self.entry_ids)
+        self.assertIn("preview", results[0])
+
+    async def test_list_follows_cursor(self):
+        first = await self.call(JournalingViewSet, {"get": "list"}, "/?page_size=2")
+        next_url = json.loads(first.content)["next"]
+        second = await self.call(
+            JournalingViewSet, {"get": "list"}, next_url.replace("http://testserver", "")
+        )
+        self.assertEqual(
+            [item["id"] for item in json.loads(second.content)["results"]],
+            self.entry_ids[2:],
+        )
+
+    async def test_retrieve(self):
+        response = await self.call(
+            JournalingViewSet, {"get": "retrieve"}, pk=str(self.entry_ids[0])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["id"], self.entry_ids[0])
+
+    async def test_retrieve_missing_object(self):
+        for pk in ["0", "abc"]:
+            response = await self.call(JournalingViewSet, {"get": "retrieve"}, pk=pk)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_conditional_get(self):
+        first = await self.call(RelationshipViewSet, {"get": "list"})
+        response = await self.call(
+            RelationshipViewSet,
+            {"get": "list"},
+            headers={"HTTP_IF_NONE_MATCH": first["ETag"]},
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_relationship_list(self):
+        response = await self.call(RelationshipViewSet, {"get": "list"})
+        results = json.loads(response.content)["results"]
+        self.assertEqual([item["id"] for item in results], [self.relationship.id])
+
+    async def test_token_without_claims_falls_back_to_database(self):
+        response = await self.call(
+            RelationshipViewSet,
+            {"get": "list"},
+            token=AccessToken.for_user(self.therapist),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_unauthenticated_request_is_rejected(self):
+        view = RelationshipViewSet.as_async_view({"get": "list"})
+        response = await view(self.factory.get("/"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_other_actions_use_the_sync_view(self):
+        view = RelationshipViewSet.as_async_view({"get": "list", "post": "create"})
+        request = self.factory.post(
+            "/",
+            {},
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+        response = await view(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.access_graph import get_access_graph
+from core.models.user import RoleChoices
+from core.response_cache import DATA_VERSION_KEY, user_scope
+from core.tests.factories import (
+    AllowedActivityFactory,
+    RelationshipFactory,
+    UserFactory,
+)
+from activities.journaling.models import Journaling
+from activities.journaling.tests.journaling_factory import JournalingFactory
+
+
+class ConditionalGetAPITests(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        self.relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.patient
+        )
+        self.allowed_activity = AllowedActivityFactory(relationship=self.relationship)
+        self.journaling = JournalingFactory(patient=self.patient)
+        self.other_journaling = JournalingFactory(patient=self.patient)
+        self.client.force_authenticate(user=self.therapist)
+
+    def get(self, url, **headers):
+        return self.client.get(url, headers=headers)
+
+    def test_list_returns_validators(self):
+        response = self.get(reverse("journaling-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+        self.assertIn("Authorization", response["Vary"])
+
+    def test_list_not_modified_with_matching_etag(self):
+        url = reverse("journaling-list")
+        etag = self.get(url)["ETag"]
+        get_access_graph(self.therapist)
+
+        # Só a consulta do validador; a listagem não é executada
+        with self.assertNumQueries(1):
+            response = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_list_not_modified_since(self):
+        url = reverse("relationship-list")
+        last_modified = self.get(url)["Last-Modified"]
+        response = self.get(url, if_modified_since=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_changes_etag(self):
+        url = reverse("journaling-list")
+        etag = self.get(url)["ETag"]
+        self.journaling.title = "Alterado"
+        self.journaling.save()
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_delete_changes_validators(self):
+        url = reverse("journaling-list")
+        first = self.get(url)
+        self.journaling.delete()
+
+        response = self.get(url, if_none_match=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_new_relationship_with_older_rows_is_modified(self):
+        url = reverse("journaling-list")
+        now = timezone.now()
+        two_days_ago = now - timedelta(days=2)
+        Journaling.objects.update(updated_at=two_days_ago)
+        cache.set(
+            DATA_VERSION_KEY.format(user_scope(self.therapist.pk)),
+            int(two_days_ago.timestamp() * 1e9),
+            None,
+        )
+        since = http_date((now - timedelta(days=1)).timestamp())
+        response = self.get(url, if_modified_since=since)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        etag = response["ETag"]
+
+        new_patient = UserFactory(role=RoleChoices.patient)
+        JournalingFactory(patient=new_patient)
+        Journaling.objects.filter(patient=new_patient).update(
+            updated_at=now - timedelta(days=3)
+        )
+        RelationshipFactory(therapist=self.therapist, patient=new_patient)
+
+        response = self.get(url, if_modified_since=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_unrelated_deletion_keeps_validators(self):
+        url = reverse("journaling-list")
+        first = self.get(url)
+        JournalingFactory().delete()
+
+        response = self.get(url, if_none_match=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_allowed_activity_toggle_changes_etag(self):
+        url = reverse("allowedactivity-list")
+        etag = self.get(url)["ETag"]
+        self.allowed_activity.is_allowed = False
+        self.allowed_activity.save()
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_query_params(self):
+        url = reverse("journaling-list")
+        etag = self.get(url)["ETag"]
+        response = self.client.get(
+            url, {"fields": "id"}, headers={"if_none_match": etag}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_not_modified(self):
+        url = reverse("journaling-detail", args=[self.journaling.id])
+        etag = self.get(url)["ETag"]
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.journaling.save()
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_fetches_the_object_once(self):
+        url = reverse("journaling-detail", args=[self.journaling.id])
+        get_access_graph(self.therapist)
+
+        for fast in (False, True):
+            for params in ({}, {"fields": "id,preview"}):
+                with self.subTest(fast=fast, **params), override_settings(
+                    JOURNALING_FAST_SERIALIZER=fast
+                ), self.assertNumQueries(1):
+                    response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertIn("ETag", response)
+
+    def test_retrieve_missing_object_returns_not_found(self):
+        for pk in [0, "abc"]:
+            url = reverse("relationship-detail", args=[pk])
+            self.assertEqual(self.get(url).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.access_graph import get_access_graph
+from core.models.user import RoleChoices
+from core.tests.factories import (
+    AllowedActivityFactory,
+    RelationshipFactory,
+    UserFactory,
+)
+from activities.journaling.tests.journaling_factory import JournalingFactory
+from activities.models import ActivityChoices
+
+
+class DashboardAPITests(APITestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient, name="Ana")
+        self.quiet_patient = UserFactory(role=RoleChoices.patient, name="Bruno")
+        self.relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.patient
+        )
+        self.quiet_relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.quiet_patient
+        )
+        AllowedActivityFactory(
+            relationship=self.relationship, activity_type=ActivityChoices.journaling
+        )
+        for days_ago in [0, 3, 10, 45]:
+            JournalingFactory(
+                patient=self.patient, date=self.today - timedelta(days=days_ago)
+            )
+        # Paciente de outro terapeuta não aparece
+        JournalingFactory(date=self.today)
+        self.url = reverse("dashboard-list")
+
+    def test_caseload_summary(self):
+        self.client.force_authenticate(user=self.therapist)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["date"], self.today)
+
+        patient, quiet_patient = response.data["patients"]
+        self.assertEqual(
+            dict(patient),
+            {
+                "relationship": self.relationship.id,
+                "patient": self.patient.id,
+                "name": "Ana",
+                "allowed_activities": [ActivityChoices.journaling],
+                "last_entry_date": self.today.isoformat(),
+                "entries_today": 1,
+                "entries_last_7_days": 2,
+                "entries_last_30_days": 3,
+                "entries_total": 4,
+            },
+        )
+        self.assertEqual(quiet_patient["patient"], self.quiet_patient.id)
+        self.assertEqual(quiet_patient["allowed_activities"], [])
+        self.assertIsNone(quiet_patient["last_entry_date"])
+        self.assertEqual(quiet_patient["entries_total"], 0)
+
+    def test_caseload_is_a_single_query(self):
+        self.client.force_authenticate(user=self.therapist)
+        get_access_graph(self.therapist)
+        for _ in range(5):
+            RelationshipFactory(therapist=self.therapist)
+        get_access_graph(self.therapist)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data["patients"]), 7)
+
+    def test_patient_cannot_access_dashboard(self):
+        self.client.force_authenticate(user=self.patient)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,122 @@
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.jobs import Worker, delete_expired_jobs, enqueue
+from core.models.job import Job, JobStatus
+from core.models.user import RoleChoices, User
+from core.tests.factories import RelationshipFactory, UserFactory
+from activities.journaling.models import Journaling
+from activities.journaling.tests.journaling_factory import JournalingFactory
+
+
+ASYNC = {"prefer": "respond-async"}
+
+
+class JobAPITests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        RelationshipFactory(therapist=self.therapist, patient=self.patient)
+        self.client.force_authenticate(user=self.therapist)
+
+    def test_status_is_visible_only_to_creator(self):
+        job = enqueue("users.delete", {"user_id": 0}, user=self.therapist)
+        enqueue("users.delete", {"user_id": 0}, user=self.patient)
+
+        response = self.client.get(reverse("job-list"))
+        self.assertEqual([item["id"] for item in response.data["results"]], [job.pk])
+        response = self.client.get(reverse("job-detail", args=[job.pk]))
+        self.assertEqual(response.data["status"], JobStatus.pending)
+
+        self.client.force_authenticate(user=self.patient)
+        response = self.client.get(reverse("job-detail", args=[job.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_runs_as_job(self):
+        entries = JournalingFactory.create_batch(2, patient=self.patient)
+        JournalingFactory()
+
+        response = self.client.get(
+            reverse("journaling-export"), {"fields": "id,title"}, headers=ASYNC
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response["Preference-Applied"], "respond-async")
+        job_url = reverse("job-detail", args=[response.data["id"]])
+        self.assertTrue(response["Location"].endswith(job_url))
+
+        download_url = reverse("job-download", args=[response.data["id"]])
+        self.assertEqual(self.client.get(download_url).status_code, 404)
+
+        self.assertEqual(Worker().run_once(), 1)
+        response = self.client.get(job_url)
+        self.assertEqual(response.data["status"], JobStatus.succeeded)
+
+        response = self.client.get(download_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        content = b"".join(response.streaming_content)
+        entries.sort(key=lambda entry: (entry.date, entry.created_at, entry.id))
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()],
+            [{"id": entry.id, "title": entry.title} for entry in entries],
+        )
+
+    @override_settings(JOB_RESULT_RETENTION_SECONDS=3600)
+    def test_expired_jobs_and_files_are_deleted(self):
+        self.client.get(reverse("journaling-export"), headers=ASYNC)
+        self.client.get(reverse("journaling-export"), headers=ASYNC)
+        Worker().run_once()
+        old, recent = Job.objects.order_by("pk")
+        Job.objects.filter(pk=old.pk).update(
+            finished_at=timezone.now() - timedelta(hours=2)
+        )
+
+        self.assertEqual(delete_expired_jobs(), 1)
+        self.assertFalse(default_storage.exists(old.result["file"]))
+        self.assertTrue(default_storage.exists(recent.result["file"]))
+        self.assertEqual(list(Job.objects.values_list("pk", flat=True)), [recent.pk])
+
+    def test_export_validates_before_enqueueing(self):
+        response = self.client.get(
+            reverse("journaling-export"), {"output": "xml"}, headers=ASYNC
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    def test_user_delete_runs_as_job(self):
+        JournalingFactory(patient=self.patient)
+        self.client.force_authenticate(user=self.patient)
+
+        response = self.client.delete(
+            reverse("user-detail", args=[self.patient.pk]), headers=ASYNC
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.patient.refresh_from_db()
+        self.assertFalse(self.patient.is_active)
+
+        Worker().run_once()
+        job = Job.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, JobStatus.succeeded)
+        self.assertFalse(User.objects.filter(pk=self.patient.pk).exists())
+        self.assertFalse(Journaling.objects.filter(patient_id=self.patient.pk).exists())
+
+    def test_user_delete_without_preference_is_synchronous(self):
+        self.client.force_authenticate(user=self.patient)
+        response = self.client.delete(reverse("user-detail", args=[self.patient.pk]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Job.objects.exists())
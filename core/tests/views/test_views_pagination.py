@@ -0,0 +1,110 @@
+import datetime
+from unittest import mock
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.urls import reverse
+
+from core.models.user import RoleChoices
+from core.pagination import KeysetPagination
+from core.tests.factories import RelationshipFactory, UserFactory
+from activities.journaling.models import Journaling
+from activities.journaling.tests.journaling_factory import JournalingFactory
+
+
+class KeysetPaginationAPITests(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        RelationshipFactory(therapist=self.therapist, patient=self.patient)
+
+        dates = [
+            datetime.date(2025, 1, 3),
+            datetime.date(2025, 1, 1),
+            None,
+            datetime.date(2025, 1, 1),
+            datetime.date(2025, 1, 2),
+            None,
+            datetime.date(2025, 1, 1),
+        ]
+        for date in dates:
+            JournalingFactory(patient=self.patient, date=date)
+
+        self.expected_ids = [
+            journaling.id
+            for journaling in sorted(
+                Journaling.objects.all(),
+                key=lambda j: (j.date is None, j.date, j.created_at, j.id),
+            )
+        ]
+        self.client.force_authenticate(user=self.therapist)
+
+    def walk(self, url):
+        ids = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+            pages += 1
+        return ids, pages
+
+    def test_first_page_has_results_and_next_link(self):
+        response = self.client.get(reverse("journaling-list"), {"page_size": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], self.expected_ids[:3]
+        )
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_walking_next_links_returns_every_row_once_in_order(self):
+        ids, pages = self.walk(reverse("journaling-list") + "?page_size=2")
+        self.assertEqual(ids, self.expected_ids)
+        self.assertEqual(pages, 4)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(reverse("journaling-list"), {"page_size": 2})
+        second = self.client.get(first.data["next"])
+        third = self.client.get(second.data["next"])
+        back = self.client.get(third.data["previous"])
+
+        self.assertEqual(back.status_code, status.HTTP_200_OK)
+        self.assertEqual(back.data["results"], second.data["results"])
+        self.assertIsNotNone(back.data["next"])
+
+        back_to_start = self.client.get(back.data["previous"])
+        self.assertEqual(back_to_start.data["results"], first.data["results"])
+        self.assertIsNone(back_to_start.data["previous"])
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(KeysetPagination, "max_page_size", 3):
+            response = self.client.get(reverse("journaling-list"), {"page_size": 10_000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], self.expected_ids[:3]
+        )
+
+    def test_invalid_cursor_returns_not_found(self):
+        url = reverse("journaling-list")
+        for cursor in ["not-base64!", "eyJ2IjpbMV19", "eyJ2IjpbImEiLCJiIiwiYyJdfQ=="]:
+            response = self.client.get(url, {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_offset_pagination_is_opt_in(self):
+        response = self.client.get(
+            reverse("journaling-list"), {"offset": 2, "limit": 2}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], len(self.expected_ids))
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], self.expected_ids[2:4]
+        )
+
+    def test_other_list_endpoints_are_paginated(self):
+        for name in ["user-list", "relationship-list", "allowedactivity-list"]:
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn("results", response.data)
+            self.assertIn("next", response.data)
@@ -0,0 +1,121 @@
+import datetime
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models.user import User, RoleChoices
+from core.models.relationship import Relationship
+from core.models.allowed_activity import AllowedActivity, sync_activity_masks
+from activities.models import ActivityChoices
+from activities.journaling.models import Journaling
+
+
+BIG_TABLES = {
+    "activities_journaling",
+    "core_allowedactivity",
+    "core_relationship",
+    "core_user",
+}
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Em tabelas pequenas o planner prefere seq scan; desligá-lo só
+            # deixa o seq scan no plano quando nenhum índice serve a consulta.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql)
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def sequential_scans(plan):
+    tables = set()
+    for line in plan:
+        match = re.search(r"Seq Scan on (\w+)", line) or re.fullmatch(
+            r"SCAN (\w+)", line.strip()
+        )
+        if match:
+            tables.add(match.group(1))
+    return tables & BIG_TABLES
+
+
+class ListQueryPlanTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        therapists = User.objects.bulk_create(
+            User(name=f"T{i}", email=f"t{i}@example.com", role=RoleChoices.therapist)
+            for i in range(5)
+        )
+        patients = User.objects.bulk_create(
+            User(name=f"P{i}", email=f"p{i}@example.com", role=RoleChoices.patient)
+            for i in range(50)
+        )
+        relationships = Relationship.objects.bulk_create(
+            Relationship(therapist=therapists[i % 5], patient=patient)
+            for i, patient in enumerate(patients)
+        )
+        AllowedActivity.objects.bulk_create(
+            AllowedActivity(
+                relationship=relationship, activity_type=ActivityChoices.journaling
+            )
+            for relationship in relationships
+        )
+        sync_activity_masks([relationship.id for relationship in relationships])
+        Journaling.objects.bulk_create(
+            Journaling(
+                title=f"Registro {i}",
+                patient=patients[i % 50],
+                date=datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 90),
+            )
+            for i in range(1000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        cls.therapist = therapists[0]
+        cls.patient = patients[0]
+
+    def assertNoSequentialScans(self, user, url_name):
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        selects = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].lstrip().upper().startswith("SELECT")
+        ]
+        self.assertTrue(selects)
+        for sql in selects:
+            plan = explain(sql)
+            self.assertFalse(
+                sequential_scans(plan), "\n".join([sql, "", *plan])
+            )
+
+    def test_journaling_list_as_therapist(self):
+        self.assertNoSequentialScans(self.therapist, "journaling-list")
+
+    def test_journaling_list_as_patient(self):
+        self.assertNoSequentialScans(self.patient, "journaling-list")
+
+    def test_relationship_list_as_therapist(self):
+        self.assertNoSequentialScans(self.therapist, "relationship-list")
+
+    def test_relationship_list_as_patient(self):
+        self.assertNoSequentialScans(self.patient, "relationship-list")
+
+    def test_allowed_activity_list_as_therapist(self):
+        self.assertNoSequentialScans(self.therapist, "allowedactivity-list")
+
+    def test_allowed_activity_list_as_patient(self):
+        self.assertNoSequentialScans(self.patient, "allowedactivity-list")
+
+    def test_user_list_as_therapist(self):
+        self.assertNoSequentialScans(self.therapist, "user-list")
@@ -27,9 +27,9 @@ class RelationshipAPITests(APITestCase):
         url = reverse("relationship-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0][RoleChoices.therapist], self.therapist.id)
-        self.assertEqual(response.data[0][RoleChoices.patient], self.patient.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0][RoleChoices.therapist], self.therapist.id)
+        self.assertEqual(response.data["results"][0][RoleChoices.patient], self.patient.id)
 
     def test_list_patient_relationships(self):
         self.client.force_authenticate(user=self.patient)
@@ -37,9 +37,9 @@ class RelationshipAPITests(APITestCase):
         url = reverse("relationship-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0][RoleChoices.therapist], self.therapist.id)
-        self.assertEqual(response.data[0][RoleChoices.patient], self.patient.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0][RoleChoices.therapist], self.therapist.id)
+        self.assertEqual(response.data["results"][0][RoleChoices.patient], self.patient.id)
 
     def test_list_without_user_login(self):
         url = reverse("relationship-list")
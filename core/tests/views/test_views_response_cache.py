@@ -0,0 +1,179 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.access_graph import get_access_graph
+from core.authentication import add_user_claims
+from core.models.user import RoleChoices
+from core.tests.factories import (
+    AllowedActivityFactory,
+    RelationshipFactory,
+    UserFactory,
+)
+from core.views.relationship import RelationshipViewSet
+from activities.models import ActivityChoices
+from activities.journaling.tests.journaling_factory import JournalingFactory
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=300)
+class ResponseCacheAPITests(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        self.relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.patient
+        )
+        self.allowed_activity = AllowedActivityFactory(
+            relationship=self.relationship, activity_type=ActivityChoices.journaling
+        )
+        self.client.force_authenticate(user=self.therapist)
+        get_access_graph(self.therapist)
+
+    def test_repeated_list_is_served_from_cache(self):
+        for name in ["relationship-list", "allowedactivity-list", "user-list"]:
+            with self.subTest(name):
+                url = reverse(name)
+                first = self.client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(second.status_code, status.HTTP_200_OK)
+                self.assertEqual(second.json(), first.json())
+
+    def test_query_params_are_part_of_the_key(self):
+        RelationshipFactory(therapist=self.therapist)
+        url = reverse("relationship-list")
+        self.client.get(url)
+        response = self.client.get(url, {"page_size": 1})
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_users_do_not_share_responses(self):
+        url = reverse("allowedactivity-list")
+        self.client.get(url)
+        self.client.force_authenticate(user=self.patient)
+        response = self.client.get(url)
+        self.assertEqual(
+            [item["relationship"] for item in response.data["results"]],
+            [self.relationship.id],
+        )
+        other_therapist = UserFactory(role=RoleChoices.therapist)
+        self.client.force_authenticate(user=other_therapist)
+        self.assertEqual(self.client.get(url).data["results"], [])
+
+    def test_cached_response_keeps_validators(self):
+        url = reverse("relationship-list")
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_relationship_change_invalidates_therapist_and_patient(self):
+        url = reverse("relationship-list")
+        self.client.get(url)
+        self.client.force_authenticate(user=self.patient)
+        self.client.get(url)
+
+        self.relationship.delete()
+        self.assertEqual(self.client.get(url).data["results"], [])
+        self.client.force_authenticate(user=self.therapist)
+        self.assertEqual(self.client.get(url).data["results"], [])
+
+    def test_allowed_activity_change_invalidates(self):
+        url = reverse("allowedactivity-list")
+        self.client.force_authenticate(user=self.patient)
+        self.assertEqual(len(self.client.get(url).data["results"]), 1)
+        self.allowed_activity.is_allowed = False
+        self.allowed_activity.save()
+        self.assertEqual(self.client.get(url).data["results"], [])
+
+    def test_bulk_grant_invalidates(self):
+        url = reverse("allowedactivity-list")
+        self.client.get(url)
+        response = self.client.post(
+            reverse("allowedactivity-bulk"),
+            {
+                "relationships": [self.relationship.id],
+                "activity_types": [ActivityChoices.journaling],
+                "is_allowed": False,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(self.client.get(url).data["results"][0]["is_allowed"])
+
+    def test_response_cached_before_commit_is_not_served_after_commit(self):
+        url = reverse("relationship-list")
+        self.client.get(url)
+        get_queryset = RelationshipViewSet.get_queryset
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                relationship = RelationshipFactory(therapist=self.therapist)
+
+                # Requisição concorrente que ainda lê as linhas de antes do commit
+                def stale_queryset(view):
+                    return get_queryset(view).exclude(pk=relationship.pk)
+
+                with mock.patch.object(RelationshipViewSet, "get_queryset", stale_queryset):
+                    self.assertEqual(len(self.client.get(url).data["results"]), 1)
+        self.assertEqual(len(self.client.get(url).data["results"]), 2)
+
+    def test_journaling_change_bumps_patient_and_therapist(self):
+        url = reverse("relationship-list")
+        self.client.get(url)
+        JournalingFactory(patient=self.patient)
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_journaling_batch_bumps_patient_and_therapist(self):
+        url = reverse("relationship-list")
+        self.client.get(url)
+        self.client.force_authenticate(user=self.patient)
+        response = self.client.post(
+            reverse("journaling-batch"),
+            [{"title": "Lote", "date": "2026-01-01"}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(user=self.therapist)
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_new_patient_invalidates_user_list(self):
+        url = reverse("user-list")
+        count = self.client.get(url).data["results"]
+        UserFactory(role=RoleChoices.patient)
+        self.assertEqual(len(self.client.get(url).data["results"]), len(count) + 1)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        url = reverse("relationship-list")
+        self.client.get(url)
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=300)
+class AsyncResponseCacheTests(APITestCase):
+    async def test_async_list_is_cached(self):
+        therapist = await UserFactory._meta.model.objects.acreate(
+            name="T", email="t@example.com", role=RoleChoices.therapist
+        )
+        token = add_user_claims(AccessToken.for_user(therapist), therapist)
+        view = RelationshipViewSet.as_async_view({"get": "list"})
+
+        async def call():
+            request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+            response = await view(request)
+            response.render()
+            return response
+
+        first = await call()
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        second = await call()
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
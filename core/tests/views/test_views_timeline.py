@@ -0,0 +1,149 @@
+from datetime import date
+
+from django.db import connection
+from django.db.models import CharField, Value
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework.request import Request
+
+from core.models.user import RoleChoices
+from core.pagination import TimelinePagination
+from core.tests.factories import (
+    AllowedActivityFactory,
+    RelationshipFactory,
+    UserFactory,
+)
+from core.timeline import COLUMNS, activity_models
+from activities.models import ActivityChoices
+from activities.journaling.models import Journaling
+from activities.journaling.serializers import JournalingSerializer
+from activities.journaling.tests.journaling_factory import JournalingFactory
+
+
+class PatientTimelineTests(APITestCase):
+    def setUp(self):
+        self.therapist = UserFactory(role=RoleChoices.therapist)
+        self.patient = UserFactory(role=RoleChoices.patient)
+        self.relationship = RelationshipFactory(
+            therapist=self.therapist, patient=self.patient
+        )
+        self.entries = [
+            JournalingFactory(patient=self.patient, date=date(2026, 1, day))
+            for day in (3, 1, 2)
+        ]
+        JournalingFactory(patient=self.patient, is_active=False)
+        JournalingFactory()
+        self.url = reverse("patient-timeline", args=[self.patient.pk])
+        self.client.force_authenticate(user=self.therapist)
+
+    def test_activity_models_are_discovered(self):
+        self.assertEqual(activity_models(), {ActivityChoices.journaling: Journaling})
+
+    def test_therapist_reads_timeline_in_date_order(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        ordered = sorted(self.entries, key=lambda entry: entry.date)
+        self.assertEqual([item["id"] for item in results], [e.id for e in ordered])
+        self.assertEqual(results[0]["type"], ActivityChoices.journaling)
+        self.assertEqual(results[0]["date"], date(2026, 1, 1))
+        self.assertEqual(results[0]["detail"], JournalingSerializer(ordered[0]).data)
+
+    def test_details_are_loaded_with_one_query_per_type(self):
+        # Com o grafo de acesso em cache: a página da união e os detalhes
+        self.client.get(self.url)
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_pages_follow_cursor(self):
+        response = self.client.get(self.url, {"page_size": 2})
+        first = [item["id"] for item in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        second = [item["id"] for item in response.data["results"]]
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(len(first + second), 3)
+        self.assertEqual(set(first + second), {entry.id for entry in self.entries})
+
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([item["id"] for item in response.data["results"]], first)
+
+    def test_patient_needs_granted_activity(self):
+        self.client.force_authenticate(user=self.patient)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
+
+        AllowedActivityFactory(
+            relationship=self.relationship, activity_type=ActivityChoices.journaling
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_unrelated_users_get_not_found(self):
+        self.client.force_authenticate(user=UserFactory(role=RoleChoices.therapist))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        self.client.force_authenticate(user=UserFactory(role=RoleChoices.patient))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        url = reverse("patient-timeline", args=["abc"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class TimelinePaginationTests(APITestCase):
+    """A união de vários tipos, simulada com duas partes sobre o journaling."""
+
+    def setUp(self):
+        patient = UserFactory(role=RoleChoices.patient)
+        for day in (1, 1, 2, None):
+            JournalingFactory(patient=patient, date=day and date(2026, 1, day))
+        self.factory = APIRequestFactory()
+
+    def querysets(self):
+        return [
+            Journaling.objects.annotate(
+                type=Value(activity_type, output_field=CharField())
+            ).values(*COLUMNS, "type")
+            for activity_type in ("a", "b")
+        ]
+
+    def paginate(self, url):
+        paginator = TimelinePagination()
+        page = paginator.paginate_queryset(
+            self.querysets(), Request(self.factory.get(url))
+        )
+        return page, paginator.get_paginated_response(page).data
+
+    def test_pages_cover_the_union_once(self):
+        keys = []
+        page, data = self.paginate("/?page_size=3")
+        keys += [(row["type"], row["id"]) for row in page]
+        while data["next"]:
+            page, data = self.paginate(data["next"])
+            keys += [(row["type"], row["id"]) for row in page]
+
+        everything, _ = self.paginate("/?page_size=100")
+        self.assertEqual(len(everything), 8)
+        self.assertEqual(keys, [(row["type"], row["id"]) for row in everything])
+        # Datas nulas no fim, depois o tipo desempata ids iguais
+        self.assertIsNone(everything[-1]["date"])
+        self.assertEqual([row["type"] for row in everything[-2:]], ["a", "b"])
+
+    def test_previous_page_of_union(self):
+        first, data = self.paginate("/?page_size=3")
+        second, data = self.paginate(data["next"])
+        previous, _ = self.paginate(data["previous"])
+        self.assertEqual(previous, first)
+
+    def test_single_union_all_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.paginate("/?page_size=3")
+        self.assertEqual(len(queries), 1)
+        self.assertIn("UNION ALL", queries[0]["sql"])
+
+    def test_offset_pagination(self):
+        page, data = self.paginate("/?offset=6&limit=5")
+        self.assertEqual(len(page), 2)
+        self.assertEqual(data["count"], 8)
@@ -15,7 +15,7 @@ class UserAPITests(APITestCase):
         url = reverse("user-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn(self.patient.email, response.data[0]["email"])
+        self.assertIn(self.patient.email, response.data["results"][0]["email"])
 
     def test_list_users_with_patient_authenticated_return_forbidden(self):
         self.client.force_authenticate(user=self.patient)
@@ -138,3 +138,11 @@ class UserAPITests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertEqual(User.objects.count(), 2)
+
+    def test_update_or_delete_missing_user_return_not_found(self):
+        url = reverse("user-detail", args=[0])
+        self.assertEqual(
+            self.client.patch(url, {"name": "x"}, format="json").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
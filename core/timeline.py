@@ -0,0 +1,113 @@
+"""
+Linha do tempo do paciente com todos os tipos de atividade
+(`GET /api/patients/<id>/timeline/`).
+
+Os tipos são descobertos entre os modelos instalados que herdam de
+`ActivityBase`; cada um vira uma parte de um único `UNION ALL` sobre as
+colunas comuns, ordenado e paginado por `TimelinePagination`. Os detalhes de
+cada linha da página são lidos depois, com uma consulta por tipo presente.
+"""
+
+from django.apps import apps
+from django.db.models import CharField, Value
+from rest_framework import serializers
+
+from core.models.activity_base import ActivityBase
+from core.models.user import RoleChoices
+
+
+# Colunas comuns lidas de cada tipo, mais o `type` anotado
+COLUMNS = ("id", "title", "date", "created_at", "updated_at")
+
+_detail_serializers = {}
+
+
+def register_detail_serializer(model, serializer_class):
+    """Serializer usado no `detail` das linhas do tipo `model`."""
+    _detail_serializers[model] = serializer_class
+
+
+def get_detail_serializer(model):
+    serializer_class = _detail_serializers.get(model)
+    if serializer_class is None:
+        meta = type("Meta", (), {"model": model, "fields": "__all__"})
+        serializer_class = type(
+            f"{model.__name__}TimelineSerializer",
+            (serializers.ModelSerializer,),
+            {"Meta": meta},
+        )
+        _detail_serializers[model] = serializer_class
+    return serializer_class
+
+
+def get_activity_type(model):
+    return getattr(model, "activity_type", None) or model._meta.model_name
+
+
+def activity_models():
+    """Modelos concretos de atividade, por tipo: {tipo: modelo}."""
+    models = {
+        get_activity_type(model): model
+        for model in apps.get_models()
+        if issubclass(model, ActivityBase) and not model._meta.proxy
+    }
+    return dict(sorted(models.items()))
+
+
+def readable_activity_types(user, graph, patient_id):
+    """Tipos da linha do tempo de `patient_id` que o usuário pode ler."""
+    types = activity_models()
+    if user.role == RoleChoices.patient and patient_id == user.id:
+        granted = graph.granted_activity_types()
+        return [activity_type for activity_type in types if activity_type in granted]
+    if user.role == RoleChoices.therapist and patient_id in graph.patient_ids:
+        return list(types)
+    return None
+
+
+def timeline_querysets(patient_id, activity_types):
+    """Uma parte do `UNION ALL` por tipo, todas com as mesmas colunas."""
+    models = activity_models()
+    querysets = []
+    for activity_type in activity_types:
+        model = models[activity_type]
+        querysets.append(
+            model.objects.filter(patient_id=patient_id, is_active=True)
+            .annotate(type=Value(activity_type, output_field=CharField()))
+            .values(*COLUMNS, "type")
+        )
+    if not querysets:
+        # Nenhum tipo liberado: uma parte vazia mantém a paginação uniforme
+        model = next(iter(models.values()))
+        querysets.append(
+            model.objects.none()
+            .annotate(type=Value("", output_field=CharField()))
+            .values(*COLUMNS, "type")
+        )
+    return querysets
+
+
+def load_details(rows, context=None):
+    """
+    Acrescenta `detail` às linhas da página: uma consulta por tipo presente,
+    serializada com o serializer registrado do tipo.
+    """
+    models = activity_models()
+    ids_by_type = {}
+    for row in rows:
+        ids_by_type.setdefault(row["type"], []).append(row["id"])
+
+    details = {}
+    for activity_type, ids in ids_by_type.items():
+        model = models[activity_type]
+        serializer_class = get_detail_serializer(model)
+        instances = list(model.objects.filter(pk__in=ids))
+        for instance, data in zip(
+            instances,
+            serializer_class(instances, many=True, context=context).data,
+        ):
+            details[activity_type, instance.pk] = data
+
+    for row in rows:
+        row["detail"] = details.get((row["type"], row["id"]))
+    return rows
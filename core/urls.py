@@ -3,6 +3,10 @@ from rest_framework.routers import DefaultRouter
 from core.views.user import UserViewSet
 from core.views.relationship import RelationshipViewSet
 from core.views.allowed_activity import AllowedActivityViewSet
+from core.views.dashboard import DashboardViewSet
+from core.views.job import JobViewSet
+from core.views.patient import PatientViewSet
+from activities.journaling.stream import journaling_stream
 from activities.journaling.views import JournalingViewSet
 
 
@@ -10,10 +14,19 @@ router = DefaultRouter()
 router.register(r"users", UserViewSet)
 router.register(r"relationships", RelationshipViewSet)
 router.register(r"allowed-activities", AllowedActivityViewSet)
+router.register(r"dashboard", DashboardViewSet, basename="dashboard")
+router.register(r"jobs", JobViewSet)
+router.register(r"patients", PatientViewSet, basename="patient")
 
 # Viewsets para as atividades
 router.register(r"activities/journaling", JournalingViewSet)
 
 urlpatterns = [
+    # Antes do router, que trataria "stream" como o id de um registro
+    path(
+        "activities/journaling/stream/",
+        journaling_stream,
+        name="journaling-stream",
+    ),
     path("", include(router.urls)),
 ]
@@ -1,66 +1,124 @@
-from rest_framework import viewsets, status
-from rest_framework.exceptions import PermissionDenied
+from django.conf import settings
+from django.db import transaction
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from core.access_graph import get_access_graph, invalidate_access_graph
+from core.models import Relationship
 from core.models.user import RoleChoices
-from core.models.allowed_activity import AllowedActivity
-from core.models.relationship import Relationship
-from core.serializers import AllowedActivitySerializer
+from core.models.allowed_activity import AllowedActivity, sync_activity_masks
+from core.serializers import AllowedActivityBulkSerializer, AllowedActivitySerializer
+from core.response_cache import bump_user_data
+from core.views.mixins import CachedListMixin, ConditionalGetMixin, OwnedObjectMixin
 
 
-class AllowedActivityViewSet(viewsets.ModelViewSet):
+class AllowedActivityViewSet(
+    CachedListMixin, ConditionalGetMixin, OwnedObjectMixin, viewsets.ModelViewSet
+):
     queryset = AllowedActivity.objects.all()
     serializer_class = AllowedActivitySerializer
     permission_classes = [IsAuthenticated]
+    owner_lookup = "relationship__therapist"
 
     def get_queryset(self):
         user = self.request.user
+        relationship_ids = get_access_graph(user).relationship_ids
         if user.role == RoleChoices.patient:
             return AllowedActivity.objects.filter(
-                relationship__patient=user, is_allowed=True
+                relationship_id__in=relationship_ids, is_allowed=True
             )
         elif user.role == RoleChoices.therapist:
-            return AllowedActivity.objects.filter(relationship__therapist=user)
+            return AllowedActivity.objects.filter(relationship_id__in=relationship_ids)
 
-    def create(self, request, *args, **kwargs):
-        therapist_id = Relationship.objects.get(
-            id=request.data["relationship"]
-        ).therapist.id
-        if request.user.id != therapist_id:
+    def check_relationship_owner(self, relationship_id):
+        try:
+            relationship_id = int(relationship_id)
+        except (TypeError, ValueError):
+            raise PermissionDenied()
+        if not get_access_graph(self.request.user).is_therapist_of(relationship_id):
             raise PermissionDenied()
+
+    def create(self, request, *args, **kwargs):
+        self.check_relationship_owner(request.data.get("relationship"))
         return super().create(request, *args, **kwargs)
 
-    def update(self, request, pk=None, *args, **kwargs):
-        allowed_activity = AllowedActivity.objects.filter(id=pk).first()
-        therapist_id = allowed_activity.relationship.therapist.id
-        if request.user.id != therapist_id:
-            raise PermissionDenied()
-        serializer = self.get_serializer(
-            allowed_activity, data=request.data, partial=True
-        )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+    def get_owner_queryset(self):
+        # O JOIN da checagem de posse já traz o relacionamento usado pelos sinais
+        return AllowedActivity.objects.select_related("relationship")
 
-        return Response(serializer.data)
+    def update(self, request, *args, **kwargs):
+        kwargs["partial"] = True
+        return super().update(request, *args, **kwargs)
 
-    def partial_update(self, request, pk=None, *args, **kwargs):
-        allowed_activity = AllowedActivity.objects.filter(id=pk).first()
-        therapist_id = allowed_activity.relationship.therapist.id
-        if request.user.id != therapist_id:
-            raise PermissionDenied()
-        serializer = self.get_serializer(
-            allowed_activity, data=request.data, partial=True
-        )
-        serializer.is_valid(raise_exception=True)
+    def perform_update(self, serializer):
+        relationship = serializer.validated_data.get("relationship")
+        if relationship is not None:
+            self.check_relationship_owner(relationship.id)
         serializer.save()
 
-        return Response(serializer.data)
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Libera (`is_allowed: true`) ou bloqueia os tipos de atividade em vários
+        relacionamentos do terapeuta de uma vez.
 
-    def destroy(self, request, pk=None, *args, **kwargs):
-        allowed_activity = AllowedActivity.objects.filter(id=pk).first()
-        therapist_id = allowed_activity.relationship.therapist.id
-        if request.user.id != therapist_id:
+        A posse de todos os relacionamentos é conferida em uma consulta; as
+        permissões são gravadas com um único upsert em
+        `(relationship, activity_type)`, na mesma transação.
+        """
+        if request.user.role != RoleChoices.therapist:
             raise PermissionDenied()
-        allowed_activity.delete()
-        return Response({"detail": "User deleted"}, status=status.HTTP_204_NO_CONTENT)
+
+        params = AllowedActivityBulkSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        relationship_ids = params.validated_data["relationships"]
+        activity_types = params.validated_data["activity_types"]
+        is_allowed = params.validated_data["is_allowed"]
+
+        size = len(relationship_ids) * len(activity_types)
+        if size > settings.ALLOWED_ACTIVITY_BULK_MAX_SIZE:
+            raise ValidationError(
+                {
+                    "detail": "Too many grants: "
+                    f"maximum is {settings.ALLOWED_ACTIVITY_BULK_MAX_SIZE}."
+                }
+            )
+
+        with transaction.atomic():
+            patient_ids = dict(
+                Relationship.objects.filter(
+                    id__in=relationship_ids, therapist_id=request.user.id
+                ).values_list("id", "patient_id")
+            )
+            if len(patient_ids) != len(relationship_ids):
+                raise PermissionDenied()
+
+            AllowedActivity.objects.bulk_create(
+                [
+                    AllowedActivity(
+                        relationship_id=relationship_id,
+                        activity_type=activity_type,
+                        is_allowed=is_allowed,
+                    )
+                    for relationship_id in relationship_ids
+                    for activity_type in activity_types
+                ],
+                update_conflicts=True,
+                unique_fields=["relationship", "activity_type"],
+                update_fields=["is_allowed", "updated_at"],
+            )
+            sync_activity_masks(relationship_ids)
+
+        # `bulk_create` não dispara os sinais que atualizam as máscaras (acima,
+        # na mesma transação) e invalidam o grafo de acesso e as respostas em cache
+        invalidate_access_graph(request.user.id, *patient_ids.values())
+        bump_user_data(request.user.id, *patient_ids.values())
+        allowed_activities = AllowedActivity.objects.filter(
+            relationship_id__in=relationship_ids, activity_type__in=activity_types
+        ).order_by("relationship_id", "activity_type")
+        return Response(
+            {"results": AllowedActivitySerializer(allowed_activities, many=True).data}
+        )
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.access_graph import get_access_graph
+from core.models import Relationship
+from core.models.user import RoleChoices
+from core.serializers import DashboardPatientSerializer
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """
+    Resumo da carteira de pacientes do terapeuta para a tela inicial.
+
+    Contagens de registros por janela e a data do último registro vêm de uma
+    única consulta agregada (um `JOIN` com as atividades e `COUNT ... FILTER`
+    por janela); as atividades liberadas vêm do grafo de acesso em cache.
+    """
+
+    permission_classes = [IsAuthenticated]
+    # Janelas de contagem, em dias, contando o dia de hoje
+    windows = {"entries_today": 1, "entries_last_7_days": 7, "entries_last_30_days": 30}
+
+    def list(self, request):
+        if request.user.role != RoleChoices.therapist:
+            raise PermissionDenied()
+
+        graph = get_access_graph(request.user)
+        today = timezone.localdate()
+        rows = self.get_caseload(request.user, today)
+        for row in rows:
+            row["allowed_activities"] = sorted(graph.granted_activity_types(row["id"]))
+
+        serializer = DashboardPatientSerializer(rows, many=True)
+        return Response({"date": today, "patients": serializer.data})
+
+    def get_caseload(self, user, today):
+        entries = "patient__patient_activities"
+        counts = {
+            name: Count(
+                f"{entries}__id",
+                filter=Q(**{f"{entries}__date__gt": today - timedelta(days=days)}),
+            )
+            for name, days in self.windows.items()
+        }
+        return list(
+            Relationship.objects.filter(therapist_id=user.id)
+            .values("id", "patient_id", "patient__name")
+            .annotate(
+                last_entry_date=Max(f"{entries}__date"),
+                entries_total=Count(f"{entries}__id"),
+                **counts,
+            )
+            .order_by("patient__name", "id")
+        )
@@ -0,0 +1,51 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from core.models.job import Job, JobStatus
+from core.serializers import JobSerializer
+
+
+def accepted_response(job, request):
+    """202 com o job criado e o endereço para acompanhar o status."""
+    return Response(
+        JobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={
+            "Location": reverse("job-detail", args=[job.pk], request=request),
+            "Preference-Applied": "respond-async",
+        },
+    )
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status dos jobs criados pelo próprio usuário."""
+
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return self.queryset.filter(created_by_id=self.request.user.id)
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """Arquivo gerado pelo job (`result.file`), quando ele já terminou."""
+        job = self.get_object()
+        name = (job.result or {}).get("file")
+        if job.status != JobStatus.succeeded or not name:
+            raise Http404
+        if not default_storage.exists(name):
+            raise Http404
+        return FileResponse(
+            default_storage.open(name, "rb"),
+            as_attachment=True,
+            filename=os.path.basename(name),
+            content_type=job.result.get("content_type"),
+        )
@@ -0,0 +1,376 @@
+import hashlib
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, Count, ExpressionWrapper, Max, Q
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+
+from core.response_cache import aget_data_versions, get_data_versions, user_scope
+
+
+class ConditionalGetMixin:
+    """
+    Responde `list` e `retrieve` com 304 quando `If-None-Match` ou
+    `If-Modified-Since` ainda valem, antes de montar a resposta.
+
+    Na listagem os validadores são `max(updated_at)` e a contagem do queryset
+    filtrado (uma única consulta agregada) mais a versão de dados do usuário
+    (`core.response_cache`), trocada pelos sinais quando um registro visível
+    é excluído ou quando um relacionamento ou permissão muda o que ele vê;
+    a versão é um instante, então também entra no `Last-Modified`. No
+    detalhe, o `updated_at` do próprio objeto buscado por `get_object`.
+    """
+
+    last_modified_field = "updated_at"
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        state = queryset.aggregate(**self.get_list_validators())
+        (version,) = get_data_versions(user_scope(request.user.pk))
+        last_modified = self.get_list_last_modified(state, version)
+
+        etag, response = self.check_conditions(
+            request, last_modified, state["count"], version
+        )
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return self.add_validators(response, etag, last_modified)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(await self.aget_queryset())
+        state = await queryset.aaggregate(**self.get_list_validators())
+        (version,) = await aget_data_versions(user_scope(request.user.pk))
+        last_modified = self.get_list_last_modified(state, version)
+
+        etag, response = self.check_conditions(
+            request, last_modified, state["count"], version
+        )
+        if response is None:
+            response = await super().alist(request, *args, **kwargs)
+        return self.add_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.detail_response(request, instance)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return self.detail_response(request, instance)
+
+    def detail_response(self, request, instance):
+        """Monta os validadores a partir do objeto já buscado; serializa só se mudou."""
+        last_modified = self.get_detail_last_modified(instance)
+        if last_modified is None:
+            return Response(self.get_serializer(instance).data)
+
+        etag, response = self.check_conditions(request, last_modified.timestamp(), 1)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return self.add_validators(response, etag, last_modified.timestamp())
+
+    def get_detail_last_modified(self, instance):
+        # Views com leitura rápida devolvem linhas de `.values()`
+        if isinstance(instance, dict):
+            return instance.get(self.last_modified_field)
+        return getattr(instance, self.last_modified_field, None)
+
+    def get_list_validators(self):
+        return {"last_modified": Max(self.last_modified_field), "count": Count("pk")}
+
+    def get_list_last_modified(self, state, version):
+        # A versão é um `time.time_ns()` gravado na troca
+        timestamps = [version / 1e9 if version is not None else None]
+        if state["last_modified"] is not None:
+            timestamps.append(state["last_modified"].timestamp())
+        return max(filter(None, timestamps), default=None)
+
+    def get_etag(self, request, last_modified, *validators):
+        value = "|".join(
+            [
+                request.get_full_path(),
+                str(request.user.pk),
+                request.headers.get("Accept", ""),
+                repr(last_modified),
+                *map(str, validators),
+            ]
+        )
+        return quote_etag(hashlib.md5(value.encode(), usedforsecurity=False).hexdigest())
+
+    def check_conditions(self, request, last_modified, *validators):
+        """Devolve o ETag e, se o cliente já tem a versão atual, a resposta 304."""
+        etag = self.get_etag(request, last_modified, *validators)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(last_modified) if last_modified is not None else None,
+        )
+        return etag, response
+
+    def add_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(int(last_modified))
+            patch_vary_headers(response, ["Authorization"])
+        return response
+
+
+class CachedListMixin:
+    """
+    Guarda no cache do Django a resposta de `list` (dados, `ETag`,
+    `Last-Modified` e `Vary`) por usuário, URL com parâmetros e formato.
+
+    A chave inclui a versão de dados do usuário e dos `cache_scopes` da view
+    (`core.response_cache`), trocadas pelos sinais de escrita; as respostas
+    antigas deixam de ser usadas sem apagar chaves, o que funciona com
+    qualquer backend (LocMem, arquivo, memcached). Com
+    `RESPONSE_CACHE_TIMEOUT = 0` o cache fica desligado.
+    """
+
+    cache_scopes = ()
+    cached_headers = ("ETag", "Last-Modified", "Vary")
+
+    def get_cache_scopes(self):
+        return (user_scope(self.request.user.pk), *self.cache_scopes)
+
+    def get_list_cache_key(self, request, versions):
+        value = "|".join(
+            [request.get_full_path(), request.accepted_media_type, *map(str, versions)]
+        )
+        digest = hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()
+        return f"response:{type(self).__name__}:{request.user.pk}:{digest}"
+
+    def list(self, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_TIMEOUT:
+            return super().list(request, *args, **kwargs)
+        versions = get_data_versions(*self.get_cache_scopes())
+        key = self.get_list_cache_key(request, versions)
+        cached = cache.get(key)
+        if cached is not None:
+            return self.cached_response(request, *cached)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, self.freeze(response), settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_TIMEOUT:
+            return await super().alist(request, *args, **kwargs)
+        versions = await aget_data_versions(*self.get_cache_scopes())
+        key = self.get_list_cache_key(request, versions)
+        cached = await cache.aget(key)
+        if cached is not None:
+            return self.cached_response(request, *cached)
+
+        response = await super().alist(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(
+                key, self.freeze(response), settings.RESPONSE_CACHE_TIMEOUT
+            )
+        return response
+
+    def freeze(self, response):
+        headers = {
+            name: response[name] for name in self.cached_headers if name in response
+        }
+        return response.data, headers
+
+    def cached_response(self, request, data, headers):
+        response = get_conditional_response(
+            request,
+            etag=headers.get("ETag"),
+            last_modified=parse_http_date_safe(headers.get("Last-Modified", "")),
+        )
+        if response is None:
+            response = Response(data)
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+
+class OwnedObjectMixin:
+    """
+    Resolve o objeto e a autorização juntos nas ações de escrita: uma única
+    consulta pela chave primária traz o objeto e um booleano indicando se
+    `owner_lookup` (ex.: `relationship__therapist`) aponta para o usuário da
+    requisição. Objeto inexistente responde 404; de outro dono, 403.
+    """
+
+    owner_lookup = None
+    owner_actions = ("update", "partial_update", "destroy")
+
+    def get_owner_queryset(self):
+        return self.queryset.all()
+
+    def get_object(self):
+        if self.action not in self.owner_actions:
+            return super().get_object()
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_owner_queryset().annotate(
+            is_owner=ExpressionWrapper(
+                Q(**{self.owner_lookup: self.request.user.pk}),
+                output_field=BooleanField(),
+            )
+        )
+        try:
+            instance = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).first()
+        except (TypeError, ValueError, ValidationError):
+            instance = None
+        if instance is None:
+            raise Http404
+        if not instance.is_owner:
+            raise PermissionDenied()
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+
+class AsyncReadMixin:
+    """
+    Atende `list` e `retrieve` com uma view assíncrona e o ORM assíncrono,
+    para que, sob ASGI, a requisição não ocupe uma thread enquanto espera o
+    banco. As demais ações continuam no fluxo síncrono do DRF (em thread).
+
+    Ativado com `ASYNC_READ_VIEWS = True`; `as_async_view` monta a view
+    assíncrona independentemente da configuração. A autenticação usa
+    `aauthenticate` quando existe; permissões e throttles rodam direto no
+    loop e por isso não devem consultar o banco.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        if (
+            settings.ASYNC_READ_VIEWS
+            and actions
+            and set(actions.values()) & set(cls.async_actions)
+        ):
+            return cls.as_async_view(actions, **initkwargs)
+        return super().as_view(actions, **initkwargs)
+
+    @classmethod
+    def as_async_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+
+        async def view(request, *args, **kwargs):
+            action = actions.get(request.method.lower())
+            if action not in cls.async_actions:
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, name in actions.items():
+                setattr(self, method, getattr(self, name))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        update_wrapper(view, sync_view, assigned=("__name__", "__qualname__", "__doc__"))
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        view.login_required = False
+        return csrf_exempt(view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            response = await getattr(self, f"a{self.action}")(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    async def aperform_authentication(self, request):
+        """Equivalente a `Request._authenticate`, aguardando `aauthenticate`."""
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(
+                        request
+                    )
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def aget_queryset(self):
+        return await sync_to_async(self.get_queryset)()
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(await self.aget_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).afirst()
+        except (TypeError, ValueError, ValidationError):
+            instance = None
+        if instance is None:
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        if hasattr(self.paginator, "apaginate_queryset"):
+            return await self.paginator.apaginate_queryset(
+                queryset, self.request, view=self
+            )
+        return await sync_to_async(self.paginator.paginate_queryset)(
+            queryset, self.request, view=self
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(await self.aget_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        instances = [instance async for instance in queryset.aiterator()]
+        return Response(self.get_serializer(instances, many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
@@ -0,0 +1,39 @@
+from django.http import Http404
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+
+from core.access_graph import get_access_graph
+from core.models.user import User
+from core.pagination import TimelinePagination
+from core.timeline import load_details, readable_activity_types, timeline_querysets
+
+
+class PatientViewSet(viewsets.GenericViewSet):
+    """Visões por paciente que reúnem todos os tipos de atividade."""
+
+    queryset = User.objects.none()
+    permission_classes = [IsAuthenticated]
+    pagination_class = TimelinePagination
+
+    @action(detail=True, methods=["get"])
+    def timeline(self, request, pk=None):
+        """
+        Atividades ativas do paciente, de todos os tipos que o usuário pode
+        ler, em ordem de `(date, created_at)` e paginadas por cursor. Cada
+        item traz as colunas comuns, o `type` e o registro completo em
+        `detail`.
+        """
+        try:
+            patient_id = int(pk)
+        except ValueError:
+            raise Http404
+        activity_types = readable_activity_types(
+            request.user, get_access_graph(request.user), patient_id
+        )
+        if activity_types is None:
+            raise Http404
+
+        page = self.paginate_queryset(timeline_querysets(patient_id, activity_types))
+        load_details(page, self.get_serializer_context())
+        return self.get_paginated_response(page)
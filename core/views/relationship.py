@@ -2,18 +2,31 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied, MethodNotAllowed
 
+from core.access_graph import aget_access_graph, get_access_graph
 from core.models import Relationship
 from core.models.user import RoleChoices
 from core.serializers import RelationshipSerializer
+from core.views.mixins import AsyncReadMixin, CachedListMixin, ConditionalGetMixin
 
 
-class RelationshipViewSet(viewsets.ModelViewSet):
+class RelationshipViewSet(
+    CachedListMixin, ConditionalGetMixin, AsyncReadMixin, viewsets.ModelViewSet
+):
     queryset = Relationship.objects.all()
     serializer_class = RelationshipSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ["get", "post", "delete"]
 
     def get_queryset(self):
+        return self.scope_queryset(get_access_graph(self.request.user))
+
+    async def aget_queryset(self):
+        return self.scope_queryset(await aget_access_graph(self.request.user))
+
+    def scope_queryset(self, graph):
+        # Sem relacionamentos no grafo (já em cache) não há o que consultar
+        if not graph.relationship_ids:
+            return self.queryset.none()
         if self.request.user.role == RoleChoices.therapist:
             queryset = self.queryset.filter(therapist_id=self.request.user.id)
             return queryset
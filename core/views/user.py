@@ -1,15 +1,23 @@
-from rest_framework import viewsets, status
+from django.db import transaction
+from rest_framework import viewsets
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.response import Response
 
+from core.jobs import enqueue, prefers_async
 from core.models.user import User, RoleChoices
 from core.serializers import UserSerializer
+from core.response_cache import USERS_SCOPE
+from core.views.job import accepted_response
+from core.views.mixins import CachedListMixin, OwnedObjectMixin
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(CachedListMixin, OwnedObjectMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    # A lista de pacientes é a mesma para todos os terapeutas
+    cache_scopes = (USERS_SCOPE,)
+    # Cada usuário só altera ou exclui a própria conta
+    owner_lookup = "pk"
 
     def get_permissions(self):
         if self.action == "create":
@@ -23,26 +31,17 @@ class UserViewSet(viewsets.ModelViewSet):
             return User.objects.filter(role=RoleChoices.patient)
         else:
             raise PermissionDenied()
-    
-    def partial_update(self, request, pk=None):
-
-        if str(request.user.id) != pk:
-            raise PermissionDenied
-        
-        user = User.objects.filter(pk=pk).first()
-
-        serializer = self.get_serializer(user, data=request.data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-
-        return Response(serializer.data)
-
-    def destroy(self, request, pk=None):
-        
-        if str(request.user.id) != pk:
-            raise PermissionDenied
-        
-        user = User.objects.filter(pk=pk).first()
-        user.delete()
-        return Response({'detail': 'User deleted'}, status=status.HTTP_204_NO_CONTENT)
 
+    def destroy(self, request, *args, **kwargs):
+        """
+        Com `Prefer: respond-async`, desativa a conta e deixa a exclusão em
+        cascata (relacionamentos e registros) para um job, respondendo 202.
+        """
+        if not prefers_async(request):
+            return super().destroy(request, *args, **kwargs)
+        instance = self.get_object()
+        with transaction.atomic():
+            instance.is_active = False
+            instance.save(update_fields=["is_active", "updated_at"])
+            job = enqueue("users.delete", {"user_id": instance.pk}, user=request.user)
+        return accepted_response(job, request)